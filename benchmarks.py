@@ -0,0 +1,474 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Bancs d'essai des calculs de sawn_lumber et general_design.
+----------------------------------------------------
+
+Mesure le temps de chaque calcul public:
+
+    - cache froid et cache chaud. À froid, le rechargement de l'instantané (database.reload,
+      mesure "database.reload") et le premier appel qui le suit sont mesurés séparément,
+      sur plusieurs échantillons (médiane);
+    - mode scalaire (une boucle Python) et mode en lot (sawn_lumber_batch, general_design_batch);
+    - de 1 à N processus.
+
+Les résultats sont enregistrés en JSON pour comparer les performances entre les commits.
+
+Usage:
+    python benchmarks.py -o bench.json
+    python benchmarks.py -o nouveau.json --compare bench.json
+
+Avec CSA_O86_PROFILE (voir profiling), les calculs sont instrumentés: les temps mesurés
+incluent alors le coût des enveloppes et ne doivent pas être comparés.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import numpy as np
+import database
+import general_design
+import general_design_batch
+import profiling
+import sawn_lumber
+import sawn_lumber_batch
+
+
+# CODE
+def _members(size: int, seed: int = 86) -> list[dict]:
+    """
+    Génère des éléments aléatoires reproductibles.
+
+    Args:
+        size (int): Nombre d'éléments.
+        seed (int, optional): Germe du générateur. Default to 86.
+
+    Returns:
+        list[dict]: Éléments.
+
+    """
+    rng = random.Random(seed)
+    keys = list(database.snapshot().strengths)
+
+    return [
+        {
+            "b": rng.choice((38, 64, 89)),
+            "d": rng.choice((89, 140, 184, 235, 286)),
+            "ply": rng.randint(1, 3),
+            "key": rng.choice(keys),
+            "nominal": rng.choice((2, 3, 4, 6, 8, 10, 12)),
+            "prop": rng.choice(sawn_lumber.PROPERTIES),
+            "duration": rng.choice(("courte", "normale", "continue")),
+            "kd": rng.choice((0.65, 1, 1.15)),
+            "f": rng.uniform(5, 30),
+            "length": rng.randint(500, 3000),
+            "theta": rng.randint(0, 90),
+            "span": rng.uniform(2, 6),
+            "fire": rng.choice((30, 45, 60)),
+        }
+        for _ in range(size)
+    ]
+
+
+def _scalar_cases() -> dict:
+    """
+    Calculs scalaires, chacun appliqué à un élément.
+
+    Returns:
+        dict: Nom du calcul -> fonction(élément).
+
+    """
+    return {
+        "lumber_category": lambda m: sawn_lumber.lumber_category(m["b"], m["d"]),
+        "specified_strengths": lambda m: sawn_lumber.specified_strengths(*m["key"]),
+        "modification_factors": lambda m: sawn_lumber.modification_factors(
+            m["b"], m["d"], m["prop"], m["duration"], "Lumber", True, True, True
+        ),
+        "sizes": lambda m: sawn_lumber.sizes(m["nominal"]),
+        "Resistances.bending_moment": lambda m: sawn_lumber.Resistances(
+            m["b"], m["d"], m["kd"], ply=m["ply"]
+        ).bending_moment(m["f"], lateral_support=True, compressive_edge_support=True),
+        "Resistances.shear": lambda m: sawn_lumber.Resistances(
+            m["b"], m["d"], m["kd"], ply=m["ply"]
+        ).shear(m["f"] / 10),
+        "Resistances.comp_parallel": lambda m: sawn_lumber.Resistances(
+            89, m["d"], m["kd"], ply=m["ply"]
+        ).comp_parallel(m["length"], m["length"], m["f"], 6500),
+        "Resistances.comp_perpendicular": lambda m: sawn_lumber.Resistances(
+            m["b"], m["d"], m["kd"], ply=m["ply"]
+        ).comp_perpendicular(lb1=89, d_lb1=100, lb2=89, fcp=5.3),
+        "Resistances.tensile_parallel": lambda m: sawn_lumber.Resistances(
+            m["b"], m["d"], m["kd"], ply=m["ply"]
+        ).tensile_parallel(m["f"]),
+        "comp_angle": lambda m: sawn_lumber.comp_angle(m["theta"], 10000, 1000),
+        "combined_bending_axial": lambda m: sawn_lumber.combined_bending_axial(
+            50, 1000, 50, 1000, True, 6500, 1e7, m["length"]
+        ),
+        "Vibration.floor_vibration": lambda m: general_design.Vibration(
+            span=m["span"],
+            joist_axial_stiffness=1e8,
+            joist_bending_stiffness=5e5,
+            joist_depth=0.24,
+            joist_mass=5,
+            topping="OSB 3/4",
+        ).floor_vibration(),
+        "Vibration.max_span": lambda m: general_design.Vibration(
+            span=m["span"],
+            joist_axial_stiffness=1e8,
+            joist_bending_stiffness=5e5,
+            joist_depth=0.24,
+            joist_mass=5,
+            joist_spacing=0.3 + m["span"] / 20,
+            topping="OSB 3/4",
+        ).max_span(),
+        "FireResistance.effective_section": lambda m: general_design.FireResistance(
+            m["fire"], 235, 400, product="sciage"
+        ).effective_section(),
+        "limit_states_design": lambda m: general_design.limit_states_design(m["f"], 20),
+        "load_duration": lambda m: general_design.load_duration(
+            m["duration"], 1, m["f"], 0.5
+        ),
+        "cross_section": lambda m: general_design.cross_section(m["f"], 30),
+        "elasticity": lambda m: general_design.elasticity(m["f"] * 400, 0.94, 0.9),
+        "elastic_deflection": lambda m: general_design.elastic_deflection(
+            m["length"], m["f"]
+        ),
+        "permanent_deformation": lambda m: general_design.permanent_deformation(
+            m["length"], m["f"]
+        ),
+        "ponding": lambda m: general_design.ponding(2, m["f"], 3),
+        "moisture": lambda m: general_design.moisture(m["d"], 19, 12),
+        "lateral_brace": lambda m: general_design.lateral_brace(m["f"] * 1000),
+    }
+
+
+def _batch_cases() -> dict:
+    """
+    Calculs en lot, chacun appliqué à tous les éléments.
+
+    Returns:
+        dict: Nom du calcul -> fonction(colonnes).
+
+    """
+    return {
+        "lumber_category": lambda c: sawn_lumber_batch.lumber_category(c["b"], c["d"]),
+        "sizes": lambda c: sawn_lumber_batch.sizes(c["nominal"]),
+        "modification_factors": lambda c: sawn_lumber_batch.modification_factors(
+            c["b"], c["d"], c["prop"], c["duration"], "Lumber", True, True, True
+        ),
+        "Resistances.bending_moment": lambda c: sawn_lumber_batch.bending_moment(
+            c["b"],
+            c["d"],
+            c["f"],
+            c["ply"],
+            c["kd"],
+            lateral_support=True,
+            compressive_edge_support=True,
+        ),
+        "Resistances.shear": lambda c: sawn_lumber_batch.shear(
+            c["b"], c["d"], c["f"] / 10, c["ply"], c["kd"]
+        ),
+        "Resistances.comp_parallel": lambda c: sawn_lumber_batch.comp_parallel(
+            89, c["d"], c["length"], c["length"], c["f"], 6500, c["ply"], c["kd"]
+        ),
+        "Resistances.comp_perpendicular": lambda c: sawn_lumber_batch.comp_perpendicular(
+            c["b"], c["d"], c["ply"], c["kd"], lb1=89, d_lb1=100, lb2=89, fcp=5.3
+        ),
+        "comp_angle": lambda c: sawn_lumber_batch.comp_angle(c["theta"], 10000, 1000),
+        "combined_bending_axial": lambda c: sawn_lumber_batch.combined_bending_axial(
+            50, 1000, 50, 1000, True, 6500, 1e7, c["length"]
+        ),
+        "moisture": lambda c: general_design_batch.moisture(c["d"], 19, 12),
+        "FireResistance.effective_section": lambda c: (
+            general_design_batch.fire_effective_section(
+                c["fire"], 235, 400, product="sciage"
+            )
+        ),
+        "Vibration.max_span": lambda c: general_design_batch.max_span(
+            general_design.Vibration(
+                span=4,
+                joist_axial_stiffness=1e8,
+                joist_bending_stiffness=5e5,
+                joist_depth=0.24,
+                joist_mass=5,
+                topping="OSB 3/4",
+            ),
+            joist_spacing=0.3 + c["span"] / 20,
+        ),
+    }
+
+
+def _columns(members: list[dict]) -> dict:
+    """
+    Regroupe les éléments en colonnes NumPy.
+
+    """
+    return {
+        key: np.array([m[key] for m in members]) for key in members[0] if key != "key"
+    }
+
+
+def _time(function, repeat: int) -> float:
+    """
+    Meilleur temps de plusieurs répétitions.
+
+    Args:
+        function (callable): Fonction sans argument.
+        repeat (int): Nombre de répétitions.
+
+    Returns:
+        float: Temps minimal, s.
+
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def _time_cold(function, samples: int) -> tuple[float, float]:
+    """
+    Médianes du rechargement de l'instantané et du premier appel qui le suit.
+
+    Args:
+        function (callable): Fonction sans argument.
+        samples (int): Nombre d'échantillons.
+
+    Returns:
+        float: Temps médian de database.reload, s.
+        float: Temps médian du premier appel après le rechargement, s.
+
+    """
+    reloads = []
+    calls = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        database.reload()
+        middle = time.perf_counter()
+        function()
+        calls.append(time.perf_counter() - middle)
+        reloads.append(middle - start)
+
+    return statistics.median(reloads), statistics.median(calls)
+
+
+def _call(case, member: dict):
+    """
+    Applique un calcul à un élément; les éléments hors du domaine du calcul sont ignorés.
+
+    """
+    try:
+        case(member)
+    except (ValueError, Warning):
+        pass
+
+
+def _run_scalar(name: str, members: list[dict]):
+    """
+    Applique un calcul scalaire à une liste d'éléments (exécuté dans un processus).
+
+    """
+    case = _scalar_cases()[name]
+    for member in members:
+        _call(case, member)
+
+
+def run(
+    size: int = 2000,
+    repeat: int = 5,
+    workers: tuple[int, ...] = (1,),
+    samples: int = 50,
+) -> dict:
+    """
+    Exécute tous les bancs d'essai.
+
+    Args:
+        size (int, optional): Nombre d'éléments par mesure. Default to 2000.
+        repeat (int, optional): Nombre de répétitions par mesure. Default to 5.
+        workers (tuple[int, ...], optional): Nombres de processus. Default to (1,).
+        samples (int, optional): Nombre d'échantillons des mesures à froid. Default to 50.
+
+    Returns:
+        dict: Résultats (voir save).
+
+    """
+    members = _members(size)
+    columns = _columns(members)
+    results = []
+
+    def record(name, mode, cache, n_workers, seconds, n=size):
+        results.append(
+            {
+                "name": name,
+                "mode": mode,
+                "cache": cache,
+                "workers": n_workers,
+                "n": n,
+                "seconds": seconds,
+                "per_call_us": seconds / n * 1e6,
+            }
+        )
+
+    reloads = []
+    for name, case in _scalar_cases().items():
+        member = members[0]
+        reload, first = _time_cold(
+            lambda case=case, member=member: _call(case, member), samples
+        )
+        reloads.append(reload)
+        record(name, "scalar", "cold", 1, first, 1)
+        record(
+            name,
+            "scalar",
+            "warm",
+            1,
+            _time(lambda name=name: _run_scalar(name, members), repeat),
+        )
+
+    record("database.reload", "scalar", "cold", 1, statistics.median(reloads), 1)
+
+    for name, case in _batch_cases().items():
+        record(name, "batch", "warm", 1, _time(lambda case=case: case(columns), repeat))
+
+    for n_workers in workers:
+        if n_workers == 1:
+            continue
+        with ProcessPoolExecutor(n_workers) as executor:
+            chunks = [members[i::n_workers] for i in range(n_workers)]
+            for name in _scalar_cases():
+
+                def parallel(name=name):
+                    list(executor.map(_run_scalar, [name] * n_workers, chunks))
+
+                parallel()
+                record(name, "scalar", "warm", n_workers, _time(parallel, repeat))
+
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "size": size,
+        "repeat": repeat,
+        "samples": samples,
+        "results": results,
+    }
+
+
+def _commit() -> str:
+    """
+    Commit courant, si disponible.
+
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def save(results: dict, path: str):
+    """
+    Enregistre les résultats en JSON.
+
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+
+
+def compare(old: dict, new: dict) -> list[tuple[str, float, float, float]]:
+    """
+    Compare deux résultats.
+
+    Args:
+        old (dict): Résultats de référence.
+        new (dict): Nouveaux résultats.
+
+    Returns:
+        list[tuple]: (mesure, ancien temps par appel, nouveau temps par appel, rapport).
+
+    """
+
+    def key(result):
+        return (
+            f"{result['name']} [{result['mode']}, {result['cache']}, "
+            f"{result['workers']}p]"
+        )
+
+    before = {key(result): result["per_call_us"] for result in old["results"]}
+    rows = []
+    for result in new["results"]:
+        name = key(result)
+        if name in before:
+            rows.append(
+                (
+                    name,
+                    before[name],
+                    result["per_call_us"],
+                    result["per_call_us"] / before[name],
+                )
+            )
+
+    return rows
+
+
+def main(args: list[str] | None = None):
+    """
+    Point d'entrée en ligne de commande.
+
+    """
+    parser = argparse.ArgumentParser(description="Bancs d'essai CSA O86:19.")
+    parser.add_argument("-o", "--output", default="bench.json")
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--compare", help="Résultats de référence (.json).")
+    options = parser.parse_args(args)
+
+    with profiling.from_environment():
+        results = run(
+            options.size, options.repeat, tuple(options.workers), options.samples
+        )
+    save(results, options.output)
+    for result in results["results"]:
+        print(
+            f"{result['name']:<36}{result['mode']:<8}{result['cache']:<6}"
+            f"{result['workers']:>3}p {result['per_call_us']:>12.3f} µs"
+        )
+
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as file:
+            old = json.load(file)
+        print(f"\nComparaison avec {options.compare} ({old.get('commit', '')}):")
+        for name, before, after, ratio in compare(old, results):
+            print(f"{name:<64}{before:>12.3f} -> {after:>12.3f} µs  x{ratio:.2f}")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    main()
+
+
+# END
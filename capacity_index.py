@@ -0,0 +1,870 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Index des résistances précalculées du bois de sciage.
+----------------------------------------------------
+
+Le domaine des sections standard est fini: 12 dimensions nominales x 12 x 1 à 5 plis x les
+lignes de sawn_lumber_strengths qui s'appliquent à la section x 3 durées x les conditions
+d'utilisation. build() calcule Mr, Vr, Qr, Tr et Pr pour toutes ces combinaisons (environ
+1,2 million) et les écrit dans un répertoire, une colonne NumPy (.npy) par valeur. Les
+colonnes sont projetées en mémoire (mmap) à la lecture.
+
+Conditions d'utilisation indexées:
+
+    duration    "courte", "normale" ou "continue".
+    wet         Utilisation en milieu humide.
+    treated     Bois traité et incisé.
+    system      0: aucun, 1: espacement <= 610 mm, 2: espacement <= 610 mm et sous-plancher
+                fixé (voir SYSTEMS). Poutre composée (built_up_beam) si plus d'un pli.
+
+Valeurs (unités de sawn_lumber.Resistances):
+
+    mr          bending_moment avec Kl = 1, N*mm, écrit pour le support latéral complet (d/b
+                <= 9, nan au-delà). get, resistances et query appliquent ensuite le rapport
+                d/b permis par les supports latéraux demandés (aucun par défaut: d/b <= 2,5)
+                et retournent nan au-delà (Kl à valider).
+    vr          shear sans entaille, N.
+    qr          comp_perpendicular, appui de BEARING mm (lb2), N.
+    tr          tensile_parallel sans réduction de section, N.
+    pr_L        comp_parallel avec l_b = l_d = L (LENGTHS), Ke = 1, plis cloués, N.
+                nan si Cc > 50.
+
+Les valeurs sont identiques, bit pour bit, à celles des calculateurs. resistances() lit l'index
+et ne calcule que les combinaisons absentes (cache en lecture). L'index par défaut et le cache
+sont vidés lorsque l'instantané est rechargé (database.reload) ou que l'index est reconstruit.
+
+Usage:
+    python capacity_index.py [répertoire]
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from dataclasses import dataclass
+import functools
+import json
+import math
+import os
+import sys
+import numpy as np
+from database import snapshot
+import profiling
+import sawn_lumber
+import sawn_lumber_batch
+
+# CODE
+DURATIONS = ("courte", "normale", "continue")
+SYSTEMS = ((False, False), (True, False), (True, True))  # (_2ft_spacing, subfloor)
+PLIES = (1, 2, 3, 4, 5)
+LENGTHS = (2438, 3048, 3658)
+BEARING = 38
+KEYS = ("b_nominal", "d_nominal", "strength", "ply", "duration", "wet", "treated")
+KEYS = KEYS + ("system",)
+VALUES = ("mr", "vr", "qr", "tr") + tuple(f"pr_{length}" for length in LENGTHS)
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "capacity_index"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Capacities:
+    """
+    Résistances d'une section (voir l'en-tête du module).
+
+    Args:
+        mr (float): Résistance pondérée au moment de flexion (Kl = 1), N*mm.
+        vr (float): Résistance pondérée au cisaillement, N.
+        qr (float): Résistance pondérée à la compression perpendiculaire au fil, N.
+        tr (float): Résistance pondérée à la traction parallèle au fil, N.
+        pr (tuple[float, ...]): Résistance pondérée à la compression parallèle au fil pour
+            chacune des longueurs de LENGTHS, N.
+
+    """
+
+    mr: float
+    vr: float
+    qr: float
+    tr: float
+    pr: tuple[float, ...]
+
+
+def _factors(
+    b: int,
+    d: int,
+    category: str,
+    ply: int,
+    duration: str,
+    wet_service: bool,
+    treated: bool,
+    system: int,
+) -> dict:
+    """
+    Coefficients de correction de chaque propriété pour une combinaison de l'index.
+
+    """
+    spacing, subfloor = SYSTEMS[system]
+
+    return sawn_lumber.all_modification_factors(
+        b,
+        d,
+        duration,
+        category,
+        wet_service,
+        treated,
+        treated,
+        spacing,
+        subfloor,
+        ply > 1,
+    )
+
+
+def _qr(b, d, ply, kd, kt, kscp, fcp) -> float:
+    """
+    Qr avec un appui de BEARING mm.
+
+    """
+    resistances = sawn_lumber.Resistances(b, d, kd, 1, kt, ply)
+
+    return resistances.comp_perpendicular(lb2=BEARING, kscp=kscp, fcp=fcp)[0]
+
+
+def _tr(b, d, ply, kd, kh, kt, kst, kzt, ft) -> float:
+    """
+    Tr sans réduction de section.
+
+    """
+    return sawn_lumber.Resistances(b, d, kd, kh, kt, ply).tensile_parallel(ft, kst, kzt)
+
+
+def _pr(b, d, ply, kd, kh, kt, ksc, kse, fc, e05, length) -> float:
+    """
+    Pr avec l_b = l_d = length, nan si l'élancement dépasse 50.
+
+    """
+    try:
+        return sawn_lumber.Resistances(b, d, kd, kh, kt, ply).comp_parallel(
+            length, length, fc, e05, ksc, kse
+        )
+    except ValueError:
+        return math.nan
+
+
+def compute(
+    b_nominal: int,
+    d_nominal: int,
+    category: str,
+    specie: str,
+    grade: str,
+    ply: int = 1,
+    duration: str = "normale",
+    wet_service: bool = False,
+    treated: bool = False,
+    system: int = 0,
+    lateral_support: bool = False,
+    compressive_edge_support: bool = False,
+    tensile_edge_support: bool = False,
+    blocking_support: bool = False,
+    tie_rods_support: bool = False,
+) -> Capacities:
+    """
+    Calcule les résistances d'une combinaison avec les calculateurs de sawn_lumber.
+
+    Args:
+        b_nominal (int): Largeur nominale d'un pli, po.
+        d_nominal (int): Hauteur nominale, po.
+        category (str): Catégorie.
+        specie (str): Groupe d'essence.
+        grade (str): Classe.
+        ply (int, optional): Nombre de plis. Default to 1.
+        duration (str, optional): Durée d'application de la charge. Default to "normale".
+        wet_service (bool, optional): Utilisation en milieu humide. Default to False.
+        treated (bool, optional): Bois traité et incisé. Default to False.
+        system (int, optional): Cas de coefficient de système (voir SYSTEMS). Default to 0.
+
+        lateral_support, compressive_edge_support, tensile_edge_support, blocking_support,
+        tie_rods_support (bool, optional): Supports latéraux (voir Resistances.bending_moment).
+            Mr vaut nan lorsque d/b dépasse le rapport permis. Default to False.
+
+    Returns:
+        Capacities: Résistances.
+
+    """
+    b = sawn_lumber.sizes(b_nominal)
+    d = sawn_lumber.sizes(d_nominal)
+    fb, fv, fc, fcp, ft, _, e05 = sawn_lumber.specified_strengths(
+        category, specie, grade
+    )
+    factors = _factors(b, d, category, ply, duration, wet_service, treated, system)
+
+    kd, ksb, kt, kh, kzb = factors["flex"]
+    try:
+        mr = sawn_lumber.Resistances(b, d, kd, kh, kt, ply).bending_moment(
+            fb,
+            ksb,
+            kzb,
+            lateral_support,
+            compressive_edge_support,
+            tensile_edge_support,
+            blocking_support,
+            tie_rods_support,
+        )
+    except Warning:
+        mr = math.nan
+
+    kd, ksv, kt, kh, kzv = factors["cis_v"]
+    vr = sawn_lumber.Resistances(b, d, kd, kh, kt, ply).shear(fv, ksv, 1, kzv)[0]
+
+    kd, kscp, kt, _, _ = factors["comp_perp"]
+    qr = _qr(b, d, ply, kd, kt, kscp, fcp)
+
+    kd, kst, kt, kh, kzt = factors["trac"]
+    tr = _tr(b, d, ply, kd, kh, kt, kst, kzt, ft)
+
+    kd, ksc, kt, kh, _ = factors["comp_para"]
+    kse = factors["moe"][1]
+    pr = tuple(
+        _pr(b, d, ply, kd, kh, kt, ksc, kse, fc, e05, length) for length in LENGTHS
+    )
+
+    return Capacities(mr, vr, qr, tr, pr)
+
+
+def _map_distinct(function, *columns) -> np.ndarray:
+    """
+    Applique une fonction scalaire une seule fois par combinaison distincte d'arguments.
+
+    """
+    memo = {}
+    values = []
+    for args in zip(*(column.tolist() for column in columns)):
+        value = memo.get(args)
+        if value is None:
+            value = memo[args] = function(*args)
+        values.append(value)
+
+    return np.array(values, dtype=float)
+
+
+def _combinations(species: tuple[str, ...] | None) -> dict:
+    """
+    Énumère les combinaisons de l'index, triées par clé.
+
+    """
+    tables = snapshot()
+    nominals = sorted(tables.sizes)
+    strengths = list(tables.strengths)
+    base = []
+    for i, b_nominal in enumerate(nominals):
+        b = sawn_lumber.sizes(b_nominal)
+        for j, d_nominal in enumerate(nominals):
+            d = sawn_lumber.sizes(d_nominal)
+            for k, (category, specie, _) in enumerate(strengths):
+                if species is not None and specie not in species:
+                    continue
+                is_msr, is_mel = category == "MSR", category == "MEL"
+                if sawn_lumber.lumber_category(b, d, is_msr, is_mel) == category:
+                    base.append((i, j, k))
+
+    radices = (len(PLIES), len(DURATIONS), 2, 2, len(SYSTEMS))
+    grid = np.indices(radices).reshape(len(radices), -1)
+    base = np.array(base).T
+    columns = {
+        name: np.repeat(values, grid.shape[1]) for name, values in zip(KEYS[:3], base)
+    }
+    for name, values in zip(KEYS[3:], grid):
+        columns[name] = np.tile(values, base.shape[1])
+    columns["ply"] = columns["ply"] + 1
+
+    return columns
+
+
+def build(
+    path: str = DEFAULT_PATH, species: tuple[str, ...] | None = None
+) -> "CapacityIndex":
+    """
+    Calcule et écrit l'index.
+
+    Args:
+        path (str, optional): Répertoire de l'index. Default to DEFAULT_PATH.
+        species (tuple[str, ...], optional): Groupes d'essence à indexer. Default to tous.
+
+    Returns:
+        CapacityIndex: Index écrit.
+
+    """
+    tables = snapshot()
+    nominals = np.array(sorted(tables.sizes))
+    strengths = list(tables.strengths)
+    columns = _combinations(species)
+
+    dry = sawn_lumber_batch.sizes(nominals)
+    b = dry[columns["b_nominal"]]
+    d = dry[columns["d_nominal"]]
+    ply = columns["ply"]
+    rows = [tables.strengths[key] for key in strengths]
+    category = np.array([row.category for row in rows])[columns["strength"]]
+    fb, fv, fc, fcp, ft, e05 = (
+        np.array([getattr(row, name) for row in rows])[columns["strength"]]
+        for name in ("fb", "fv", "fc", "fcp", "ft", "e05")
+    )
+    spacing = np.array([system[0] for system in SYSTEMS])[columns["system"]]
+    subfloor = np.array([system[1] for system in SYSTEMS])[columns["system"]]
+
+    def factors(prop):
+        return sawn_lumber_batch.modification_factors(
+            b,
+            d,
+            prop,
+            np.array(DURATIONS)[columns["duration"]],
+            category,
+            columns["wet"].astype(bool),
+            columns["treated"].astype(bool),
+            columns["treated"].astype(bool),
+            spacing,
+            subfloor,
+            ply > 1,
+        )
+
+    kd, ksb, kt, kh, kzb = factors("flex")
+    mr, _ = sawn_lumber_batch.bending_moment(
+        b, d, fb, ply, kd, kh, kt, ksb, kzb, True, True, True
+    )
+    kd, ksv, kt, kh, kzv = factors("cis_v")
+    vr, _, _ = sawn_lumber_batch.shear(b, d, fv, ply, kd, kh, kt, ksv, 1, kzv)
+    kd, kscp, kt, _, _ = factors("comp_perp")
+    qr = _map_distinct(_qr, b, d, ply, kd, kt, kscp, fcp)
+    kd, kst, kt, kh, kzt = factors("trac")
+    tr = _map_distinct(_tr, b, d, ply, kd, kh, kt, kst, kzt, ft)
+    kd, ksc, kt, kh, _ = factors("comp_para")
+    kse = factors("moe")[1]
+    values = {"mr": mr, "vr": vr, "qr": qr, "tr": tr}
+    for length in LENGTHS:
+        values[f"pr_{length}"] = _map_distinct(
+            _pr, b, d, ply, kd, kh, kt, ksc, kse, fc, e05, np.full(b.shape, length)
+        )
+
+    key = _key(*(columns[name] for name in KEYS), len(nominals), len(strengths))
+    if np.any(np.diff(key) <= 0):
+        raise ValueError("Les clés de l'index doivent être strictement croissantes.")
+
+    os.makedirs(path, exist_ok=True)
+    data = {
+        "key": key,
+        "b_nominal": columns["b_nominal"].astype(np.int8),
+        "d_nominal": columns["d_nominal"].astype(np.int8),
+        "b": b.astype(np.int16),
+        "d": d.astype(np.int16),
+        "strength": columns["strength"].astype(np.int16),
+        "ply": ply.astype(np.int8),
+        "duration": columns["duration"].astype(np.int8),
+        "wet": columns["wet"].astype(np.int8),
+        "treated": columns["treated"].astype(np.int8),
+        "system": columns["system"].astype(np.int8),
+        **values,
+    }
+    for name, column in data.items():
+        np.save(os.path.join(path, f"{name}.npy"), column)
+    meta = {
+        "nominals": nominals.tolist(),
+        "strengths": strengths,
+        "durations": DURATIONS,
+        "lengths": LENGTHS,
+        "bearing": BEARING,
+        "columns": list(data),
+        "rows": int(key.size),
+    }
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as file:
+        json.dump(meta, file, indent=2)
+
+    return CapacityIndex(path)
+
+
+def _key(
+    b_nominal, d_nominal, strength, ply, duration, wet, treated, system, n_sizes, n_rows
+):
+    """
+    Clé entière d'une combinaison (base mixte, dans l'ordre de KEYS).
+
+    """
+    key = np.asarray(b_nominal, dtype=np.int64) * n_sizes + d_nominal
+    key = key * n_rows + strength
+    key = key * len(PLIES) + (np.asarray(ply) - 1)
+    key = key * len(DURATIONS) + duration
+    key = key * 2 + wet
+    key = key * 2 + treated
+
+    return key * len(SYSTEMS) + system
+
+
+def _criteria(
+    lateral_support: bool,
+    compressive_edge_support: bool,
+    tensile_edge_support: bool,
+    blocking_support: bool,
+    tie_rods_support: bool,
+) -> float:
+    """
+    Rapport d/b maximal sans calcul de Kl (6.5.3.2.4, voir Resistances.bending_moment).
+
+    """
+    criteria = 2.5
+    if lateral_support:
+        criteria = 4
+        if compressive_edge_support:
+            criteria = 6.5
+            if tensile_edge_support:
+                criteria = 9
+            elif blocking_support:
+                criteria = 7.5
+        elif tie_rods_support:
+            criteria = 5
+
+    return criteria
+
+
+class CapacityIndex:
+    """
+    Index des résistances écrit par build(), projeté en mémoire.
+
+    Args:
+        path (str, optional): Répertoire de l'index. Default to DEFAULT_PATH.
+
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as file:
+            meta = json.load(file)
+        self.path = path
+        self.nominals = tuple(meta["nominals"])
+        self.strengths = tuple(tuple(key) for key in meta["strengths"])
+        self.lengths = tuple(meta["lengths"])
+        self.bearing = meta["bearing"]
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in meta["columns"]
+        }
+        self._nominal_index = {nominal: i for i, nominal in enumerate(self.nominals)}
+        self._strength_index = {key: i for i, key in enumerate(self.strengths)}
+
+    def __len__(self) -> int:
+        return len(self.columns["key"])
+
+    def is_current(self) -> bool:
+        """
+        Vérifie que l'index correspond à csa_o86_19.db et aux constantes du module.
+
+        """
+        tables = snapshot()
+        return (
+            self.nominals == tuple(sorted(tables.sizes))
+            and self.strengths == tuple(tables.strengths)
+            and self.lengths == LENGTHS
+            and self.bearing == BEARING
+        )
+
+    def get(
+        self,
+        b_nominal: int,
+        d_nominal: int,
+        category: str,
+        specie: str,
+        grade: str,
+        ply: int = 1,
+        duration: str = "normale",
+        wet_service: bool = False,
+        treated: bool = False,
+        system: int = 0,
+        lateral_support: bool = False,
+        compressive_edge_support: bool = False,
+        tensile_edge_support: bool = False,
+        blocking_support: bool = False,
+        tie_rods_support: bool = False,
+    ) -> Capacities | None:
+        """
+        Résistances d'une combinaison (voir compute), None si elle n'est pas indexée.
+
+        Mr vaut nan lorsque d/b dépasse le rapport permis par les supports latéraux.
+
+        Les conditions hors des valeurs indexées (ex: ply = 6, system = 3) retournent None:
+        sans cette vérification, un chiffre hors limites de la clé (base mixte) désignerait
+        une autre combinaison.
+
+        """
+        if (
+            ply not in PLIES
+            or system not in range(len(SYSTEMS))
+            or wet_service not in (False, True)
+            or treated not in (False, True)
+            or duration not in DURATIONS
+        ):
+            return None
+        try:
+            key = _key(
+                self._nominal_index[b_nominal],
+                self._nominal_index[d_nominal],
+                self._strength_index[(category, specie, grade)],
+                ply,
+                DURATIONS.index(duration),
+                int(wet_service),
+                int(treated),
+                system,
+                len(self.nominals),
+                len(self.strengths),
+            )
+        except (KeyError, ValueError):
+            return None
+        keys = self.columns["key"]
+        i = int(np.searchsorted(keys, key))
+        if i == len(keys) or keys[i] != key:
+            return None
+        row = {name: float(self.columns[name][i]) for name in VALUES}
+        criteria = _criteria(
+            lateral_support,
+            compressive_edge_support,
+            tensile_edge_support,
+            blocking_support,
+            tie_rods_support,
+        )
+        b = int(self.columns["b"][i]) * int(self.columns["ply"][i])
+        if int(self.columns["d"][i]) / b > criteria:
+            row["mr"] = math.nan
+
+        return Capacities(
+            row["mr"],
+            row["vr"],
+            row["qr"],
+            row["tr"],
+            tuple(row[f"pr_{length}"] for length in self.lengths),
+        )
+
+    def query(
+        self,
+        category: str | None = None,
+        specie: str | None = None,
+        grade: str | None = None,
+        ply: int | None = None,
+        duration: str = "normale",
+        wet_service: bool = False,
+        treated: bool = False,
+        system: int = 0,
+        length: int | None = None,
+        lateral_support: bool = False,
+        compressive_edge_support: bool = False,
+        tensile_edge_support: bool = False,
+        blocking_support: bool = False,
+        tie_rods_support: bool = False,
+        **bounds: tuple[float | None, float | None],
+    ) -> np.recarray:
+        """
+        Recherche par intervalles.
+
+        Args:
+            category, specie, grade, ply (optional): Filtres. Default to tous.
+            duration, wet_service, treated, system (optional): Conditions (voir compute).
+            length (int, optional): Longueur de LENGTHS pour la borne pr.
+
+            lateral_support, compressive_edge_support, tensile_edge_support, blocking_support,
+            tie_rods_support (bool, optional): Supports latéraux. Mr vaut nan lorsque d/b
+                dépasse le rapport permis (voir Resistances.bending_moment).
+
+            **bounds: Intervalles (min, max) sur mr, vr, qr, tr ou pr, bornes incluses. None
+                pour une borne ouverte.
+
+        Returns:
+            np.recarray: Sections trouvées (b_nominal, d_nominal, ply, category, specie, grade,
+            mr, vr, qr, tr, pr).
+
+        Raises:
+            ValueError: Si une borne n'est pas reconnue ou si length manque pour pr.
+
+        Example:
+            index.query(specie="spf", grade="n1-n2", mr=(10e6, None))
+
+        """
+        columns = self.columns
+        mask = columns["duration"] == DURATIONS.index(duration)
+        mask &= columns["wet"] == int(wet_service)
+        mask &= columns["treated"] == int(treated)
+        mask &= columns["system"] == system
+        if ply is not None:
+            mask &= columns["ply"] == ply
+        rows = [
+            k
+            for k, key in enumerate(self.strengths)
+            if category in (None, key[0])
+            and specie in (None, key[1])
+            and grade in (None, key[2])
+        ]
+        mask &= np.isin(columns["strength"], rows)
+
+        pr_name = None if length is None else f"pr_{length}"
+        if pr_name is not None and pr_name not in columns:
+            raise ValueError(f"Longueur non indexée: {length}")
+        index = np.flatnonzero(mask)
+
+        criteria = _criteria(
+            lateral_support,
+            compressive_edge_support,
+            tensile_edge_support,
+            blocking_support,
+            tie_rods_support,
+        )
+        b = columns["b"][index] * columns["ply"][index].astype(np.int16)
+        mr = np.where(columns["d"][index] / b > criteria, np.nan, columns["mr"][index])
+        values = {name: columns[name][index] for name in ("vr", "qr", "tr")}
+        values["mr"] = mr
+        values["pr"] = (
+            columns[pr_name][index] if pr_name else np.full(index.shape, np.nan)
+        )
+
+        keep = np.ones(index.shape, dtype=bool)
+        for name, (low, high) in bounds.items():
+            if name not in values:
+                raise ValueError(f"Borne inconnue: {name}")
+            if name == "pr" and pr_name is None:
+                raise ValueError("La longueur est requise pour une borne sur pr.")
+            if low is not None:
+                keep &= values[name] >= low
+            if high is not None:
+                keep &= values[name] <= high
+
+        strength = columns["strength"][index][keep]
+        keys = np.array(self.strengths)[strength] if strength.size else np.empty((0, 3))
+
+        return np.rec.fromarrays(
+            (
+                np.asarray(self.nominals)[columns["b_nominal"][index][keep]],
+                np.asarray(self.nominals)[columns["d_nominal"][index][keep]],
+                columns["ply"][index][keep],
+                keys[:, 0],
+                keys[:, 1],
+                keys[:, 2],
+                *(values[name][keep] for name in ("mr", "vr", "qr", "tr", "pr")),
+            ),
+            names=(
+                "b_nominal",
+                "d_nominal",
+                "ply",
+                "category",
+                "specie",
+                "grade",
+                "mr",
+                "vr",
+                "qr",
+                "tr",
+                "pr",
+            ),
+        )
+
+
+_DEFAULT: tuple = (None, None, None)  # (instantané, état de meta.json, index)
+
+
+def default_index() -> CapacityIndex | None:
+    """
+    Index de DEFAULT_PATH, None s'il n'a pas été construit ou s'il n'est plus à jour.
+
+    L'index est relu lorsque l'instantané est rechargé ou que meta.json est réécrit (build),
+    et le cache de resistances est alors vidé.
+
+    """
+    global _DEFAULT  # pylint: disable=global-statement
+    current = snapshot()
+    meta = os.path.join(DEFAULT_PATH, "meta.json")
+    try:
+        stat = os.stat(meta)
+        state = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        state = None
+    if _DEFAULT[0] is not current or _DEFAULT[1] != state:
+        index = None
+        if state is not None:
+            index = CapacityIndex(DEFAULT_PATH)
+            index = index if index.is_current() else None
+        _resistances.cache_clear()
+        _DEFAULT = (current, state, index)
+
+    return _DEFAULT[2]
+
+
+@functools.lru_cache(maxsize=4096)
+def _resistances(*args) -> Capacities:
+    """
+    Résistances d'une combinaison de resistances (mémorisées pour l'index par défaut).
+
+    """
+    index = _DEFAULT[2]
+    if index is not None:
+        found = index.get(*args)
+        if found is not None:
+            return found
+
+    return compute(*args)
+
+
+def resistances(
+    b_nominal: int,
+    d_nominal: int,
+    category: str,
+    specie: str,
+    grade: str,
+    ply: int = 1,
+    duration: str = "normale",
+    wet_service: bool = False,
+    treated: bool = False,
+    system: int = 0,
+    lateral_support: bool = False,
+    compressive_edge_support: bool = False,
+    tensile_edge_support: bool = False,
+    blocking_support: bool = False,
+    tie_rods_support: bool = False,
+) -> Capacities:
+    """
+    Résistances d'une combinaison: lues dans l'index, sinon calculées (voir compute).
+
+    """
+    default_index()
+
+    return _resistances(
+        b_nominal,
+        d_nominal,
+        category,
+        specie,
+        grade,
+        ply,
+        duration,
+        wet_service,
+        treated,
+        system,
+        lateral_support,
+        compressive_edge_support,
+        tensile_edge_support,
+        blocking_support,
+        tie_rods_support,
+    )
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour l'index des résistances.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import itertools
+    import random
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as path:
+        index = build(path, species=("spf",))
+
+        # Test get against compute
+        rng = random.Random(86)
+        keys = index.columns["key"]
+        for i in rng.sample(range(len(keys)), 300):
+            row = {name: int(index.columns[name][i]) for name in KEYS}
+            args = (
+                index.nominals[row["b_nominal"]],
+                index.nominals[row["d_nominal"]],
+                *index.strengths[row["strength"]],
+                row["ply"],
+                DURATIONS[row["duration"]],
+                bool(row["wet"]),
+                bool(row["treated"]),
+                row["system"],
+            )
+            test_get = index.get(*args)
+            expected_result = compute(*args)
+            assert repr(test_get) == repr(
+                expected_result
+            ), f"get -> FAILED\n {args = }\n {expected_result = }\n {test_get = }"
+
+        # Test get lateral support criteria (2x12: d/b = 7.5)
+        args = (2, 12, "Lumber", "spf", "n1-n2")
+        test_get = index.get(*args).mr
+        assert math.isnan(test_get), f"get criteria -> FAILED\n {test_get = }"
+        test_get = index.get(*args, lateral_support=True, compressive_edge_support=True)
+        assert math.isnan(test_get.mr), f"get criteria -> FAILED\n {test_get = }"
+        test_get = index.get(*args, 1, "normale", False, False, 0, True, True, True)
+        expected_result = compute(
+            *args, 1, "normale", False, False, 0, True, True, True
+        )
+        assert repr(test_get) == repr(
+            expected_result
+        ), f"get criteria -> FAILED\n {expected_result = }\n {test_get = }"
+
+        # Test get outside of the indexed conditions
+        for kwargs in (
+            {"ply": 6},
+            {"system": 3},
+            {"wet_service": 2},
+            {"duration": "x"},
+        ):
+            test_get = index.get(2, 8, "Lumber", "spf", "n1-n2", **kwargs)
+            assert test_get is None, f"get {kwargs} -> FAILED\n {test_get = }"
+
+        # Test query against a brute-force search
+        test_query = index.query(
+            specie="spf", grade="n1-n2", mr=(10e6, None), lateral_support=True
+        )
+        expected_result = []
+        for (category, specie, grade), b_nominal, d_nominal, ply in itertools.product(
+            index.strengths, index.nominals, index.nominals, PLIES
+        ):
+            b = sawn_lumber.sizes(b_nominal)
+            d = sawn_lumber.sizes(d_nominal)
+            is_msr, is_mel = category == "MSR", category == "MEL"
+            if (
+                (specie, grade) == ("spf", "n1-n2")
+                and sawn_lumber.lumber_category(b, d, is_msr, is_mel) == category
+                and d / (b * ply) <= 4
+            ):
+                mr = compute(
+                    b_nominal,
+                    d_nominal,
+                    category,
+                    specie,
+                    grade,
+                    ply,
+                    lateral_support=True,
+                ).mr
+                if mr >= 10e6:
+                    expected_result.append((b_nominal, d_nominal, ply, category, mr))
+        test_rows = sorted(tuple(row[:4]) + (row[6],) for row in test_query.tolist())
+        assert test_rows == sorted(
+            expected_result
+        ), f"query -> FAILED\n {expected_result = }\n {test_rows = }"
+
+    # Test resistances outside of the indexed conditions (mixed-radix key out of range)
+    for kwargs in ({"ply": 6}, {"wet_service": 2}):
+        args = (2, 8, "Lumber", "spf", "n1-n2")
+        test_resistances = resistances(*args, **kwargs)
+        expected_result = compute(*args, **kwargs)
+        assert repr(test_resistances) == repr(
+            expected_result
+        ), f"resistances {kwargs} -> FAILED\n {expected_result = }\n {test_resistances = }"
+
+    # Test resistances cache invalidation on reload
+    import database
+
+    resistances(2, 8, "Lumber", "spf", "n1-n2")
+    database.reload()
+    default_index()
+    test_currsize = _resistances.cache_info().currsize
+    assert test_currsize == 0, f"resistances reload -> FAILED\n {test_currsize = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    with profiling.from_environment():
+        built = build(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
+    print(f"{len(built)} combinaisons -> {built.path}")
+
+
+# END
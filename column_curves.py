@@ -0,0 +1,298 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Courbes de résistance des poteaux, Pr en fonction de la longueur non contreventée.
+----------------------------------------------------
+
+Construit la courbe Pr(L) (6.5.5) d'un grand nombre de sections à la fois, de l_min jusqu'à la
+limite d'élancement (Cc = 50, ou 80 avec cales d'espacement), avec l_d = L et l_b = L ou une
+longueur fixe (ex: montants retenus par le revêtement).
+
+Échantillonnage adaptatif: chaque intervalle est coupé en quatre tant que Pr à l'un des quarts
+s'écarte de l'interpolation linéaire de plus de tolerance x Pr(l_min). Les points se concentrent
+donc près de la transition d'élancement (Kc, Kzc), là où la courbe change de pente. Tous les
+points de toutes les sections sont évalués à chaque passe par sawn_lumber_batch.comp_parallel;
+les valeurs aux points sont identiques à celles de Resistances.comp_parallel.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from dataclasses import dataclass
+import numpy as np
+import sawn_lumber_batch
+from sawn_lumber_batch import Status
+
+
+# CODE
+@dataclass(frozen=True)
+class ColumnCurve:
+    """
+    Courbe Pr(L) d'une section.
+
+    Args:
+        lengths (np.ndarray): Longueurs non contreventées croissantes, mm.
+        pr (np.ndarray): Résistance pondérée à la compression parallèle au fil, N.
+        status (int): Code d'état à l_min (voir Status). La courbe est vide si différent de
+            Status.OK.
+
+    """
+
+    lengths: np.ndarray
+    pr: np.ndarray
+    status: int
+
+    @property
+    def limit(self) -> float:
+        """
+        Longueur maximale de la courbe, mm (limite d'élancement ou l_max).
+
+        """
+        return float(self.lengths[-1]) if self.lengths.size else float("nan")
+
+    def __call__(self, length):
+        """
+        Pr interpolé linéairement, nan hors de la courbe.
+
+        Args:
+            length (array_like): Longueurs, mm.
+
+        Returns:
+            np.ndarray: Pr, N.
+
+        """
+        if not self.lengths.size:
+            return np.full(np.shape(length), np.nan)
+        return np.interp(length, self.lengths, self.pr, left=np.nan, right=np.nan)
+
+
+def curves(
+    b,
+    d,
+    fc,
+    e05,
+    ply=1,
+    kd=1,
+    kh=1,
+    kt=1,
+    ksc=1,
+    kse=1,
+    end_in_translation=False,
+    end_in_rotation=2,
+    connectors="clous",
+    spacers=False,
+    glulam=False,
+    l_b=None,
+    l_min=300,
+    l_max=None,
+    tolerance: float = 0.002,
+    resolution: float = 1,
+    initial_points: int = 9,
+    limit_tolerance: float = 0.001,
+) -> list[ColumnCurve]:
+    """
+    Courbes Pr(L) de plusieurs sections.
+
+    Args:
+        b, d, fc, e05, ply, kd, kh, kt, ksc, kse, end_in_translation, end_in_rotation,
+        connectors, spacers, glulam (array_like): Sections, voir
+            sawn_lumber_batch.comp_parallel. Diffusés ensemble.
+
+        l_b (array_like, optional): Longueur fixe entre les appuis latéraux pour l'axe faible,
+            mm. nan ou None pour l_b = L. Default to None.
+        l_min (array_like, optional): Longueur minimale, mm. Default to 300.
+        l_max (array_like, optional): Longueur maximale, mm. Default to la limite
+            d'élancement.
+
+        tolerance (float, optional): Écart relatif maximal (par rapport à Pr(l_min)) entre Pr
+            et l'interpolation linéaire aux quarts d'un intervalle. Default to 0.002.
+        resolution (float, optional): Longueur minimale d'un intervalle, mm. Default to 1.
+        initial_points (int, optional): Points de la grille initiale. Default to 9.
+        limit_tolerance (float, optional): Précision de la limite d'élancement, mm. La
+            limite retournée est valide et la limite exacte est à moins de limit_tolerance
+            au-delà. Default to 0.001.
+
+    Returns:
+        list[ColumnCurve]: Une courbe par section, dans l'ordre aplati des arguments diffusés.
+
+    Example:
+        curves(38, [89, 140], 11.5, 6500, ply=1)[1](3048) retourne Pr d'un 2x6 de 3048 mm.
+
+    """
+    arrays = np.broadcast_arrays(
+        *map(
+            np.asarray,
+            (
+                b,
+                d,
+                fc,
+                e05,
+                ply,
+                kd,
+                kh,
+                kt,
+                ksc,
+                kse,
+                end_in_translation,
+                end_in_rotation,
+                connectors,
+                spacers,
+                glulam,
+                np.nan if l_b is None else l_b,
+                l_min,
+                np.inf if l_max is None else l_max,
+            ),
+        )
+    )
+    *sections, fixed_l_b, l_min, l_max = (array.ravel() for array in arrays)
+    l_min = l_min.astype(float)
+    l_max = l_max.astype(float)
+
+    def evaluate(index, length):
+        l_b = np.where(np.isnan(fixed_l_b[index]), length, fixed_l_b[index])
+        section = [values[index] for values in sections]
+        return sawn_lumber_batch.comp_parallel(
+            section[0], section[1], l_b, length, *section[2:]
+        )
+
+    everything = np.arange(l_min.size)
+    pr_min, status = evaluate(everything, l_min)
+    valid = status == Status.OK
+
+    # Limite d'élancement: premier doublement hors limite, puis bissection.
+    low = l_min.copy()
+    high = np.minimum(2 * l_min, l_max)
+    _, high_status = evaluate(everything, high)
+    growing = valid & (high_status == Status.OK) & (high < l_max)
+    while growing.any():
+        low[growing] = high[growing]
+        high[growing] = np.minimum(2 * high[growing], l_max[growing])
+        _, high_status[growing] = evaluate(everything[growing], high[growing])
+        growing &= (high_status == Status.OK) & (high < l_max)
+    bounded = valid & (high_status == Status.OK)
+    low[bounded] = high[bounded]
+    searching = valid & ~bounded
+    while searching.any():
+        index = everything[searching]
+        middle = (low[index] + high[index]) / 2
+        _, middle_status = evaluate(index, middle)
+        fits = middle_status == Status.OK
+        low[index[fits]] = middle[fits]
+        high[index[~fits]] = middle[~fits]
+        searching[index] = high[index] - low[index] > limit_tolerance
+    limit = low
+
+    # Grille initiale.
+    index = np.repeat(everything[valid], initial_points)
+    fraction = np.tile(np.linspace(0, 1, initial_points), int(valid.sum()))
+    lengths = l_min[index] + fraction * (limit[index] - l_min[index])
+    last = fraction == 1
+    lengths[last] = limit[index[last]]
+    pr, _ = evaluate(index, lengths)
+    points = [(index, lengths, pr)]
+
+    # Raffinement des intervalles: Pr est évalué aux quarts de chaque intervalle (un seul
+    # point au milieu peut tomber par hasard sur la corde de part et d'autre d'un saut).
+    quarters = np.array([0.25, 0.5, 0.75])
+    step = np.flatnonzero(index[1:] == index[:-1])
+    section, l_left, l_right = index[step], lengths[step], lengths[step + 1]
+    pr_left, pr_right = pr[step], pr[step + 1]
+    while section.size:
+        width = l_right - l_left
+        middle = l_left[:, None] + quarters * width[:, None]
+        pr_middle, _ = evaluate(np.repeat(section, quarters.size), middle.ravel())
+        pr_middle = pr_middle.reshape(middle.shape)
+        points.append(
+            (np.repeat(section, quarters.size), middle.ravel(), pr_middle.ravel())
+        )
+
+        chord = pr_left[:, None] + quarters * (pr_right - pr_left)[:, None]
+        error = np.max(np.abs(pr_middle - chord), axis=1)
+        split = (error > tolerance * pr_min[section]) & (width > 4 * resolution)
+
+        # Chaque intervalle à raffiner devient quatre intervalles.
+        ends_l = np.column_stack((l_left, middle, l_right))[split]
+        ends_pr = np.column_stack((pr_left, pr_middle, pr_right))[split]
+        section = np.repeat(section[split], 4)
+        l_left, l_right = ends_l[:, :-1].ravel(), ends_l[:, 1:].ravel()
+        pr_left, pr_right = ends_pr[:, :-1].ravel(), ends_pr[:, 1:].ravel()
+
+    index, lengths, pr = (np.concatenate(values) for values in zip(*points))
+    order = np.lexsort((lengths, index))
+    index, lengths, pr = index[order], lengths[order], pr[order]
+    bounds = np.searchsorted(index, everything, side="left")
+    ends = np.searchsorted(index, everything, side="right")
+
+    return [
+        ColumnCurve(lengths[start:end], pr[start:end], int(code))
+        for start, end, code in zip(bounds.tolist(), ends.tolist(), status.tolist())
+    ]
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour les courbes de résistance des poteaux.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import itertools
+    import sawn_lumber
+
+    sections = list(
+        itertools.product((38, 89), (89, 140, 184), (1, 2, 3), (False, True))
+    )
+    b, d, ply, spacers = (np.array(values) for values in zip(*sections))
+    test_curves = curves(b, d, 11.5, 6500, ply, 1, 1.1, 1, 0.91, 0.94, spacers=spacers)
+
+    for (b, d, ply, spacers), curve in zip(sections, test_curves):
+
+        def scalar(length, b=b, d=d, ply=ply, spacers=spacers):
+            resistances = sawn_lumber.Resistances(b, d, 1, 1.1, 1, ply)
+            return resistances.comp_parallel(
+                length, length, 11.5, 6500, 0.91, 0.94, spacers=spacers
+            )
+
+        # Test points against Resistances.comp_parallel
+        test_points = curve.pr.tolist()
+        expected_result = [scalar(length) for length in curve.lengths.tolist()]
+        assert (
+            test_points == expected_result
+        ), f"curves -> FAILED\n {expected_result = }\n {test_points = }"
+
+        # Test limit
+        try:
+            scalar(curve.limit + 1e-3)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"curves limit -> FAILED\n {curve.limit = }")
+
+        # Test interpolation
+        dense = np.linspace(300, curve.limit, 2000)
+        expected_result = np.array([scalar(length) for length in dense.tolist()])
+        test_interpolation = curve(dense)
+        error = np.max(np.abs(test_interpolation - expected_result)) / curve.pr[0]
+        assert error < 0.004 and curve.lengths.size < 400, (
+            f"curves interpolation -> FAILED\n {error = }\n" f" {curve.lengths.size = }"
+        )
+
+    # Test invalid section
+    test_status = curves(38, 89, 11.5, 6500, ply=6)[0].status
+    expected_result = Status.PLY
+    assert (
+        test_status == expected_result
+    ), f"curves status -> FAILED\n {expected_result = }\n {test_status = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
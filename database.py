@@ -0,0 +1,331 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Base de données csa_o86_19.db.
+----------------------------------------------------
+
+Tables:
+
+    sawn_lumber_strengths -> Tableaux 6.4 à 6.9.
+
+    lumber_sizes -> Tableau A.3.
+
+    subfloor_properties -> Tableau A.1.
+
+Les tables ne changent pas en cours d'exécution. Elles sont chargées une seule fois dans un
+instantané immuable (voir snapshot) et toutes les recherches sont faites en mémoire.
+
+La connexion (voir engine et session) n'est créée qu'à la première recherche et est partagée
+par tous les modules. SQLAlchemy n'est importé qu'à ce moment.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+import os
+import threading
+
+
+# CODE
+@dataclass(frozen=True)
+class StrengthsRow:
+    """
+    Ligne de la table sawn_lumber_strengths.
+
+    Args:
+        category (str): Catégorie.
+        specie (str): Groupe d'essence.
+        grade (str): Classe.
+        fb (float): Résistance prévue en flexion, MPa.
+        fv (float): Résistance prévue en cisaillement longitudinal, MPa.
+        fc (float): Résistance prévue en compression parallèle au fil, MPa.
+        fcp (float): Résistance prévue en compression perpendiculaire au fil, MPa.
+        ft (float): Résistance prévue en traction parallèle au fil, MPa.
+        e (int): Module d'élasticité prévu, MPa.
+        e05 (int): Module d'élasticité pour les calculs des éléments en compression, MPa.
+
+    """
+
+    category: str
+    specie: str
+    grade: str
+    fb: float
+    fv: float
+    fc: float
+    fcp: float
+    ft: float
+    e: int
+    e05: int
+
+
+@dataclass(frozen=True)
+class SizesRow:
+    """
+    Ligne de la table lumber_sizes.
+
+    Args:
+        nominal (int): Dimension nominale, po.
+        dry (int): Dimension nette du bois sec, mm.
+        green (int): Dimension nette du bois vert, mm.
+        dry_brut (int): Dimension brute du bois sec, mm.
+        green_brut (int): Dimension brute du bois vert, mm.
+
+    """
+
+    nominal: int
+    dry: int
+    green: int
+    dry_brut: int
+    green_brut: int
+
+
+@dataclass(frozen=True)
+class SubfloorRow:
+    """
+    Ligne de la table subfloor_properties (Tableau A.1).
+
+    Args:
+        panel (str): Panneau de sous-plancher.
+        ts (float): Épaisseur du panneau, mm.
+        eis_par (int): Rigidité en flexion parallèle, N*m2/m.
+        eis_perp (int): Rigidité en flexion perpendiculaire, N*m2/m.
+        eas_par (float): Rigidité axiale parallèle, N/m.
+        eas_perp (float): Rigidité axiale perpendiculaire, N/m.
+        rho_s (int): Densité du panneau, kg/m3.
+
+    """
+
+    panel: str
+    ts: float
+    eis_par: int
+    eis_perp: int
+    eas_par: float
+    eas_perp: float
+    rho_s: int
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Instantané immuable des tables de csa_o86_19.db.
+
+    Args:
+        strengths (Mapping): Lignes de sawn_lumber_strengths par (category, specie, grade).
+        sizes (Mapping): Lignes de lumber_sizes par nominal.
+        subfloors (Mapping): Lignes de subfloor_properties par panel.
+
+    """
+
+    strengths: Mapping[tuple[str, str, str], StrengthsRow]
+    sizes: Mapping[float, SizesRow]
+    subfloors: Mapping[str, SubfloorRow]
+
+
+DB_URL = "sqlite:///" + os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "csa_o86_19.db"
+)
+
+_ENGINE = None
+_SESSION = None
+_ENGINE_LOCK = threading.Lock()
+
+_SNAPSHOT: Snapshot | None = None
+_LOCK = threading.Lock()
+
+
+def engine():
+    """
+    Retourne le moteur SQLAlchemy partagé, créé au premier appel.
+
+    Returns:
+        sqlalchemy.Engine: Moteur de csa_o86_19.db.
+
+    """
+    global _ENGINE, _SESSION  # pylint: disable=global-statement
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                # pylint: disable=import-outside-toplevel
+                from sqlalchemy import create_engine, orm
+
+                new_engine = create_engine(DB_URL)
+                _SESSION = orm.scoped_session(orm.sessionmaker(new_engine))
+                _ENGINE = new_engine
+
+    return _ENGINE
+
+
+def session():
+    """
+    Retourne la session du fil d'exécution courant.
+
+    Returns:
+        sqlalchemy.orm.Session: Session liée au moteur partagé.
+
+    """
+    engine()
+
+    return _SESSION()  # type: ignore
+
+
+def _after_fork():
+    """
+    Abandonne les connexions héritées du processus parent.
+
+    """
+    if _ENGINE is not None:
+        _ENGINE.dispose(close=False)
+        _SESSION.remove()  # type: ignore
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _load() -> Snapshot:
+    """
+    Lit les trois tables de csa_o86_19.db.
+
+    Returns:
+        Snapshot: Instantané des tables.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from tables import SawnLumberStrengths, LumberSizes, SubfloorProperties
+
+    current = session()
+    try:
+        strengths = {}
+        query = current.query(SawnLumberStrengths).order_by(SawnLumberStrengths.index)
+        for row in query:
+            key = (row.category, row.specie, row.grade)
+            strengths.setdefault(
+                key,
+                StrengthsRow(
+                    category=row.category,
+                    specie=row.specie,
+                    grade=row.grade,
+                    fb=row.fb,
+                    fv=row.fv,
+                    fc=row.fc,
+                    fcp=row.fcp,
+                    ft=row.ft,
+                    e=row.e,
+                    e05=row.e05,
+                ),
+            )
+
+        sizes = {}
+        for row in current.query(LumberSizes).order_by(LumberSizes.nominal):
+            sizes.setdefault(
+                row.nominal,
+                SizesRow(
+                    nominal=row.nominal,
+                    dry=row.dry,
+                    green=row.green,
+                    dry_brut=row.dry_brut,
+                    green_brut=row.green_brut,
+                ),
+            )
+
+        subfloors = {}
+        for row in current.query(SubfloorProperties):
+            subfloors.setdefault(
+                row.panel,
+                SubfloorRow(
+                    panel=row.panel,
+                    ts=row.ts,
+                    eis_par=row.eis_par,
+                    eis_perp=row.eis_perp,
+                    eas_par=row.eas_par,
+                    eas_perp=row.eas_perp,
+                    rho_s=row.rho_s,
+                ),
+            )
+    finally:
+        _SESSION.remove()  # type: ignore
+
+    return Snapshot(
+        strengths=MappingProxyType(strengths),
+        sizes=MappingProxyType(sizes),
+        subfloors=MappingProxyType(subfloors),
+    )
+
+
+def snapshot() -> Snapshot:
+    """
+    Retourne l'instantané des tables, chargé au premier appel.
+
+    Returns:
+        Snapshot: Instantané des tables.
+
+    """
+    global _SNAPSHOT  # pylint: disable=global-statement
+    if _SNAPSHOT is None:
+        with _LOCK:
+            if _SNAPSHOT is None:
+                _SNAPSHOT = _load()
+
+    return _SNAPSHOT
+
+
+def reload() -> Snapshot:
+    """
+    Relit csa_o86_19.db, à utiliser lorsque le fichier est mis à jour.
+
+    Returns:
+        Snapshot: Nouvel instantané des tables.
+
+    """
+    global _SNAPSHOT  # pylint: disable=global-statement
+    with _LOCK:
+        _SNAPSHOT = _load()
+
+    return _SNAPSHOT
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour l'instantané de la base de données.
+
+    """
+    # Test snapshot
+    test_snapshot = snapshot()
+    expected_result = (80, 12, 21)
+    test_counts = (
+        len(test_snapshot.strengths),
+        len(test_snapshot.sizes),
+        len(test_snapshot.subfloors),
+    )
+    assert (
+        test_counts == expected_result
+    ), f"snapshot -> FAILED\n {expected_result = }\n {test_counts = }"
+
+    # Test reload
+    test_reload = reload()
+    assert (
+        test_reload is snapshot() and test_reload == test_snapshot
+    ), f"reload -> FAILED\n {test_reload = }"
+
+    # Test strengths
+    test_strengths = test_snapshot.strengths[("Beam", "spf", "ss")].fb
+    expected_result = 13.6
+    assert (
+        test_strengths == expected_result
+    ), f"strengths -> FAILED\n {expected_result = }\n {test_strengths = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
@@ -37,32 +37,85 @@ ________________________________________________________________________________
 
 # IMPORTS
 import math
-from dataclasses import dataclass
-from sqlalchemy import orm, create_engine, Column, TEXT, REAL, INTEGER
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from database import snapshot
 
 
-# DB CONNECTION
-@dataclass
-class SubfloorProperties(orm.declarative_base()):
+# CODE
+class _cached_property(cached_property):  # pylint: disable=invalid-name
     """
-    Se connecte à la table subfloor_properties de csa_o86_19.db.
+    functools.cached_property sans le verrou de Python < 3.12, trop coûteux pour des calculs
+    de quelques microsecondes.
+
+    Les valeurs sont conservées dans l'attribut _cache de l'instance (créé au premier calcul),
+    ce qui permet les classes avec __slots__.
 
     """
 
-    __tablename__ = "subfloor_properties"
-    panel: str = Column("panel", TEXT, primary_key=True)  # type: ignore
-    ts: float = Column("ts", REAL)  # type: ignore
-    eis_par: int = Column("EIs_par", INTEGER)  # type: ignore
-    eis_perp: int = Column("EIs_perp", INTEGER)  # type: ignore
-    eas_par: float = Column("EAs_par", REAL)  # type: ignore
-    eas_perp: float = Column("Eas_perp", REAL)  # type: ignore
-    rho_s: int = Column("rho_s", INTEGER)  # type: ignore
-    engine = create_engine("sqlite:///csa_o86_19.db")
-    Session = orm.sessionmaker(engine)
-    session = Session()
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        cache = instance._cache
+        if cache is None:
+            cache = {}
+            object.__setattr__(instance, "_cache", cache)
+        elif self.attrname in cache:
+            return cache[self.attrname]
+        value = cache[self.attrname] = self.func(instance)
+
+        return value
+
+
+@dataclass(frozen=True, slots=True)
+class Check:
+    """
+    Résultat numérique d'une vérification.
+
+    Args:
+        ratio (float): Taux d'utilisation (valeur / limite).
+        passed (bool): Critère satisfait, selon la règle de la vérification qui le calcule
+            (ex: limit_states_check arrondit le taux au pourcent, un taux de 0.995 à 1 n'est
+            donc pas satisfait). Ne pas recalculer à partir de ratio <= 1.
+        limit (float): Valeur limite (résistance, critère ou portée maximale).
+        value (float): Valeur déterminante (charge, critère calculé ou portée).
+
+    """
+
+    ratio: float
+    passed: bool
+    limit: float
+    value: float
+
+
+def limit_states_check(load: float | None, resistance: float) -> Check | None:
+    """
+    5.1 Calculs aux états limites.
+
+    Args:
+        load (float|None): Charge pondérée ou charge spécifiée.
+        resistance (float|None): Résistance correspondante.
+
+    Returns:
+        Check|None: Vérification de la résistance, None si aucune charge n'est spécifiée.
+
+    Le critère est celui du message de limit_states_design: le taux arrondi au pourcent doit
+    être inférieur à 100% (un taux de 0.995 à 1 s'affiche 100% et n'est pas satisfait).
+
+    Une charge nulle ou absente (0 ou None) signifie qu'aucune charge n'a été spécifiée: il n'y
+    a rien à vérifier, et None (plutôt qu'une vérification satisfaite à 0%) permet à
+    l'appelant de le distinguer d'un élément réellement vérifié (voir limit_states_design).
+    Une résistance nulle retourne aussi None (taux non défini).
+
+    """
+    if not (load and resistance):
+        return None
+
+    ratio = load / resistance
+
+    return Check(ratio, round(ratio * 100) < 100, resistance, load)
 
 
-# CODE
 def limit_states_design(load: float | None, resistance: float) -> str:
     """
     5.1 Calculs aux états limites.
@@ -75,10 +128,11 @@ def limit_states_design(load: float | None, resistance: float) -> str:
         str: Message de validation de la résistance.
 
     """
-    if load and resistance:
-        verif = round((load / resistance) * 100)
+    check = limit_states_check(load, resistance)
+    if check:
+        verif = round(check.ratio * 100)
         message = f"État limite dépassé: {verif}%"
-        if verif < 100:
+        if check.passed:
             message = f"État limite respecté: {verif}%"
     else:
         message = "Spécifiez une charge pour vérifier l'état limite"
@@ -126,6 +180,23 @@ def load_duration(
     return kd
 
 
+def cross_section_check(net: float, gross: float) -> Check:
+    """
+    5.3.8 Réduction de la section transversale.
+
+    Args:
+        net (float): Section nette. (voir 5.3.8.1)
+        gross (float): Section brute.
+
+    Returns:
+        Check: Vérification de la section nette (limite = 75% de la section brute).
+
+    """
+    limit = 0.75 * gross
+
+    return Check(limit / net, not net < limit, limit, net)
+
+
 def cross_section(net: float, gross: float) -> str:
     """
     5.3.8 Réduction de la section transversale.
@@ -138,13 +209,16 @@ def cross_section(net: float, gross: float) -> str:
         str: Message de validation de la section nette.
 
     """
-    if net < 0.75 * gross:
+    check = cross_section_check(net, gross)
+    if not check.passed:
         message = (
-            f"Section nette non-valide: {net} < {0.75*gross} (75% de la section brute)."
+            f"Section nette non-valide: {check.value} < {check.limit} "
+            "(75% de la section brute)."
         )
     else:
         message = (
-            f"Section nette valide: {net} > {0.75*gross} (75% de la section brute)."
+            f"Section nette valide: {check.value} > {check.limit} "
+            "(75% de la section brute)."
         )
 
     return message
@@ -166,6 +240,23 @@ def elasticity(modulus: float, service: float, treatment: float) -> float:
     return modulus * (service * treatment)
 
 
+def elastic_deflection_check(span: float, delta: float) -> Check:
+    """
+    5.4.2 Flèche élastique.
+
+    Args:
+        span (float):  Portée, mm.
+        delta (float): Flèche, mm.
+
+    Returns:
+        Check: Vérification du critère de flèche (valeur = L/delta, limite = 180).
+
+    """
+    criteria = span / delta
+
+    return Check(180 / criteria, not criteria < 180, 180, criteria)
+
+
 def elastic_deflection(span: float, delta: float) -> str:
     """
     5.4.2 Flèche élastique.
@@ -178,15 +269,32 @@ def elastic_deflection(span: float, delta: float) -> str:
         str: message de validation du critère de flèche élastique.
 
     """
-    criteria = span / delta
-    if criteria < 180:
-        message = f"Critère de flèche non-valide: L/{int(criteria)} > L/180"
+    check = elastic_deflection_check(span, delta)
+    if not check.passed:
+        message = f"Critère de flèche non-valide: L/{int(check.value)} > L/180"
     else:
-        message = f"Critère de flèche valide: L/{int(criteria)} < L/180"
+        message = f"Critère de flèche valide: L/{int(check.value)} < L/180"
 
     return message
 
 
+def permanent_deformation_check(span: float, delta: float) -> Check:
+    """
+    5.4.3 Déformation permanente.
+
+    Args:
+        span (float):  Portée, mm.
+        delta (float): Flèche, mm.
+
+    Returns:
+        Check: Vérification du critère de déformation (valeur = L/delta, limite = 360).
+
+    """
+    criteria = span / delta
+
+    return Check(360 / criteria, not criteria < 360, 360, criteria)
+
+
 def permanent_deformation(span: float, delta: float) -> str:
     """
     5.4.3 Déformation permanente.
@@ -199,16 +307,16 @@ def permanent_deformation(span: float, delta: float) -> str:
         str: Message de validation du critère de déformation permanente.
 
     """
-    criteria = span / delta
-    if criteria < 360:
-        message = f"Critère de déformation non-valide: L/{int(criteria)} > L/360"
+    check = permanent_deformation_check(span, delta)
+    if not check.passed:
+        message = f"Critère de déformation non-valide: L/{int(check.value)} > L/360"
     else:
-        message = f"Critère de déformation valide: L/{int(criteria)} < L/360"
+        message = f"Critère de déformation valide: L/{int(check.value)} < L/360"
 
     return message
 
 
-def ponding(load: float, *delta: float) -> str:
+def ponding_check(load: float, *delta: float) -> Check:
     """
     5.4.4 Accumulation d'eau.
 
@@ -217,7 +325,7 @@ def ponding(load: float, *delta: float) -> str:
         *delta (float): Flèche pour chaque élément constitutif du système, mm.
 
     Returns:
-        str: Satisfait ou non la condition pour accumulation d'eau.
+        Check: Vérification de la condition (valeur = somme des flèches / charge, limite = 65).
 
     """
     total = 0
@@ -225,18 +333,35 @@ def ponding(load: float, *delta: float) -> str:
         total += item
 
     verif = total / load
-    if verif < 65:
-        message = f"Condition pour accumulation d'eau satisfaite: {verif} < 65"
+
+    return Check(verif / 65, verif < 65, 65, verif)
+
+
+def ponding(load: float, *delta: float) -> str:
+    """
+    5.4.4 Accumulation d'eau.
+
+    Args:
+        load (float): Charge totale spécifiée uniformément répartie, kPa.
+        *delta (float): Flèche pour chaque élément constitutif du système, mm.
+
+    Returns:
+        str: Satisfait ou non la condition pour accumulation d'eau.
+
+    """
+    check = ponding_check(load, *delta)
+    if check.passed:
+        message = f"Condition pour accumulation d'eau satisfaite: {check.value} < 65"
     else:
         message = (
             "Une analyse rationnelle pour assurer la tenue en service en cas d'accumulation "
-            f"d'eau est nécessaire!: {verif} > 65"
+            f"d'eau est nécessaire!: {check.value} > 65"
         )
 
     return message
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Vibration:
     """
     5.4.5 Vibration.
@@ -258,6 +383,10 @@ class Vibration:
         topping (str, optional): Revêtement. "béton" ou Tableau A.1. Defaults to "aucun/autre".
         topping_thickness (float, optional): Épaisseur du revêtement, m. Defaults to 0.
 
+    Les propriétés des tableaux A.1 et A.2 et la rigidité EIeff sont calculées une seule fois
+    par instance. Les instances sont immuables et hachables (__slots__, utilisables comme clés
+    de cache): utiliser dataclasses.replace pour varier un attribut.
+
     """
 
     span: float
@@ -275,8 +404,11 @@ class Vibration:
     subfloor: str = "CSP 5/8"
     topping: str = "aucun/autre"
     topping_thickness: float = 0
+    _cache: dict | None = field(
+        default=None, init=False, repr=False, compare=False, hash=False
+    )
 
-    def floor_vibration(self) -> str:
+    def floor_vibration_check(self) -> Check:
         """
         5.4.5.2 Vibration des planchers.
 
@@ -284,7 +416,7 @@ class Vibration:
             self (Vibration): Attributs de la classe Vibration.
 
         Returns:
-            str: Validation du critère de vibration.
+            Check: Vérification du critère de vibration (valeur = portée, limite = lv).
 
         """
         span = self.span
@@ -294,7 +426,24 @@ class Vibration:
         else:
             max_span = self._joist_vibration()
 
-        if span <= max_span:
+        return Check(span / max_span, span <= max_span, max_span, span)
+
+    def floor_vibration(self) -> str:
+        """
+        5.4.5.2 Vibration des planchers.
+
+        Args:
+            self (Vibration): Attributs de la classe Vibration.
+
+        Returns:
+            str: Validation du critère de vibration.
+
+        """
+        check = self.floor_vibration_check()
+        span = check.value
+        max_span = check.limit
+
+        if check.passed:
             message = (
                 "Critère de vibration satisfait:\n"
                 f"\tPortée maximale\t->\t{max_span} m.\n"
@@ -309,6 +458,80 @@ class Vibration:
 
         return message
 
+    def max_span(self, tolerance: float = 1e-6, max_iterations: int = 50) -> float:
+        """
+        5.4.5.2 Portée maximale satisfaisant le critère de vibration.
+
+        Pour les solives, lv dépend de la portée (Ktss et l1). La portée maximale est la racine
+        de lv(l) - l, encadrée à partir du pas de point fixe puis raffinée par fausse position
+        (méthode d'Illinois). Pour le bois lamellé-croisé, lv ne dépend pas de la portée.
+
+        Args:
+            self (Vibration): Attributs de la classe Vibration. La portée sert de point de départ.
+            tolerance (float, optional): Tolérance sur la portée, m. Defaults to 1e-6.
+            max_iterations (int, optional): Nombre maximal d'évaluations. Defaults to 50.
+
+        Returns:
+            float: Portée maximale, m. Le critère est satisfait à cette portée.
+
+        Raises:
+            ValueError: Si la racine n'est pas trouvée en max_iterations évaluations.
+
+        """
+        if self.clt_mass > 0 or self.clt_bending_stiffness > 0:
+            return self._clt_vibration()
+
+        def excess(span):
+            return replace(self, span=span)._joist_vibration() - span
+
+        # Encadrement: le pas de point fixe lv(l) - l est doublé jusqu'au changement de signe.
+        low = high = self.span if self.span > 0 else 1
+        low_value = high_value = excess(low)
+        step = 2 * low_value
+        for _ in range(max_iterations):
+            if low_value >= 0 > high_value:
+                break
+            if step > 0:
+                low, low_value = high, high_value
+                high = low + step
+                high_value = excess(high)
+            else:
+                high, high_value = low, low_value
+                low = max(high + step, high / 2)
+                low_value = excess(low)
+            step *= 2
+        else:
+            raise ValueError("Portée maximale introuvable: aucun encadrement.")
+
+        # Fausse position (Illinois): low satisfait le critère, high ne le satisfait pas.
+        side = 0
+        for _ in range(max_iterations):
+            if high - low <= tolerance:
+                return low
+            if low_value <= tolerance and low + tolerance < high:
+                probe = low + tolerance
+                probe_value = excess(probe)
+                if probe_value < 0:
+                    return low
+                low, low_value = probe, probe_value
+                continue
+            span = (low * high_value - high * low_value) / (high_value - low_value)
+            if not low < span < high:
+                span = (low + high) / 2
+            value = excess(span)
+            if value >= 0:
+                low, low_value = span, value
+                if side == 1:
+                    high_value /= 2
+                side = 1
+            else:
+                high, high_value = span, value
+                if side == -1:
+                    low_value /= 2
+                side = -1
+
+        raise ValueError("Portée maximale introuvable: tolérance non atteinte.")
+
     def _joist_vibration(self) -> float:
         """
         A.5.4.5 Tenue aux vibrations des planchers en solives en bois.
@@ -321,7 +544,7 @@ class Vibration:
             float: lv = portée pour le contrôle des vibrations, m.
 
         """
-        ei_eff = self._bending_stiffness()
+        ei_eff = self._bending_stiffness
         if self.multiple_span and not self.topping == "béton":
             ei_eff *= 1.2
         ktss = self._stiffness_factor()
@@ -336,6 +559,7 @@ class Vibration:
 
         return lv
 
+    @_cached_property
     def _bending_stiffness(self) -> float:
         """
         A.5.4.5.1.1 Rigidité composite en flexion du système de plancher dans la direction de
@@ -349,13 +573,14 @@ class Vibration:
 
         """
         ei_joist = self.joist_bending_stiffness
-        eis_perp = self._table_a1().eis_perp  # type: ignore
-        tc, ec, _, eac = self._table_a2()
+        table_a1 = self._table_a1
+        eis_perp = table_a1.eis_perp  # type: ignore
+        tc, ec, _, eac = self._table_a2
         eic = (ec * tc**3) / 12
         b1 = self.joist_spacing
         eiu = ei_joist + b1 * (eis_perp + eic)
 
-        eas_perp = self._table_a1().eas_perp  # type: ignore
+        eas_perp = table_a1.eas_perp  # type: ignore
         ea1 = eas_perp + eac
         s1 = 5e6
         if self.glued and self.topping == "aucun/autre":
@@ -369,7 +594,7 @@ class Vibration:
         a_barre = ea_joist + ea1_barre
 
         d = self.joist_depth
-        ts = self._table_a1().ts / 1000  # type: ignore
+        ts = table_a1.ts / 1000  # type: ignore
         h1 = (d / 2) + (
             (eas_perp * (ts / 2) + eac * (ts + (tc / 2))) / (eas_perp + eac)
         )
@@ -391,9 +616,10 @@ class Vibration:
 
         """
         mj = self.joist_mass
-        rho_s = self._table_a1().rho_s  # type: ignore
-        tc, _, rho_c, _ = self._table_a2()
-        ts = self._table_a1().ts / 1000  # type: ignore
+        table_a1 = self._table_a1
+        rho_s = table_a1.rho_s  # type: ignore
+        tc, _, rho_c, _ = self._table_a2
+        ts = table_a1.ts / 1000  # type: ignore
         b1 = self.joist_spacing
 
         ml = mj + (rho_s * ts * b1) + (rho_c * tc * b1)
@@ -412,15 +638,16 @@ class Vibration:
 
         """
         span = self.span
-        eis_par = self._table_a1().eis_par  # type: ignore
+        table_a1 = self._table_a1
+        eis_par = table_a1.eis_par  # type: ignore
         b1 = self.joist_spacing
         if self.topping == "aucun/autre":
             kl = (0.585 * span * eis_par) / b1**3
         else:
-            eas_par = self._table_a1().eas_par  # type: ignore
-            tc, ec, _, eac = self._table_a2()
+            eas_par = table_a1.eas_par  # type: ignore
+            tc, ec, _, eac = self._table_a2
             eic = (ec * tc**3) / 12
-            ts = self._table_a1().ts / 1000  # type: ignore
+            ts = table_a1.ts / 1000  # type: ignore
             h3 = (ts + tc) / 2
             kl = (
                 0.585
@@ -428,7 +655,7 @@ class Vibration:
                 * (eis_par + eic + ((eac * eas_par) / (eac + eas_par)) * h3**2)
             ) / b1**3
 
-        ei_eff = self._bending_stiffness()
+        ei_eff = self._bending_stiffness
         kj = ei_eff / span**3
         k1 = kj / (kj + kl)
 
@@ -436,17 +663,15 @@ class Vibration:
 
         return ktss
 
+    @_cached_property
     def _table_a1(self):
         """
         Tableau A.1 Propriétés des panneaux de sous-plancher.
 
         """
-        return (
-            SubfloorProperties.session.query(SubfloorProperties)
-            .filter(SubfloorProperties.panel == self.subfloor)  # type: ignore
-            .first()
-        )
+        return snapshot().subfloors.get(self.subfloor)
 
+    @_cached_property
     def _table_a2(self) -> tuple[float, float, float, float]:
         """
         Tableau A.2 Propriétés des matériaux de revêtement.
@@ -472,11 +697,7 @@ class Vibration:
             pc = 2300
             eac = ec * self.topping_thickness
         else:
-            table_a1 = (
-                SubfloorProperties.session.query(SubfloorProperties)
-                .filter(SubfloorProperties.panel == self.topping)  # type: ignore
-                .first()
-            )
+            table_a1 = snapshot().subfloors.get(self.topping)
             eisc_perp = table_a1.eis_perp  # type: ignore
             tc = table_a1.ts / 1000  # type: ignore
             ec = (12 * eisc_perp) / tc**3
@@ -499,7 +720,7 @@ class Vibration:
         ei_eff_f = self.clt_bending_stiffness
         m = self.clt_mass
         if self.topping == "béton":
-            concrete = self._table_a2()[2] * self.topping_thickness
+            concrete = self._table_a2[2] * self.topping_thickness
             if not concrete > 2 * m:
                 m += concrete
         lv = 0.11 * (((ei_eff_f / 10**6) ** 0.29) / (m**0.12))
@@ -560,7 +781,7 @@ def lateral_brace(force: float) -> float:
     return 0.0125 * force
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FireResistance:
     """
     5.6 Résistance au feu.
@@ -573,6 +794,8 @@ class FireResistance:
         top_bottom (str, optional): Protection des faces étroites. "aucune", "1_face" ou "2_faces".
         product (str, optional): Produit. "autre", "sciage", "glt", "clt_v1_v2" ou "clt_e1_e2_e3".
 
+    Les instances sont immuables et hachables (__slots__, utilisables comme clés de cache).
+
     """
 
     duration: float
@@ -731,6 +954,17 @@ def _tests():
     Tests pour les calculs de conception générale.
 
     """
+    # Test limit_states_check
+    test_limit_states_check = [
+        limit_states_check(load, 100) for load in (99.4, 99.6, 0, None)
+    ]
+    expected_result = [Check(99.4 / 100, True, 100, 99.4)]
+    expected_result += [Check(99.6 / 100, False, 100, 99.6)]
+    expected_result += [None, None]
+    assert (
+        test_limit_states_check == expected_result
+    ), f"limit_states_check -> FAILED\n {expected_result = }\n {test_limit_states_check = }"
+
     # Test limit_states_design
     test_limit_states_design = limit_states_design(load=12.3, resistance=27)
     expected_result = "État limite respecté: sollicitation atteinte à 46%"
@@ -780,6 +1014,13 @@ def _tests():
         test_ponding == expected_result
     ), f"ponding -> FAILED\n {expected_result = }\n {test_ponding = }"
 
+    # Test ponding_check
+    test_ponding_check = ponding_check(2, 10, 13)
+    expected_result = Check(11.5 / 65, True, 65, 11.5)
+    assert (
+        test_ponding_check == expected_result
+    ), f"ponding_check -> FAILED\n {expected_result = }\n {test_ponding_check = }"
+
     # Test floor_vibration for joist
     test_floor_vibration_joist = Vibration(
         span=2,
@@ -821,6 +1062,47 @@ def _tests():
         test_floor_vibration_clt == expected_result
     ), f"floor_vibration_clt -> FAILED\n {expected_result = }\n {test_floor_vibration_clt = }"
 
+    # Test max_span
+    test_vibration = Vibration(
+        span=3,
+        joist_axial_stiffness=1e8,
+        joist_bending_stiffness=5e5,
+        joist_depth=0.24,
+        joist_mass=5,
+        topping="béton",
+        topping_thickness=0.038,
+    )
+    test_max_span = test_vibration.max_span(tolerance=1e-6)
+    test_passed = (
+        replace(test_vibration, span=test_max_span).floor_vibration_check().passed,
+        replace(test_vibration, span=test_max_span + 1e-6)
+        .floor_vibration_check()
+        .passed,
+    )
+    expected_result = (True, False)
+    assert (
+        test_passed == expected_result
+    ), f"max_span -> FAILED\n {expected_result = }\n {test_passed = }"
+
+    # Test floor_vibration after replacing an attribute
+    test_vibration = Vibration(
+        span=3, joist_bending_stiffness=5e5, joist_depth=0.24, joist_mass=5
+    )
+    test_vibration.floor_vibration()
+    test_floor_vibration_changed = replace(
+        test_vibration, topping="OSB 3/4"
+    ).floor_vibration()
+    expected_result = Vibration(
+        span=3,
+        joist_bending_stiffness=5e5,
+        joist_depth=0.24,
+        joist_mass=5,
+        topping="OSB 3/4",
+    ).floor_vibration()
+    assert (
+        test_floor_vibration_changed == expected_result
+    ), f"floor_vibration_changed -> FAILED\n {expected_result = }\n {test_floor_vibration_changed = }"
+
     # Test moisture
     test_moisture = moisture(
         dimension=150,
@@ -0,0 +1,618 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+5 Conception générale - Calculs en lot.
+----------------------------------------------------
+
+Versions vectorisées (NumPy) des calculs de general_design pour traiter une grille de
+paramètres en une seule passe. Les arguments sont des tableaux (ou des scalaires) diffusés
+ensemble.
+
+5.3.2 Coefficient de durée d'application de la charge, Kd, par élément (charges réelles).
+
+5.4.5 Vibration.
+
+    A.5.4.5 Portée maximale des planchers en solives sur une grille d'espacements et de
+    sous-planchers.
+
+5.4.6 Mouvements du bâtiment attribuables au changement de la teneur en humidité.
+
+5.6 Résistance au feu.
+
+    B.6.2 Section transversale effective et section initiale minimale.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+import math
+import numpy as np
+from database import snapshot
+import general_design
+from sawn_lumber_batch import Status
+
+
+# CODE
+def load_duration(duration, dead=0, live=0, snow=0) -> np.ndarray:
+    """
+    5.3.2 Coefficient de durée d'application de la charge, Kd, par élément.
+
+    Mêmes règles que general_design.load_duration (valeurs identiques).
+
+    Args:
+        duration (array_like): Durée d'application de la charge. "courte", "normale" ou
+            "continue".
+        dead (array_like, optional): Charge de durée d'application continue. Defaults to 0.
+        live (array_like, optional): Surcharge de durée d'application normale. Defaults to 0.
+        snow (array_like, optional): Surcharge de neige. Defaults to 0.
+
+    Returns:
+        np.ndarray: Kd = Coefficient de durée d'application de la charge.
+
+    Raises:
+        ValueError: Si une durée d'application de la charge n'est pas reconnue.
+
+    """
+    duration, pl, live, snow = np.broadcast_arrays(
+        *map(np.asarray, (duration, dead, live, snow))
+    )
+    unknown = ~np.isin(duration, ("courte", "normale", "continue"))
+    if unknown.any():
+        raise ValueError(
+            f"Durée d'application de la charge invalide: {duration[unknown].flat[0]}"
+        )
+
+    ps = np.maximum.reduce([snow, live, snow + 0.5 * live, 0.5 * snow + live])
+    reduced = (duration == "continue") & (ps > 0) & (pl > ps)
+    kd = np.select(
+        [
+            duration == "courte",
+            (duration == "continue") & ~(ps > 0),
+            duration == "continue",
+        ],
+        [1.15, 0.65, 1],
+        default=1,
+    ).astype(float)
+    if reduced.any():
+        ratio = pl[reduced] / ps[reduced]
+        uniques, inverse = np.unique(ratio, return_inverse=True)
+        values = [max(1 - 0.5 * math.log(x, 10), 0.65) for x in uniques.tolist()]
+        kd[reduced] = np.array(values)[inverse.ravel()]
+
+    return np.minimum(kd, 1.15)
+
+
+def _subfloor_properties(subfloor: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Tableau A.1 Propriétés des panneaux de sous-plancher, par élément.
+
+    Args:
+        subfloor (np.ndarray): Sous-planchers.
+
+    Returns:
+        tuple[np.ndarray, ...]: ts (m), EIs par, EIs perp, EAs par, EAs perp, rho_s.
+
+    Raises:
+        ValueError: Si un sous-plancher n'est pas dans le tableau A.1.
+
+    """
+    names, inverse = np.unique(subfloor, return_inverse=True)
+    rows = []
+    for name in names.tolist():
+        row = snapshot().subfloors.get(name)
+        if row is None:
+            raise ValueError(f"Sous-plancher invalide: {name}")
+        rows.append(
+            (
+                row.ts / 1000,
+                row.eis_par,
+                row.eis_perp,
+                row.eas_par,
+                row.eas_perp,
+                row.rho_s,
+            )
+        )
+    table = np.array(rows, dtype=float)[inverse.reshape(subfloor.shape)]
+
+    return tuple(np.moveaxis(table, -1, 0))
+
+
+def _joist_vibration(
+    vibration: general_design.Vibration,
+    span: np.ndarray,
+    b1: np.ndarray,
+    subfloor: tuple[np.ndarray, ...],
+) -> np.ndarray:
+    """
+    A.5.4.5.1 Portée pour le contrôle des vibrations, lv, par élément.
+
+    Mêmes équations que Vibration._joist_vibration, _bending_stiffness, _linear_mass et
+    _stiffness_factor; le revêtement et les solives sont ceux de vibration.
+
+    """
+    ts, eis_par, eis_perp, eas_par, eas_perp, rho_s = subfloor
+    tc, ec, rho_c, eac = vibration._table_a2  # pylint: disable=protected-access
+    no_topping = vibration.topping == "aucun/autre"
+    concrete = vibration.topping == "béton"
+
+    # A.5.4.5.1.1 EIeff
+    eic = (ec * tc**3) / 12
+    eiu = vibration.joist_bending_stiffness + b1 * (eis_perp + eic)
+    ea1 = eas_perp + eac
+    s1 = 1e8 if vibration.glued and no_topping else 5e6
+    l1 = 1.2192 if no_topping else span
+    ea1_barre = (b1 * ea1) / (1 + 10 * ((b1 * ea1) / (s1 * l1**2)))
+    a_barre = vibration.joist_axial_stiffness + ea1_barre
+    h1 = (vibration.joist_depth / 2) + (
+        (eas_perp * (ts / 2) + eac * (ts + (tc / 2))) / (eas_perp + eac)
+    )
+    y_barre = (h1 * ea1_barre) / a_barre
+    ei_eff = eiu + ea1_barre * h1**2 - a_barre * y_barre**2
+
+    # A.5.4.5.1.2 ml
+    ml = vibration.joist_mass + (rho_s * ts * b1) + (rho_c * tc * b1)
+
+    # A.5.4.5.1.3 Ktss
+    if no_topping:
+        kl = (0.585 * span * eis_par) / b1**3
+    else:
+        h3 = (ts + tc) / 2
+        kl = (
+            0.585 * span * (eis_par + eic + ((eac * eas_par) / (eac + eas_par)) * h3**2)
+        ) / b1**3
+    kj = ei_eff / span**3
+    k1 = kj / (kj + kl)
+    ktss = 0.0294 + (0.536 * k1**0.25) + (0.516 * k1**0.5) + (0.31 * k1**0.75)
+
+    if vibration.multiple_span and not concrete:
+        ei_eff = ei_eff * 1.2
+    lv = (0.122 * ei_eff**0.284) / (ktss**0.14 * ml**0.15)
+    if (vibration.bracing and not concrete) or (vibration.gypsum and no_topping):
+        lv = 1.05 * lv
+
+    return lv
+
+
+def max_span(
+    vibration: general_design.Vibration,
+    joist_spacing: float | np.ndarray | None = None,
+    subfloor: str | np.ndarray | None = None,
+    tolerance: float = 1e-6,
+    max_iterations: int = 50,
+) -> np.ndarray:
+    """
+    5.4.5.2 Portée maximale satisfaisant le critère de vibration, sur une grille.
+
+    Même méthode que Vibration.max_span (encadrement puis méthode d'Illinois), appliquée à
+    tous les éléments à la fois. Les autres attributs sont ceux de vibration.
+
+    Args:
+        vibration (Vibration): Plancher de référence. La portée sert de point de départ.
+        joist_spacing (float | np.ndarray, optional): Espacements des solives, m.
+            Defaults to vibration.joist_spacing.
+        subfloor (str | np.ndarray, optional): Sous-planchers (Tableau A.1).
+            Defaults to vibration.subfloor.
+        tolerance (float, optional): Tolérance sur la portée, m. Defaults to 1e-6.
+        max_iterations (int, optional): Nombre maximal d'évaluations. Defaults to 50.
+
+    Returns:
+        np.ndarray: Portées maximales, m, de la forme diffusée de joist_spacing et subfloor.
+
+    Raises:
+        ValueError: Si un sous-plancher n'est pas reconnu ou si la racine n'est pas trouvée.
+
+    Example:
+        max_span(vibration, joist_spacing=[[0.3048], [0.4064]], subfloor=["OSB 5/8", "OSB 3/4"])
+        retourne un tableau 2 x 2.
+
+    """
+    if joist_spacing is None:
+        joist_spacing = vibration.joist_spacing
+    if subfloor is None:
+        subfloor = vibration.subfloor
+    b1, subfloor = np.broadcast_arrays(
+        np.asarray(joist_spacing, dtype=float), np.asarray(subfloor)
+    )
+
+    if vibration.clt_mass > 0 or vibration.clt_bending_stiffness > 0:
+        lv = vibration._clt_vibration()  # pylint: disable=protected-access
+        return np.full(b1.shape, lv)
+
+    properties = _subfloor_properties(subfloor)
+
+    def excess(span):
+        return _joist_vibration(vibration, span, b1, properties) - span
+
+    # Encadrement: le pas de point fixe lv(l) - l est doublé jusqu'au changement de signe.
+    start = vibration.span if vibration.span > 0 else 1
+    low = np.full(b1.shape, float(start))
+    high = low.copy()
+    low_value = excess(low)
+    high_value = low_value.copy()
+    step = 2 * low_value
+    for _ in range(max_iterations):
+        active = ~((low_value >= 0) & (high_value < 0))
+        if not active.any():
+            break
+        up = active & (step > 0)
+        down = active & ~(step > 0)
+        low = np.where(up, high, low)
+        low_value = np.where(up, high_value, low_value)
+        high = np.where(up, low + step, np.where(down, low, high))
+        high_value = np.where(down, low_value, high_value)
+        low = np.where(down, np.maximum(high + step, high / 2), low)
+        candidate = np.where(up, high, low)
+        value = excess(candidate)
+        high_value = np.where(up, value, high_value)
+        low_value = np.where(down, value, low_value)
+        step = np.where(active, 2 * step, step)
+    else:
+        raise ValueError("Portée maximale introuvable: aucun encadrement.")
+
+    # Fausse position (Illinois): low satisfait le critère, high ne le satisfait pas.
+    side = np.zeros(b1.shape, dtype=int)
+    finished = high - low <= tolerance
+    for _ in range(max_iterations):
+        if finished.all():
+            return low
+        probe = ~finished & (low_value <= tolerance) & (low + tolerance < high)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            span = (low * high_value - high * low_value) / (high_value - low_value)
+        inside = (low < span) & (span < high)
+        span = np.where(inside, span, (low + high) / 2)
+        span = np.where(probe, low + tolerance, span)
+        span = np.where(finished, low, span)
+        value = excess(span)
+
+        finished |= probe & (value < 0)
+        update = ~finished
+        satisfied = update & (value >= 0)
+        exceeded = update & (value < 0)
+        high_value = np.where(satisfied & (side == 1), high_value / 2, high_value)
+        low_value = np.where(exceeded & (side == -1), low_value / 2, low_value)
+        low = np.where(satisfied, span, low)
+        low_value = np.where(satisfied, value, low_value)
+        high = np.where(exceeded, span, high)
+        high_value = np.where(exceeded, value, high_value)
+        side = np.where(satisfied & ~probe, 1, np.where(exceeded, -1, side))
+        finished |= high - low <= tolerance
+
+    raise ValueError("Portée maximale introuvable: tolérance non atteinte.")
+
+
+def moisture(
+    dimension, init_mc, final_mc, direction="perp", coefficient=0.002
+) -> np.ndarray:
+    """
+    5.4.6 Mouvements du bâtiment attribuables au changement de la teneur en humidité.
+
+    Mêmes équations que general_design.moisture (valeurs identiques).
+
+    Args:
+        dimension (array_like): Dimension réelle (épaisseur, largeur ou longueur), mm.
+        init_mc (array_like): Teneur en humidité initiale, %.
+        final_mc (array_like): Teneur en humidité finale, %.
+        direction (array_like, optional): Direction du fil du bois. "perp", "para" ou "autre".
+        coefficient (array_like, optional): Coefficient de retrait. Default to 0.002.
+
+    Returns:
+        np.ndarray: S = Retrait ou gonflement de la dimension considérée, mm.
+
+    """
+    direction = np.asarray(direction)
+    mi = np.minimum(init_mc, 28)
+    mf = np.minimum(final_mc, 28)
+    c = np.where(
+        direction == "perp",
+        0.002,
+        np.where(direction == "para", 0.00005, coefficient),
+    )
+
+    return np.asarray(dimension) * (mi - mf) * c
+
+
+# Faces exposées (tableau B.2): (sides, top_bottom) -> (nombre de couches retranchées de b, b
+# avec xc,n, nombre de couches retranchées de d, d avec xc,n).
+_FIRE_PROTECTION = ("aucune", "1_face", "2_faces")
+_FIRE_CASES = np.array(
+    [
+        # sides = "aucune"
+        [(2, 1, 2, 1), (2, 1, 1, 1), (2, 0, 0, 0)],
+        # sides = "1_face"
+        [(1, 1, 2, 1), (1, 1, 1, 1), (1, 0, 0, 0)],
+        # sides = "2_faces"
+        [(0, 0, 2, 0), (0, 0, 1, 0), (0, 0, 0, 0)],
+    ]
+)
+
+
+def _fire_reductions(duration, sides, top_bottom, product):
+    """
+    B.4 et B.5 Réductions de la largeur et de la hauteur, par élément.
+
+    Mêmes équations que FireResistance._char_layer, _zero_layer et effective_section.
+
+    """
+
+    def protection(values):
+        # Une protection non reconnue est traitée comme "aucune", comme dans FireResistance.
+        return np.where(
+            values == "1_face", 1, np.where(values == "2_faces", 2, 0)
+        ).astype(np.intp)
+
+    t = duration
+    clt = np.isin(product, ("clt_v1_v2", "clt_e1_e2_e3"))
+    bn = np.where(clt | (product == "sciage"), 0.8, 0.7)
+    xco = 0.65 * t
+    xcn = bn * t
+    xco = np.where(clt & (xco > 38), xcn, xco)
+    xt = np.where(t < 20, (t / 20) * 7, 7)
+
+    nb, b_xcn, nd, d_xcn = np.moveaxis(
+        _FIRE_CASES[protection(sides), protection(top_bottom)], -1, 0
+    )
+    xb = np.where(b_xcn == 1, xcn, xco)
+    xd = np.where(d_xcn == 1, xcn, xco)
+
+    return nb * xt + nb * xb, nd * xt + nd * xd
+
+
+def fire_effective_section(
+    duration,
+    width,
+    depth,
+    sides="aucune",
+    top_bottom="aucune",
+    product="autre",
+) -> tuple[np.ndarray, ...]:
+    """
+    B.6.2 Section transversale effective, par élément (voir FireResistance).
+
+    Args:
+        duration (array_like): Durée d'exposition au feu, min.
+        width (array_like): Largeur de l'élément, mm.
+        depth (array_like): Hauteur de l'élément, mm.
+        sides (array_like, optional): Protection des faces larges. "aucune", "1_face" ou "2_faces".
+        top_bottom (array_like, optional): Protection des faces étroites. "aucune", "1_face" ou "2_faces".
+        product (array_like, optional): Produit. "autre", "sciage", "glt", "clt_v1_v2" ou "clt_e1_e2_e3".
+
+    Returns:
+        np.ndarray: b = Largeur effective de l'élément, mm.
+        np.ndarray: d = Hauteur effective de l'élément, mm.
+        np.ndarray: phi = Coefficient de résistance.
+        np.ndarray: Kh = Coefficient de système.
+        np.ndarray: Kfi = Coefficient de correction pour le calcul de la résistance au feu.
+        np.ndarray: Codes d'état (Status.FIRE_SECTION lorsque b ou d est plus petit que
+            70 mm; b et d valent alors nan).
+
+    """
+    duration, width, depth, sides, top_bottom, product = np.broadcast_arrays(
+        *map(np.asarray, (duration, width, depth, sides, top_bottom, product))
+    )
+    reduction_b, reduction_d = _fire_reductions(duration, sides, top_bottom, product)
+    b = width - reduction_b
+    d = depth - reduction_d
+
+    status = np.where(np.minimum(b, d) < 70, Status.FIRE_SECTION, Status.OK).astype(
+        np.int8
+    )
+    ok = status == Status.OK
+
+    # B.3 Coefficients influant sur la résistance.
+    kfi = np.select(
+        [product == "sciage", product == "glt", product == "clt_v1_v2"],
+        [1.5, 1.35, 1.5],
+        default=1.25,
+    )
+    ones = np.ones(status.shape, dtype=int)
+
+    return np.where(ok, b, np.nan), np.where(ok, d, np.nan), ones, ones, kfi, status
+
+
+def min_fire_section(
+    duration,
+    sides="aucune",
+    top_bottom="aucune",
+    product="autre",
+    sizes=None,
+    min_width=70,
+    min_depth=70,
+    increment=1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    B.6.2 Section initiale minimale pour une durée d'exposition au feu.
+
+    Cherche la plus petite largeur et la plus petite hauteur initiales dont la section
+    effective est d'au moins min_width x min_depth (70 mm selon la note du tableau B.2).
+
+    Args:
+        duration (array_like): Durée d'exposition au feu visée, min.
+        sides, top_bottom, product (array_like, optional): Voir fire_effective_section.
+        sizes (array_like, optional): Dimensions offertes, mm (ex: sawn_lumber.sizes de
+            chaque dimension nominale). Default to tout multiple de increment.
+        min_width (array_like, optional): Largeur effective minimale, mm. Default to 70.
+        min_depth (array_like, optional): Hauteur effective minimale, mm. Default to 70.
+        increment (float, optional): Pas des dimensions sans sizes, mm. Default to 1.
+
+    Returns:
+        np.ndarray: Largeur initiale minimale, mm. nan si aucune dimension de sizes ne convient.
+        np.ndarray: Hauteur initiale minimale, mm. nan si aucune dimension de sizes ne convient.
+
+    """
+    duration, sides, top_bottom, product, min_width, min_depth = np.broadcast_arrays(
+        *map(np.asarray, (duration, sides, top_bottom, product, min_width, min_depth))
+    )
+    reductions = _fire_reductions(duration, sides, top_bottom, product)
+
+    results = []
+    for reduction, minimum in zip(reductions, (min_width, min_depth)):
+        if sizes is None:
+            candidates = np.ceil((minimum + reduction) / increment) * increment
+            candidates = np.where(
+                candidates - reduction < minimum, candidates + increment, candidates
+            )
+        else:
+            available = np.unique(np.asarray(sizes, dtype=float))
+            index = np.searchsorted(available, minimum + reduction)
+            for _ in range(2):
+                valid = index < available.size
+                lacking = valid & (
+                    available[np.minimum(index, available.size - 1)] - reduction
+                    < minimum
+                )
+                index = np.where(lacking, index + 1, index)
+            candidates = np.where(
+                index < available.size,
+                available[np.minimum(index, available.size - 1)],
+                np.nan,
+            )
+        results.append(candidates)
+
+    return results[0], results[1]
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour les calculs en lot de conception générale.
+
+    """
+    # Test load_duration against general_design.load_duration
+    rng = np.random.default_rng(86)
+    duration = rng.choice(["courte", "normale", "continue"], 3000)
+    loads = rng.choice([0, 0.5, 1, 2.5, 7, 40], (3, 3000)) * rng.uniform(
+        0.5, 2, (3, 3000)
+    )
+    test_kd = load_duration(duration, *loads)
+    expected_result = np.array(
+        [
+            general_design.load_duration(*args)
+            for args in zip(duration.tolist(), *loads.tolist())
+        ]
+    )
+    assert np.array_equal(
+        test_kd, expected_result
+    ), f"load_duration -> FAILED\n {expected_result = }\n {test_kd = }"
+
+    # Test moisture against general_design.moisture
+    cases = list(
+        zip(
+            rng.choice([38, 89, 140, 235, 2438], 500).tolist(),
+            rng.uniform(8, 35, 500).tolist(),
+            rng.uniform(6, 19, 500).tolist(),
+            rng.choice(["perp", "para", "autre"], 500).tolist(),
+            rng.choice([0.002, 0.0025], 500).tolist(),
+        )
+    )
+    test_moisture = moisture(*map(np.array, zip(*cases)))
+    expected_result = np.array([general_design.moisture(*case) for case in cases])
+    assert np.array_equal(
+        test_moisture, expected_result
+    ), f"moisture -> FAILED\n {expected_result = }\n {test_moisture = }"
+
+    # Test fire_effective_section against FireResistance.effective_section
+    protections = ["aucune", "1_face", "2_faces", "autre"]
+    products = ["autre", "sciage", "glt", "clt_v1_v2", "clt_e1_e2_e3"]
+    cases = [
+        (float(t), int(w), int(h), sides, top_bottom, product)
+        for t, w, h in zip(
+            rng.choice([10, 30, 45, 60, 90, 120], 300),
+            rng.choice([89, 140, 184, 235, 286, 365], 300),
+            rng.choice([140, 235, 286, 365, 456, 608], 300),
+        )
+        for sides in protections
+        for top_bottom in protections
+        for product in products[:: 1 + int(t) % 2]
+    ]
+    test_fire = fire_effective_section(*map(np.array, zip(*cases)))
+    for i, case in enumerate(cases):
+        try:
+            expected_result = general_design.FireResistance(*case).effective_section()
+        except ValueError:
+            expected_result = Status.FIRE_SECTION
+            assert (
+                test_fire[-1][i] == expected_result
+            ), f"fire_effective_section -> FAILED\n {expected_result = }\n {case = }"
+            continue
+        test_section = tuple(values[i] for values in test_fire[:-1])
+        assert (
+            test_section == expected_result
+        ), f"fire_effective_section -> FAILED\n {expected_result = }\n {test_section = }"
+
+    # Test min_fire_section
+    durations = np.array([45, 60, 90, 120])[:, None]
+    test_width, test_depth = min_fire_section(durations, "aucune", "1_face", "sciage")
+    for t, width, depth in zip(
+        durations.ravel().tolist(), test_width.ravel(), test_depth.ravel()
+    ):
+        fire = general_design.FireResistance(t, width, depth, top_bottom="1_face")
+        fire = general_design.replace(fire, product="sciage")
+        fire.effective_section()
+        for smaller in (
+            general_design.replace(fire, width=width - 1),
+            general_design.replace(fire, depth=depth - 1),
+        ):
+            try:
+                smaller.effective_section()
+            except ValueError:
+                continue
+            raise AssertionError(f"min_fire_section -> FAILED\n {smaller = }")
+    test_width, _ = min_fire_section(60, sizes=[89, 140, 184, 235, 286])
+    expected_result = 184
+    assert np.all(
+        test_width == expected_result
+    ), f"min_fire_section -> FAILED\n {expected_result = }\n {test_width = }"
+
+    # Test max_span against Vibration.max_span
+    panels = list(snapshot().subfloors)
+    spacings = np.array([0.3048, 0.4064, 0.6096])[:, None]
+    for topping in ("aucun/autre", "béton", "OSB 3/4"):
+        vibration = general_design.Vibration(
+            span=4,
+            glued=True,
+            gypsum=True,
+            joist_axial_stiffness=1e8,
+            joist_bending_stiffness=5e5,
+            joist_depth=0.24,
+            joist_mass=5,
+            topping=topping,
+            topping_thickness=0.038,
+        )
+        test_max_span = max_span(vibration, spacings, np.array(panels)[None, :])
+        expected_result = np.array(
+            [
+                [
+                    general_design.replace(
+                        vibration, joist_spacing=spacing, subfloor=panel
+                    ).max_span()
+                    for panel in panels
+                ]
+                for spacing in spacings[:, 0].tolist()
+            ]
+        )
+        assert np.allclose(
+            test_max_span, expected_result, rtol=0, atol=2e-6
+        ), f"max_span ({topping}) -> FAILED\n {expected_result = }\n {test_max_span = }"
+
+    # Test max_span for CLT
+    vibration = general_design.Vibration(
+        span=2, clt_bending_stiffness=6.5e12, clt_mass=1000, multiple_span=True
+    )
+    test_max_span_clt = max_span(vibration, [0.3048, 0.4064])
+    expected_result = np.full(2, 5.44902505257897)
+    assert np.array_equal(
+        test_max_span_clt, expected_result
+    ), f"max_span_clt -> FAILED\n {expected_result = }\n {test_max_span_clt = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
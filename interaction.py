@@ -0,0 +1,254 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Diagrammes d'interaction P-M (6.5.9).
+----------------------------------------------------
+
+Enveloppe de résistance à la flexion et à la charge axiale combinées de plusieurs éléments, en
+compression (avec l'amplification 1 / (1 - Pf / Pe)) et en traction.
+
+Dans le plan normalisé (p = P / Pr ou P / Tr, m = M / Mr), chaque rayon issu de l'origine
+coupe l'enveloppe une seule fois: le ratio de sawn_lumber.combined_bending_axial croît le long
+du rayon. Le point d'intersection est trouvé par la méthode de Newton (protégée par bissection),
+pour tous les rayons et tous les éléments à la fois. En traction, l'interaction est linéaire et
+le point est exact.
+
+Convention de signe: P > 0 en compression, P < 0 en traction. Le moment est pris en valeur
+absolue.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from dataclasses import dataclass
+import numpy as np
+import sawn_lumber_batch
+
+
+# CODE
+@dataclass(frozen=True)
+class Envelope:
+    """
+    Enveloppes d'interaction P-M de plusieurs éléments.
+
+    Args:
+        p (np.ndarray): Charges axiales de l'enveloppe (éléments x rayons), N.
+        m (np.ndarray): Moments de l'enveloppe (éléments x rayons), N*mm.
+        pr (np.ndarray): Résistances pondérées à la compression, N.
+        tr (np.ndarray): Résistances pondérées à la traction, N.
+        mr (np.ndarray): Résistances pondérées au moment de flexion, N*mm.
+        pe (np.ndarray): Charges critiques de flambement d'Euler, N.
+
+    """
+
+    p: np.ndarray
+    m: np.ndarray
+    pr: np.ndarray
+    tr: np.ndarray
+    mr: np.ndarray
+    pe: np.ndarray
+
+    def ratio(self, pf, mf) -> np.ndarray:
+        """
+        6.5.9 Ratio d'interaction de combinaisons de charges.
+
+        Args:
+            pf (array_like): Charges axiales pondérées (P > 0 en compression), N. Le dernier
+                axe est celui des éléments (ex: combinaisons x éléments).
+            mf (array_like): Moments pondérés, N*mm.
+
+        Returns:
+            np.ndarray: Ratio de sawn_lumber.combined_bending_axial. inf si Pf >= Pe avec
+                un moment en compression.
+
+        """
+        pf, mf = np.broadcast_arrays(np.asarray(pf), np.abs(np.asarray(mf)))
+        pr, tr, mr, pe = np.broadcast_arrays(self.pr, self.tr, self.mr, self.pe)
+        shape = np.broadcast_shapes(pf.shape, pr.shape)
+        pf, mf, pr, tr, mr, pe = (
+            np.broadcast_to(values, shape) for values in (pf, mf, pr, tr, mr, pe)
+        )
+        compression = pf > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = (np.abs(pf) / tr) + mf / mr
+            ratio = np.where(
+                compression,
+                sawn_lumber_batch.compression_interaction(pf, pr, mf, mr, pe),
+                ratio,
+            )
+
+        return np.where(compression & (mf > 0) & (pf >= pe), np.inf, ratio)
+
+    def contains(self, pf, mf) -> np.ndarray:
+        """
+        Vérifie que des combinaisons de charges sont dans l'enveloppe (ratio <= 1).
+
+        Args:
+            pf (array_like): Charges axiales pondérées (P > 0 en compression), N.
+            mf (array_like): Moments pondérés, N*mm.
+
+        Returns:
+            np.ndarray: True si la combinaison est dans l'enveloppe.
+
+        """
+        return self.ratio(pf, mf) <= 1
+
+
+def envelopes(
+    pr,
+    tr,
+    mr,
+    e05,
+    _i,
+    l,
+    ke=1,
+    kse=1,
+    kt=1,
+    rays: int = 64,
+    iterations: int = 60,
+) -> Envelope:
+    """
+    Enveloppes d'interaction P-M.
+
+    Args:
+        pr (array_like): Résistances pondérées à la compression parallèle au fil, N.
+        tr (array_like): Résistances pondérées à la traction parallèle au fil, N.
+        mr (array_like): Résistances pondérées au moment de flexion, N*mm.
+        e05, _i, l, ke, kse, kt (array_like): Voir sawn_lumber_batch.euler_load.
+        rays (int, optional): Nombre de rayons, de la compression pure à la traction pure.
+            Default to 64.
+        iterations (int, optional): Nombre maximal d'itérations. Default to 60.
+
+    Returns:
+        Envelope: Enveloppes (éléments x rayons), dans l'ordre aplati des arguments diffusés.
+
+    Example:
+        envelopes(1e5, 2e5, 1e7, 6500, 1e7, 3000).contains([[5e4], [9e4]], 5e6)
+
+    """
+    pr, tr, mr, pe = (
+        np.ravel(values).astype(float)
+        for values in np.broadcast_arrays(
+            pr, tr, mr, sawn_lumber_batch.euler_load(e05, _i, l, ke, kse, kt)
+        )
+    )
+    angle = np.linspace(0, np.pi, rays)
+    c = np.cos(angle)
+    s = np.sin(angle)
+    c[angle == np.pi / 2] = 0
+
+    # Traction: interaction linéaire, |p| + m = 1.
+    radius = np.broadcast_to(1 / (np.abs(c) + s), (pr.size, rays)).copy()
+
+    # Compression: p = t*c, m = t*s. Le ratio croît le long du rayon jusqu'à p = 1 ou P = Pe.
+    # Multiplié par (1 - P/Pe) > 0, ratio - 1 devient le polynôme h(t), de même signe, dont
+    # la racine est trouvée par la méthode de Newton protégée par bissection. Sans moment, le
+    # ratio vaut p**2 et t = 1.
+    compression = (c > 0) & (s > 0)
+    c_ray, s_ray = c[compression], s[compression]
+    alpha = (pr / pe)[:, None]
+    high = np.minimum(np.minimum(1 / c_ray, 1 / (c_ray * alpha)), 1 / s_ray)
+    low = np.zeros(high.shape)
+    t = high / 2
+    for _ in range(iterations):
+        p = t * c_ray
+        h = (p**2 - 1) * (1 - p * alpha) + t * s_ray
+        slope = 2 * p * c_ray * (1 - p * alpha) - c_ray * alpha * (p**2 - 1) + s_ray
+        low = np.where(h <= 0, t, low)
+        high = np.where(h <= 0, high, t)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = t - h / slope
+        converged = np.abs(step - t) <= 1e-12 * t
+        inside = converged | ((step > low) & (step < high))
+        t = np.where(inside, step, (low + high) / 2)
+        if converged.all():
+            break
+    radius[:, compression] = t
+    radius[:, s == 0] = np.where(c[s == 0] > 0, 1, radius[:, s == 0])
+    compression = c > 0
+
+    p = np.where(compression, radius * c * pr[:, None], radius * c * tr[:, None])
+    m = radius * s * mr[:, None]
+
+    return Envelope(p, m, pr, tr, mr, pe)
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour les diagrammes d'interaction.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import random
+    import sawn_lumber
+
+    rng = random.Random(86)
+    members = [
+        {
+            "pr": rng.uniform(5e4, 3e5),
+            "tr": rng.uniform(5e4, 3e5),
+            "mr": rng.uniform(5e6, 5e7),
+            "e05": rng.choice((6500, 9000)),
+            "i": rng.uniform(5e6, 2e8),
+            "l": rng.randint(1000, 6000),
+        }
+        for _ in range(300)
+    ]
+    envelope = envelopes(
+        [m["pr"] for m in members],
+        [m["tr"] for m in members],
+        [m["mr"] for m in members],
+        [m["e05"] for m in members],
+        [m["i"] for m in members],
+        [m["l"] for m in members],
+    )
+
+    # Test envelope points against combined_bending_axial
+    for i, m in enumerate(members):
+        for p, moment in zip(envelope.p[i].tolist(), envelope.m[i].tolist()):
+            if p > 0:
+                test_ratio = sawn_lumber.combined_bending_axial(
+                    p, m["pr"], moment, m["mr"], True, m["e05"], m["i"], m["l"]
+                )
+            else:
+                test_ratio = sawn_lumber.combined_bending_axial(
+                    -p, m["tr"], moment, m["mr"], False
+                )
+            assert (
+                abs(test_ratio - 1) < 1e-9
+            ), f"envelopes -> FAILED\n {m = }\n {p = }\n {moment = }\n {test_ratio = }"
+
+    # Test contains against combined_bending_axial
+    pf = np.array([[rng.uniform(-3e5, 3e5)] for _ in range(50)])
+    mf = np.array([[rng.uniform(-5e7, 5e7)] for _ in range(50)])
+    test_contains = envelope.contains(pf, mf)
+    for j in range(len(pf)):
+        for i, m in enumerate(members):
+            p, moment = float(pf[j, 0]), abs(float(mf[j, 0]))
+            if p > 0:
+                ratio = sawn_lumber.combined_bending_axial(
+                    p, m["pr"], moment, m["mr"], True, m["e05"], m["i"], m["l"]
+                )
+                expected_result = ratio <= 1 and (moment == 0 or p < envelope.pe[i])
+            else:
+                ratio = sawn_lumber.combined_bending_axial(
+                    -p, m["tr"], moment, m["mr"], False
+                )
+                expected_result = ratio <= 1
+            assert (
+                test_contains[j, i] == expected_result
+            ), f"contains -> FAILED\n {expected_result = }\n {test_contains[j, i] = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
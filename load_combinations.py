@@ -0,0 +1,354 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Combinaisons de charges et coefficient de durée d'application, Kd, par combinaison.
+----------------------------------------------------
+
+Combinaisons de charges pondérées du CNB (tableau 4.1.3.2.-A) pour les charges spécifiées
+D (permanente), L (surcharge d'utilisation), S (neige) et W (vent), évaluées pour tous les
+éléments à la fois. Chaque cas est évalué avec 1,25D et avec 0,9D (charge permanente
+favorable: soulèvement, renversement).
+
+Convention de signe: les effets (dead, live, snow, wind de factored et combine) sont signés
+et additionnés avec leur signe; le taux d'utilisation est |effet pondéré| / résistance. Kd
+(load_durations) est calculé avec les valeurs absolues des charges spécifiées D, L et S, qui
+comparent des intensités de charges (5.3.2.3) et non des sens.
+
+Kd (5.3.2) est calculé pour chaque combinaison et chaque élément avec les charges spécifiées
+réelles:
+
+    - combinaison avec W: "courte" (Kd = 1,15);
+    - sinon: "continue" avec D, L et S de la combinaison (5.3.2.3). Kd = 0,65 pour D seule, 1 si
+      L et S dominent, réduit lorsque D dépasse la surcharge.
+
+Les résistances ne sont calculées qu'une fois: soit à Kd = 1 puis multipliées par Kd (Mr, Vr,
+Tr et Qr sont proportionnelles à Kd), soit par une fonction en lot appelée une seule fois avec
+le tableau des Kd (combinaisons x éléments), par exemple Pr.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
+import general_design_batch
+
+
+# CODE
+@dataclass(frozen=True, slots=True)
+class Combination:
+    """
+    Combinaison de charges pondérées.
+
+    Args:
+        name (str): Nom de la combinaison.
+        dead (float): Coefficient de D.
+        live (float): Coefficient de L.
+        snow (float): Coefficient de S.
+        wind (float): Coefficient de W.
+
+    """
+
+    name: str
+    dead: float
+    live: float = 0
+    snow: float = 0
+    wind: float = 0
+
+    @property
+    def duration(self) -> str:
+        """
+        Durée d'application de la charge pour Kd.
+
+        """
+        return "courte" if self.wind else "continue"
+
+
+# Tableau 4.1.3.2.-A du CNB 2015 (charges principales et compagnes):
+#     cas 1: 1,4D;
+#     cas 2: (1,25D ou 0,9D) + 1,5L, compagne 1,0S ou 0,4W;
+#     cas 3: (1,25D ou 0,9D) + 1,5S, compagne 1,0L ou 0,4W (la note du tableau permet 0,5L
+#            pour certains usages: combinaisons à fournir par l'appelant);
+#     cas 4: (1,25D ou 0,9D) + 1,4W, compagne 0,5L ou 0,5S.
+COMBINATIONS = (
+    Combination("1.4D", 1.4),
+    Combination("1.25D+1.5L", 1.25, live=1.5),
+    Combination("1.25D+1.5L+1.0S", 1.25, live=1.5, snow=1.0),
+    Combination("1.25D+1.5L+0.4W", 1.25, live=1.5, wind=0.4),
+    Combination("1.25D+1.5S", 1.25, snow=1.5),
+    Combination("1.25D+1.5S+1.0L", 1.25, live=1.0, snow=1.5),
+    Combination("1.25D+1.5S+0.4W", 1.25, snow=1.5, wind=0.4),
+    Combination("1.25D+1.4W", 1.25, wind=1.4),
+    Combination("1.25D+1.4W+0.5L", 1.25, live=0.5, wind=1.4),
+    Combination("1.25D+1.4W+0.5S", 1.25, snow=0.5, wind=1.4),
+    Combination("0.9D+1.5L", 0.9, live=1.5),
+    Combination("0.9D+1.5L+1.0S", 0.9, live=1.5, snow=1.0),
+    Combination("0.9D+1.5L+0.4W", 0.9, live=1.5, wind=0.4),
+    Combination("0.9D+1.5S", 0.9, snow=1.5),
+    Combination("0.9D+1.5S+1.0L", 0.9, live=1.0, snow=1.5),
+    Combination("0.9D+1.5S+0.4W", 0.9, snow=1.5, wind=0.4),
+    Combination("0.9D+1.4W", 0.9, wind=1.4),
+    Combination("0.9D+1.4W+0.5L", 0.9, live=0.5, wind=1.4),
+    Combination("0.9D+1.4W+0.5S", 0.9, snow=0.5, wind=1.4),
+)
+
+
+@dataclass(frozen=True)
+class CombinationResults:
+    """
+    Résultats de toutes les combinaisons (combinaisons x éléments).
+
+    Args:
+        combinations (tuple[Combination, ...]): Combinaisons évaluées.
+        effects (np.ndarray): Effets pondérés.
+        kd (np.ndarray): Coefficients de durée d'application de la charge.
+        resistances (np.ndarray): Résistances pondérées.
+        ratios (np.ndarray): Taux d'utilisation, |effet| / résistance.
+
+    """
+
+    combinations: tuple[Combination, ...]
+    effects: np.ndarray
+    kd: np.ndarray
+    resistances: np.ndarray
+    ratios: np.ndarray
+
+    @property
+    def governing(self) -> np.ndarray:
+        """
+        Indice de la combinaison déterminante de chaque élément.
+
+        """
+        return np.argmax(self.ratios, axis=0)
+
+    @property
+    def ratio(self) -> np.ndarray:
+        """
+        Taux d'utilisation déterminant de chaque élément.
+
+        """
+        return np.max(self.ratios, axis=0)
+
+    @property
+    def passed(self) -> np.ndarray:
+        """
+        Éléments dont toutes les combinaisons respectent l'état limite (voir
+        general_design.limit_states_check).
+
+        """
+        return np.round(self.ratio * 100) < 100
+
+    @property
+    def names(self) -> np.ndarray:
+        """
+        Nom de la combinaison déterminante de chaque élément.
+
+        """
+        names = np.array([combination.name for combination in self.combinations])
+        return names[self.governing]
+
+
+def _factors(combinations: tuple[Combination, ...]) -> np.ndarray:
+    """
+    Matrice des coefficients (combinaisons x [D, L, S, W]).
+
+    """
+    return np.array(
+        [
+            (combination.dead, combination.live, combination.snow, combination.wind)
+            for combination in combinations
+        ]
+    )
+
+
+def factored(dead, live=0, snow=0, wind=0, combinations=COMBINATIONS) -> np.ndarray:
+    """
+    Effets pondérés de chaque combinaison.
+
+    Args:
+        dead, live, snow, wind (array_like): Effets signés des charges spécifiées D, L, S et
+            W.
+        combinations (tuple[Combination, ...], optional): Default to COMBINATIONS.
+
+    Returns:
+        np.ndarray: Effets pondérés signés (combinaisons x forme diffusée des charges).
+
+    """
+    loads = np.stack(np.broadcast_arrays(*map(np.asarray, (dead, live, snow, wind))))
+    factors = _factors(combinations)
+
+    return np.tensordot(factors, loads, axes=1)
+
+
+def load_durations(
+    dead, live=0, snow=0, wind=0, combinations=COMBINATIONS
+) -> np.ndarray:
+    """
+    5.3.2 Kd de chaque combinaison, avec les charges spécifiées de la combinaison.
+
+    Les charges sont prises en valeur absolue (voir la convention de signe du module).
+
+    Args:
+        dead, live, snow, wind (array_like): Charges spécifiées D, L, S et W.
+        combinations (tuple[Combination, ...], optional): Default to COMBINATIONS.
+
+    Returns:
+        np.ndarray: Kd (combinaisons x forme diffusée des charges).
+
+    """
+    dead, live, snow, _ = np.broadcast_arrays(
+        *map(np.asarray, (dead, live, snow, wind))
+    )
+    factors = _factors(combinations)
+    duration = np.array([combination.duration for combination in combinations])
+    shape = (len(combinations),) + (1,) * dead.ndim
+
+    return general_design_batch.load_duration(
+        duration.reshape(shape),
+        np.abs(dead),
+        np.where(factors[:, 1].reshape(shape) > 0, np.abs(live), 0),
+        np.where(factors[:, 2].reshape(shape) > 0, np.abs(snow), 0),
+    )
+
+
+def combine(
+    resistance: np.ndarray | Callable[[np.ndarray], np.ndarray],
+    dead,
+    live=0,
+    snow=0,
+    wind=0,
+    combinations: tuple[Combination, ...] = COMBINATIONS,
+    loads: tuple | None = None,
+) -> CombinationResults:
+    """
+    Vérifie toutes les combinaisons de charges de tous les éléments en une passe.
+
+    Args:
+        resistance (array_like | callable): Résistance pondérée de chaque élément à Kd = 1
+            (multipliée par Kd), ou fonction en lot kd -> résistance appelée une seule fois
+            avec Kd (combinaisons x éléments).
+        dead, live, snow, wind (array_like): Effets signés des charges spécifiées D, L, S et
+            W (ex: moments, N*mm).
+        combinations (tuple[Combination, ...], optional): Default to COMBINATIONS.
+        loads (tuple, optional): Charges spécifiées (D, L, S) pour Kd, si les effets ne leur
+            sont pas proportionnels (ex: effort axial et moment). Default to (dead, live,
+            snow).
+
+    Returns:
+        CombinationResults: Effets, Kd, résistances et taux d'utilisation.
+
+    Example:
+        mr = sawn_lumber_batch.bending_moment(b, d, fb, kd=1, ...)[0]
+        combine(mr, dead=md, live=ml, snow=ms).names
+
+    """
+    effects = factored(dead, live, snow, wind, combinations)
+    if loads is None:
+        loads = (dead, live, snow)
+    kd = load_durations(*loads, combinations=combinations)
+    kd = np.broadcast_to(kd, effects.shape)
+
+    if callable(resistance):
+        resistances = np.broadcast_to(resistance(kd), effects.shape)
+    else:
+        resistances = kd * np.asarray(resistance)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = np.abs(effects) / resistances
+
+    return CombinationResults(combinations, effects, kd, resistances, ratios)
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour les combinaisons de charges.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import general_design
+    import sawn_lumber
+    import sawn_lumber_batch
+
+    rng = np.random.default_rng(86)
+    n = 500
+    b = rng.choice([89, 140], n)
+    d = rng.choice([140, 184, 235, 286], n)
+    loads = rng.choice([0, 0, 1, 2, 5], (4, n)) * rng.uniform(0.5, 2, (4, n)) * 1e6
+    loads[0] += 1e5
+    loads[0] *= rng.choice([-1, 1, 1, 1], n)
+    loads[3] *= rng.choice([-1, 1], n)
+
+    # Test combine (Mr proportionnel à Kd) against the scalar calculators
+    mr = sawn_lumber_batch.bending_moment(b, d, 11.8, lateral_support=True)[0]
+    test_results = combine(mr, *loads)
+    for i in range(n):
+        expected_result = []
+        for combination in COMBINATIONS:
+            dead, live, snow, wind = loads[:, i].tolist()
+            kd = general_design.load_duration(
+                combination.duration,
+                abs(dead),
+                live if combination.live else 0,
+                snow if combination.snow else 0,
+            )
+            effect = (
+                combination.dead * dead
+                + combination.live * live
+                + combination.snow * snow
+                + combination.wind * wind
+            )
+            resistance = sawn_lumber.Resistances(int(b[i]), int(d[i]), kd)
+            expected_result.append(
+                abs(effect) / resistance.bending_moment(11.8, lateral_support=True)
+            )
+        test_ratios = test_results.ratios[:, i]
+        assert np.allclose(
+            test_ratios, expected_result, rtol=1e-12, atol=0
+        ), f"combine -> FAILED\n {expected_result = }\n {test_ratios = }"
+        assert test_results.governing[i] == np.argmax(
+            expected_result
+        ), f"combine governing -> FAILED\n {expected_result = }\n {test_ratios = }"
+
+    # Test the table of combinations (tableau 4.1.3.2.-A)
+    test_names = [combination.name for combination in COMBINATIONS]
+    expected_result = ["1.4D", "1.25D+1.5L", "1.25D+1.5L+1.0S", "1.25D+1.5L+0.4W"]
+    assert (
+        test_names[:4] == expected_result and len(test_names) == 19
+    ), f"COMBINATIONS -> FAILED\n {expected_result = }\n {test_names = }"
+    uplift = combine([1e6], dead=[-2e5], wind=[1e6])
+    test_names = uplift.names.tolist()
+    expected_result = ["0.9D+1.4W"]
+    assert (
+        test_names == expected_result
+    ), f"combine uplift -> FAILED\n {expected_result = }\n {test_names = }"
+
+    # Test combine with a batch resistance function (Pr n'est pas proportionnel à Kd)
+    test_results = combine(
+        lambda kd: sawn_lumber_batch.comp_parallel(b, d, 2400, 2400, 11.5, 6500, kd=kd)[
+            0
+        ],
+        *loads,
+    )
+    i = int(np.argmax(test_results.ratio))
+    j = int(test_results.governing[i])
+    expected_result = sawn_lumber.Resistances(
+        int(b[i]), int(d[i]), float(test_results.kd[j, i])
+    ).comp_parallel(2400, 2400, 11.5, 6500)
+    test_pr = test_results.resistances[j, i]
+    assert (
+        test_pr == expected_result
+    ), f"combine callable -> FAILED\n {expected_result = }\n {test_pr = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
@@ -1,37 +1,66 @@
 """_summary_"""
 
 # IMPORTS
-from dataclasses import dataclass
-from sqlalchemy import orm, create_engine, Column, TEXT, REAL, INTEGER
+import functools
+import os
 import streamlit as st
 import Accueil
+import database
 import sawn_lumber
 import general_design
 
 
-# DB CONNECTIONS
-@dataclass
-class SawnLumberStrengths(orm.declarative_base()):
+# CACHE
+def grade_options(category: str, specie: str) -> tuple[str, ...]:
     """
-    Se connecte à la table sawn_lumber_strengths de csa_o86_19.db.
+    Classes disponibles pour une catégorie et un groupe d'essence.
 
     """
+    return tuple(
+        row.grade
+        for row in database.snapshot().strengths.values()
+        if row.category == category and row.specie == specie
+    )
+
+
+@st.cache_resource
+def memoized() -> dict:
+    """
+    Calculs mémoïsés par tuple d'entrées, partagés entre les sessions.
+
+    sawn_lumber.specified_strengths est déjà mémorisé par sawn_lumber.
 
-    __tablename__ = "sawn_lumber_strengths"
-    index: int = Column("index", INTEGER, primary_key=True)  # type: ignore
-    category: str = Column("category", TEXT)  # type: ignore
-    specie: str = Column("specie", TEXT)  # type: ignore
-    grade: str = Column("grade", TEXT)  # type: ignore
-    fb: float = Column("fb", REAL)  # type: ignore
-    fv: float = Column("fv", REAL)  # type: ignore
-    fc: float = Column("fc", REAL)  # type: ignore
-    fcp: float = Column("fcp", REAL)  # type: ignore
-    ft: float = Column("ft", REAL)  # type: ignore
-    e: int = Column("e", INTEGER)  # type: ignore
-    e05: int = Column("e05", INTEGER)  # type: ignore
-    engine = create_engine("sqlite:///csa_o86_19.db")
-    Session = orm.sessionmaker(engine)
-    session = Session()
+    """
+    return {
+        "snapshot": None,
+        "functions": {
+            function.__name__: functools.lru_cache(maxsize=1024)(function)
+            for function in (
+                sawn_lumber.sizes,
+                grade_options,
+                sawn_lumber.modification_factors,
+            )
+        },
+    }
+
+
+def cached() -> dict:
+    """
+    Calculs mémoïsés, vidés lorsque l'instantané est rechargé (database.reload).
+
+    """
+    memo = memoized()
+    current = database.snapshot()
+    if memo["snapshot"] is not current:
+        for function in memo["functions"].values():
+            function.cache_clear()
+        memo["snapshot"] = current
+
+    return memo["functions"]
+
+
+CACHE = cached()
+DEBUG = os.environ.get("DEBUG") == "1" or st.query_params.get("debug") == "1"
 
 
 # CODE
@@ -106,7 +135,7 @@ with st.container(horizontal_alignment="center"):
         )
 
     with col2:
-        width = sawn_lumber.sizes(width_input, GREEN, BRUT)
+        width = CACHE["sizes"](width_input, GREEN, BRUT)
         if built_up == 1:
             st.metric("Largeur nette de l'élément, $b$", f"{width} mm")
         else:
@@ -115,7 +144,7 @@ with st.container(horizontal_alignment="center"):
                 f"{built_up}*{width} = {built_up*width} mm",
             )
 
-        depth = sawn_lumber.sizes(depth_input, GREEN, BRUT)
+        depth = CACHE["sizes"](depth_input, GREEN, BRUT)
         st.metric("Hauteur nette de l'élément, $d$", f"{depth} mm")
         msr_mel = col2.segmented_control(
             label="Bois classé mécaniquement?",
@@ -212,21 +241,16 @@ with st.container(horizontal_alignment="center"):
             SPECIE = "S-P-F"
 
     # --- choix du grade ---
-    grade_options = (
-        SawnLumberStrengths.session.query(SawnLumberStrengths)  # type: ignore
-        .filter(SawnLumberStrengths.category == CATEGORY)  # type: ignore
-        .filter(SawnLumberStrengths.specie == specie[SPECIE])  # type: ignore
-        .with_entities(SawnLumberStrengths.grade)  # type: ignore
-    )
+    grades = CACHE["grade_options"](CATEGORY, specie[SPECIE])
     grade = st.segmented_control(
         label="Classe:",
-        options=grade_options,
-        default=grade_options[1][0],
+        options=grades,
+        default=grades[1],
         width=650,
-        help=f"Si aucune classe n'est sélectionnée, '{grade_options[1][0]}' est utilisé par défaut",
+        help=f"Si aucune classe n'est sélectionnée, '{grades[1]}' est utilisé par défaut",
     )
     if not grade:
-        grade = grade_options[1][0]
+        grade = grades[1]
 
 
 # --- section résistances prévues ---
@@ -356,7 +380,7 @@ with st.container(horizontal_alignment="center"):
             PROP_KEY = "Flexion"
 
         # --- calculer les corfficients ---
-        compute_coefficients = sawn_lumber.modification_factors(
+        compute_coefficients = CACHE["modification_factors"](
             width=width,
             depth=depth,
             prop=prop_options[PROP_KEY],
@@ -399,7 +423,7 @@ flex, shear, comp_para, comp_perp, comp_angle, trac, combi = st.tabs(
 )
 
 with flex:
-    kd, ksb, kt, kh, kzb = sawn_lumber.modification_factors(
+    kd, ksb, kt, kh, kzb = CACHE["modification_factors"](
         width=width,
         depth=depth,
         prop="flex",
@@ -479,7 +503,7 @@ with flex:
             st.success(VERIF, width=650, icon=":material/all_match:")
 
 with shear:
-    kd, ksv, kt, kh, kzv = sawn_lumber.modification_factors(
+    kd, ksv, kt, kh, kzv = CACHE["modification_factors"](
         width=width,
         depth=depth,
         prop="cis_v",
@@ -534,7 +558,7 @@ with shear:
 
             ksf = 1
             if notch_depth and notch_length:
-                kd, ksf, kt, kh, kzf = sawn_lumber.modification_factors(
+                kd, ksf, kt, kh, kzf = CACHE["modification_factors"](
                     width=width,
                     depth=depth,
                     prop="cis_f",
@@ -585,3 +609,13 @@ with trac:
 with combi:
     with st.container(horizontal_alignment="center"):
         st.warning("Fonctionnalité à venir.", width=200)
+
+# --- débogage (DEBUG=1 ou ?debug=1) ---
+if DEBUG:
+    st.divider()
+    with st.expander("Débogage: cache"):
+        for name, function in CACHE.items():
+            info = function.cache_info()
+            col1, col2 = st.columns([3, 1])
+            col1.text(f"{name}:")
+            col2.text(f"{info.hits} succès / {info.misses} échecs")
@@ -0,0 +1,567 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Instrumentation des calculs (nombre d'appels, temps et requêtes à la base de données).
+----------------------------------------------------
+
+Activée sur demande seulement, par le gestionnaire de contexte profile:
+
+    with profiling.profile() as report:
+        ...
+    report.save("profil.json")
+    report.save_folded("profil.folded")
+
+ou par la variable d'environnement CSA_O86_PROFILE (voir from_environment), qui contient le
+chemin du rapport JSON. Les points d'entrée en ligne de commande (schedule_check, service,
+benchmarks et capacity_index) s'exécutent dans from_environment:
+
+    CSA_O86_PROFILE=profil.json python schedule_check.py bordereau.csv -o resultats.csv
+
+Les fonctions instrumentées (TARGETS) sont remplacées par des enveloppes à l'entrée du contexte,
+dans leur module et dans tous les modules qui les ont importées (from ... import ...), puis
+remises en place à la sortie. Hors du contexte, le code exécuté est le code d'origine: la
+désactivation ne coûte rien.
+
+Pour chaque fonction: nombre d'appels, temps total (inclusif), temps propre (sans les
+fonctions instrumentées appelées) et requêtes SQL (événements before/after_cursor_execute de
+SQLAlchemy). Les piles d'appels sont exportées au format « folded » (une ligne
+"a;b;c microsecondes" par pile), lu par flamegraph.pl, speedscope et inferno. Les requêtes
+apparaissent dans la pile sous le nom SQL.
+
+Tous les fils d'exécution du processus sont mesurés (une pile par fil); les processus d'un
+ProcessPoolExecutor ne le sont pas.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+# CODE
+ENVIRONMENT = "CSA_O86_PROFILE"
+
+# "module.fonction" ou "module.Classe" (toutes les méthodes de la classe).
+TARGETS = (
+    "database.snapshot",
+    "database._load",
+    "sawn_lumber.lumber_category",
+    "sawn_lumber.specified_strengths",
+    "sawn_lumber._factor_rows",
+    "sawn_lumber.modification_factors",
+    "sawn_lumber.all_modification_factors",
+    "sawn_lumber.sizes",
+    "sawn_lumber.Resistances",
+    "general_design.Vibration",
+    "general_design.FireResistance",
+    # Calculs en lot.
+    "sawn_lumber_batch.lumber_category",
+    "sawn_lumber_batch.sizes",
+    "sawn_lumber_batch.specified_strengths",
+    "sawn_lumber_batch.modification_factors",
+    "sawn_lumber_batch.bending_moment",
+    "sawn_lumber_batch.shear",
+    "sawn_lumber_batch.comp_parallel",
+    "sawn_lumber_batch.comp_perpendicular",
+    "sawn_lumber_batch.min_bearing_length",
+    "sawn_lumber_batch.combined_bending_axial",
+    "sawn_lumber_batch.comp_angle",
+    "general_design_batch.load_duration",
+    "general_design_batch.max_span",
+    "general_design_batch.moisture",
+    "general_design_batch.fire_effective_section",
+    "general_design_batch.min_fire_section",
+    # Calculs composés des calculs en lot.
+    "schedule_check.check_rows",
+    "capacity_index.build",
+    "capacity_index.compute",
+    "section_optimizer.capacity_table",
+    "section_optimizer.optimize",
+    "column_curves.curves",
+    "interaction.envelopes",
+    "load_combinations.combine",
+    "shrinkage.accumulate",
+)
+
+SQL = "SQL"
+
+_ACTIVE_LOCK = threading.Lock()
+_ACTIVE: "Profile | None" = None
+
+
+@dataclass(slots=True)
+class Stat:
+    """
+    Mesures d'une fonction.
+
+    Args:
+        calls (int): Nombre d'appels.
+        total (float): Temps total, incluant les fonctions appelées, s.
+        own (float): Temps propre, sans les fonctions instrumentées appelées, s.
+        queries (int): Requêtes SQL exécutées directement par la fonction.
+        query_time (float): Temps des requêtes SQL, s.
+
+    """
+
+    calls: int = 0
+    total: float = 0
+    own: float = 0
+    queries: int = 0
+    query_time: float = 0
+
+
+@dataclass
+class Profile:
+    """
+    Rapport d'instrumentation.
+
+    Args:
+        functions (dict[str, Stat]): Mesures par fonction.
+        stacks (dict[tuple[str, ...], float]): Temps propre par pile d'appels, s.
+
+    """
+
+    functions: dict[str, Stat] = field(default_factory=dict)
+    stacks: dict[tuple[str, ...], float] = field(default_factory=dict)
+    _local: threading.local = field(default_factory=threading.local, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _frames(self) -> list:
+        """
+        Pile des fonctions en cours du fil d'exécution courant ([nom, temps des appelées]).
+
+        """
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def _stat(self, name: str) -> Stat:
+        """
+        Mesures d'une fonction, créées au premier appel (avec le verrou).
+
+        """
+        stat = self.functions.get(name)
+        if stat is None:
+            stat = self.functions[name] = Stat()
+        return stat
+
+    def _record(self, frames: list, elapsed: float, child_time: float):
+        """
+        Ajoute une fonction terminée (dernier élément de frames) aux mesures.
+
+        """
+        name = frames[-1][0]
+        stack = tuple(frame[0] for frame in frames)
+        with self._lock:
+            stat = self._stat(name)
+            stat.calls += 1
+            stat.total += elapsed
+            stat.own += elapsed - child_time
+            self.stacks[stack] = self.stacks.get(stack, 0) + elapsed - child_time
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        """
+        Enveloppe mesurant une fonction.
+
+        Args:
+            name (str): Nom de la fonction dans le rapport.
+            function (Callable): Fonction d'origine.
+
+        Returns:
+            Callable: Enveloppe.
+
+        """
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            frames = self._frames()
+            frame = [name, 0.0]
+            frames.append(frame)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._record(frames, elapsed, frame[1])
+                frames.pop()
+                if frames:
+                    frames[-1][1] += elapsed
+
+        return wrapper
+
+    def _before_query(self, conn, *_):
+        """
+        Événement before_cursor_execute de SQLAlchemy.
+
+        """
+        conn.info.setdefault("profiling_start", []).append(time.perf_counter())
+
+    def _after_query(self, conn, *_):
+        """
+        Événement after_cursor_execute de SQLAlchemy: la requête est ajoutée à la pile.
+
+        """
+        elapsed = time.perf_counter() - conn.info["profiling_start"].pop()
+        frames = self._frames()
+        frames.append([SQL, 0.0])
+        self._record(frames, elapsed, 0.0)
+        frames.pop()
+        if frames:
+            frames[-1][1] += elapsed
+            with self._lock:
+                stat = self._stat(frames[-1][0])
+                stat.queries += 1
+                stat.query_time += elapsed
+
+    def to_dict(self) -> dict:
+        """
+        Rapport sérialisable en JSON, fonctions triées par temps propre décroissant.
+
+        Returns:
+            dict: {"functions": {nom: mesures}, "stacks": {"a;b;c": temps propre}}.
+
+        """
+        with self._lock:
+            functions = sorted(self.functions.items(), key=lambda item: -item[1].own)
+            stacks = dict(self.stacks)
+        return {
+            "functions": {
+                name: {
+                    "calls": stat.calls,
+                    "total": stat.total,
+                    "own": stat.own,
+                    "queries": stat.queries,
+                    "query_time": stat.query_time,
+                }
+                for name, stat in functions
+            },
+            "stacks": {";".join(stack): own for stack, own in stacks.items()},
+        }
+
+    def folded(self) -> str:
+        """
+        Piles d'appels au format « folded » (temps propre en microsecondes).
+
+        Returns:
+            str: Une ligne "a;b;c microsecondes" par pile.
+
+        """
+        with self._lock:
+            stacks = sorted(self.stacks.items())
+        return "".join(
+            f"{';'.join(stack)} {round(own * 1e6)}\n" for stack, own in stacks
+        )
+
+    def save(self, path: str):
+        """
+        Enregistre le rapport en JSON.
+
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def save_folded(self, path: str):
+        """
+        Enregistre les piles d'appels au format « folded ».
+
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.folded())
+
+
+def _resolve(target: str) -> tuple[object, str, object]:
+    """
+    Module (ou classe), nom et objet d'une cible "module.nom".
+
+    """
+    module_name, name = target.rsplit(".", 1)
+    module = importlib.import_module(module_name)
+
+    return module, name, getattr(module, name)
+
+
+def _main_twin(module, name: str):
+    """
+    Fonction du même nom dans __main__ si le module est aussi exécuté comme script (ex:
+    python schedule_check.py), où elle est un objet distinct de celle du module importé.
+
+    """
+    main = sys.modules.get("__main__")
+    main_file = getattr(main, "__file__", None)
+    module_file = getattr(module, "__file__", None)
+    if main is module or not (main_file and module_file):
+        return None
+    if os.path.abspath(main_file) != os.path.abspath(module_file):
+        return None
+
+    return getattr(main, name, None)
+
+
+def _patch(
+    report: Profile, targets: tuple[str, ...], restore: list[Callable[[], None]]
+):
+    """
+    Installe les enveloppes. Les fonctions qui les retirent sont ajoutées à restore au fur
+    et à mesure, pour tout retirer même si une cible échoue en cours de route.
+
+    """
+
+    def replace(owner, name, original, wrapper):
+        setattr(owner, name, wrapper)
+        restore.append(lambda: setattr(owner, name, original))
+
+    for target in targets:
+        module, name, original = _resolve(target)
+        if isinstance(original, type):
+            for attribute, value in list(vars(original).items()):
+                label = f"{module.__name__}.{name}.{attribute}"
+                if attribute.startswith("__") or isinstance(
+                    value, (staticmethod, classmethod, property)
+                ):
+                    continue
+                if callable(value):
+                    replace(original, attribute, value, report.wrap(label, value))
+                elif hasattr(value, "func") and hasattr(value, "attrname"):
+                    # functools.cached_property (et general_design._cached_property).
+                    function = value.func
+                    value.func = report.wrap(label, function)
+                    restore.append(
+                        lambda value=value, function=function: setattr(
+                            value, "func", function
+                        )
+                    )
+            continue
+
+        wrappers = {id(original): (original, report.wrap(target, original))}
+        twin = _main_twin(module, name)
+        if twin is not None:
+            wrappers[id(twin)] = (twin, report.wrap(target, twin))
+        for loaded in list(sys.modules.values()):
+            namespace = getattr(loaded, "__dict__", {})
+            for alias, value in list(namespace.items()):
+                found = wrappers.get(id(value))
+                if found is not None and found[0] is value:
+                    replace(loaded, alias, *found)
+
+
+def _listen(report: Profile, restore: list[Callable[[], None]]):
+    """
+    Écoute les requêtes SQL de tous les moteurs SQLAlchemy (voir _patch pour restore).
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    for name, listener in (
+        ("before_cursor_execute", report._before_query),
+        ("after_cursor_execute", report._after_query),
+    ):
+        event.listen(Engine, name, listener)
+        restore.append(
+            lambda name=name, listener=listener: event.remove(Engine, name, listener)
+        )
+
+
+@contextmanager
+def profile(targets: tuple[str, ...] = TARGETS) -> Iterator[Profile]:
+    """
+    Instrumente les calculs pendant la durée du contexte.
+
+    Args:
+        targets (tuple[str, ...], optional): Cibles "module.fonction" ou "module.Classe".
+            Default to TARGETS.
+
+    Yields:
+        Profile: Rapport, complet à la sortie du contexte.
+
+    Raises:
+        RuntimeError: Si un autre contexte d'instrumentation est actif.
+        ImportError, AttributeError: Si une cible n'existe pas (les cibles déjà
+            instrumentées sont remises en place).
+
+    """
+    global _ACTIVE  # pylint: disable=global-statement
+    with _ACTIVE_LOCK:
+        if _ACTIVE is not None:
+            raise RuntimeError("Un profil est déjà actif.")
+        report = _ACTIVE = Profile()
+    restore = []
+    try:
+        _patch(report, targets, restore)
+        _listen(report, restore)
+        yield report
+    finally:
+        for undo in reversed(restore):
+            undo()
+        with _ACTIVE_LOCK:
+            _ACTIVE = None
+
+
+@contextmanager
+def from_environment(targets: tuple[str, ...] = TARGETS) -> Iterator[Profile | None]:
+    """
+    Instrumente les calculs si la variable d'environnement CSA_O86_PROFILE est définie.
+
+    À la sortie (même sur une exception, ex: Ctrl+C du service), le rapport JSON est
+    enregistré au chemin de la variable et les piles d'appels dans le même fichier avec
+    l'extension .folded.
+
+    Args:
+        targets (tuple[str, ...], optional): Voir profile.
+
+    Yields:
+        Profile | None: Rapport, ou None si l'instrumentation est désactivée.
+
+    """
+    path = os.environ.get(ENVIRONMENT)
+    if not path:
+        yield None
+        return
+
+    report = None
+    try:
+        with profile(targets) as report:
+            yield report
+    finally:
+        if report is not None:
+            report.save(path)
+            report.save_folded(os.path.splitext(path)[0] + ".folded")
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour l'instrumentation.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import tempfile
+    import database
+    import general_design
+    import sawn_lumber
+    import sawn_lumber_batch
+    import schedule_check
+
+    originals = (
+        sawn_lumber.specified_strengths,
+        sawn_lumber.snapshot,
+        sawn_lumber.Resistances.bending_moment,
+    )
+
+    with profile() as report:
+        database.reload()
+        for _ in range(3):
+            sawn_lumber.specified_strengths("Beam", "spf", "ss")
+        sawn_lumber.Resistances(89, 235).bending_moment(11.8, lateral_support=True)
+        general_design.FireResistance(60, 235, 400).effective_section()
+        general_design.Vibration(
+            span=4,
+            joist_axial_stiffness=1e8,
+            joist_bending_stiffness=5e5,
+            joist_depth=0.24,
+            joist_mass=5,
+            topping="OSB 3/4",
+        ).max_span()
+
+    # Test calls
+    functions = report.to_dict()["functions"]
+    test_calls = (
+        functions["sawn_lumber.specified_strengths"]["calls"],
+        functions["sawn_lumber.Resistances.bending_moment"]["calls"],
+        functions["general_design.FireResistance.effective_section"]["calls"],
+        functions["general_design.Vibration.max_span"]["calls"],
+    )
+    expected_result = (3, 1, 1, 1)
+    assert (
+        test_calls == expected_result
+    ), f"profile calls -> FAILED\n {expected_result = }\n {test_calls = }"
+
+    # Test database round-trips
+    test_queries = functions["database._load"]["queries"]
+    assert (
+        test_queries >= 3 and functions[SQL]["calls"] == test_queries
+    ), f"profile queries -> FAILED\n {test_queries = }"
+
+    # Test stacks
+    test_stack = any(stack[-2:] == ("database._load", SQL) for stack in report.stacks)
+    assert test_stack, f"profile stacks -> FAILED\n {report.stacks = }"
+    for line in report.folded().splitlines():
+        stack, micros = line.rsplit(" ", 1)
+        assert stack and int(micros) >= 0, f"folded -> FAILED\n {line = }"
+    json.dumps(report.to_dict())
+
+    # Test restore
+    test_restore = (
+        sawn_lumber.specified_strengths,
+        sawn_lumber.snapshot,
+        sawn_lumber.Resistances.bending_moment,
+    )
+    assert test_restore == originals, f"profile restore -> FAILED\n {test_restore = }"
+    try:
+        with profile(TARGETS + ("sawn_lumber.inconnu",)):
+            pass
+    except AttributeError:
+        pass
+    test_restore = (
+        sawn_lumber.specified_strengths,
+        sawn_lumber.snapshot,
+        sawn_lumber.Resistances.bending_moment,
+    )
+    assert (
+        test_restore == originals and _ACTIVE is None
+    ), f"profile restore on error -> FAILED\n {test_restore = }"
+
+    # Test batch functions
+    with profile() as report:
+        sawn_lumber_batch.bending_moment([89, 89], [235, 286], 11.8)
+        schedule_check.check_rows([{"b": "2", "d": "10", "grade": "n1-n2"}])
+    test_stack = (
+        "schedule_check.check_rows",
+        "sawn_lumber_batch.bending_moment",
+    ) in report.stacks
+    test_calls = report.functions["sawn_lumber_batch.bending_moment"].calls
+    assert (
+        test_calls == 2 and test_stack
+    ), f"profile batch -> FAILED\n {test_calls = }\n {report.stacks = }"
+
+    # Test from_environment
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.pop(ENVIRONMENT, None)
+        with from_environment() as disabled:
+            assert disabled is None, f"from_environment -> FAILED\n {disabled = }"
+        path = os.path.join(directory, "profil.json")
+        os.environ[ENVIRONMENT] = path
+        try:
+            with from_environment():
+                sawn_lumber.sizes(4)
+        finally:
+            del os.environ[ENVIRONMENT]
+        with open(path, encoding="utf-8") as file:
+            test_saved = json.load(file)["functions"]["sawn_lumber.sizes"]["calls"]
+        expected_result = 1
+        assert test_saved == expected_result and os.path.exists(
+            os.path.join(directory, "profil.folded")
+        ), f"from_environment -> FAILED\n {expected_result = }\n {test_saved = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
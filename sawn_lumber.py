@@ -55,54 +55,14 @@ ________________________________________________________________________________
 
 # IMPORTS
 from dataclasses import dataclass
+from typing import NamedTuple
+import bisect
+import functools
 import math
-from sqlalchemy import orm, create_engine, Column, TEXT, REAL, INTEGER
+from database import snapshot
 import general_design
 
 
-# DB CONNECTION
-@dataclass
-class SawnLumberStrengths(orm.declarative_base()):
-    """
-    Se connecte à la table sawn_lumber_strengths de csa_o86_19.db.
-
-    """
-
-    __tablename__ = "sawn_lumber_strengths"
-    index: int = Column("index", INTEGER, primary_key=True)  # type: ignore
-    category: str = Column("category", TEXT)  # type: ignore
-    specie: str = Column("specie", TEXT)  # type: ignore
-    grade: str = Column("grade", TEXT)  # type: ignore
-    fb: float = Column("fb", REAL)  # type: ignore
-    fv: float = Column("fv", REAL)  # type: ignore
-    fc: float = Column("fc", REAL)  # type: ignore
-    fcp: float = Column("fcp", REAL)  # type: ignore
-    ft: float = Column("ft", REAL)  # type: ignore
-    e: int = Column("e", INTEGER)  # type: ignore
-    e05: int = Column("e05", INTEGER)  # type: ignore
-    engine = create_engine("sqlite:///csa_o86_19.db")
-    Session = orm.sessionmaker(engine)
-    session = Session()
-
-
-@dataclass
-class LumberSizes(orm.declarative_base()):
-    """
-    Se connecte à la table lumber_sizes de csa_o86_19.db.
-
-    """
-
-    __tablename__ = "lumber_sizes"
-    nominal: int = Column("nominal", INTEGER, primary_key=True)  # type: ignore
-    dry: int = Column("dry", INTEGER)  # type: ignore
-    green: int = Column("green", INTEGER)  # type: ignore
-    dry_brut: int = Column("dry_brut", INTEGER)  # type: ignore
-    green_brut: int = Column("green_brut", INTEGER)  # type: ignore
-    engine = create_engine("sqlite:///csa_o86_19.db")
-    Session = orm.sessionmaker(engine)
-    session = Session()
-
-
 # CODE
 def lumber_category(
     width: int, depth: int, is_msr: bool = False, is_mel: bool = False
@@ -151,9 +111,61 @@ def lumber_category(
     return category
 
 
+class Strengths(NamedTuple):
+    """
+    6.3 Résistances prévues et modules d'élasticité (voir specified_strengths).
+
+    Args:
+        fb (float): Résistance prévue en flexion, MPa.
+        fv (float): Résistance prévue en cisaillement longitudinal, MPa.
+        fc (float): Résistance prévue en compression parallèle au fil, MPa.
+        fcp (float): Résistance prévue en compression perpendiculaire au fil, MPa.
+        ft (float): Résistance prévue en traction parallèle au fil, MPa.
+        e (float): Module d'élasticité prévu, MPa.
+        e05 (float): Module d'élasticité pour les calculs des éléments en compression, MPa.
+
+    """
+
+    fb: float
+    fv: float
+    fc: float
+    fcp: float
+    ft: float
+    e: float
+    e05: float
+
+
+_STRENGTHS_SNAPSHOT = None
+
+
+@functools.lru_cache(maxsize=1024)
+def _strengths(category: str, specie: str, grade: str, side: bool) -> Strengths:
+    """
+    Résistances prévues d'une clé, avec la réduction du tableau 6.6 (mémorisées).
+
+    """
+    strengths = snapshot().strengths.get((category, specie, grade))
+    if strengths is None:
+        raise ValueError(f"Classe inconnue: {category}, {specie}, {grade}")
+    fb = strengths.fb
+    e = strengths.e
+    e05 = strengths.e05
+    if side and category == "Beam":
+        if grade == "ss":
+            fb *= 0.88
+        else:
+            fb *= 0.77
+            e *= 0.9
+            e05 *= 0.9
+
+    return Strengths(
+        fb, strengths.fv, strengths.fc, strengths.fcp, strengths.ft, e, e05
+    )
+
+
 def specified_strengths(
     category: str, specie: str, grade: str, side: bool = False
-) -> tuple[float, float, float, float, float, float, float]:
+) -> Strengths:
     """
     6.3 Résistances prévues et modules d'élasticité.
 
@@ -175,38 +187,155 @@ def specified_strengths(
         side (bool, optional): Charges appliquées sur la grande face. (Default to False).
 
     Returns:
-        float: fb = Résistance prévue en flexion, MPa.
-        float: fv = Résistance prévue en cisaillement longitudinal, MPa.
-        float: fc = Résistance prévue en compression parallèle au fil, MPa.
-        float: fcp = Résistance prévue en compression perpendiculaire au fil, MPa.
-        float: ft = Résistance prévue en traction parallèle au fil, MPa.
-        float: E = Module d'élasticité prévu, MPa.
-        float: E05 = Module d'élasticité pour les calculs des éléments en compression, MPa.
+        Strengths: fb, fv, fc, fcp, ft, E et E05 (tuple nommé), MPa.
+
+    Raises:
+        ValueError: Si la classe n'existe pas pour la catégorie et le groupe d'essence.
+
+    Les résultats sont mémorisés par (category, specie, grade, side), avec la réduction du
+    tableau 6.6 déjà appliquée. La mémoire est vidée lorsque l'instantané est rechargé.
 
     """
-    strengths = (
-        SawnLumberStrengths.session.query(SawnLumberStrengths)
-        .filter(SawnLumberStrengths.category == category)  # type: ignore
-        .filter(SawnLumberStrengths.specie == specie)  # type: ignore
-        .filter(SawnLumberStrengths.grade == grade)  # type: ignore
-        .first()
-    )
-    fb = strengths.fb  # type: ignore
-    fv = strengths.fv  # type: ignore
-    fc = strengths.fc  # type: ignore
-    fcp = strengths.fcp  # type: ignore
-    ft = strengths.ft  # type: ignore
-    e = strengths.e  # type: ignore
-    e05 = strengths.e05  # type: ignore
-    if side and category == "Beam":
-        if grade == "ss":
-            fb *= 0.88
+    global _STRENGTHS_SNAPSHOT  # pylint: disable=global-statement
+    current = snapshot()
+    if current is not _STRENGTHS_SNAPSHOT:
+        _strengths.cache_clear()
+        _STRENGTHS_SNAPSHOT = current
+
+    return _strengths(category, specie, grade, bool(side))
+
+
+# 6.4 Coefficients de correction (tableaux 6.10 à 6.13).
+PROPERTIES = ("flex", "cis_f", "cis_v", "comp_para", "comp_perp", "trac", "moe")
+
+# Tableau 6.10: sec, humide face étroite <= 89, humide face étroite > 89.
+KS_TABLE = (
+    (1, 1, 1, 1, 1, 1, 1),
+    (0.84, 0.7, 0.96, 0.69, 0.67, 0.84, 0.94),
+    (1, 0.7, 1, 0.91, 0.67, 1, 1),
+)
+
+# Tableau 6.11: non traité, traité et incisé sec, traité et incisé humide.
+KT_TABLE = (
+    (1, 1, 1, 1, 1, 1, 1),
+    (0.75, 0.75, 0.75, 0.75, 0.75, 0.75, 0.90),
+    (0.85, 0.85, 0.85, 0.85, 0.85, 0.85, 0.95),
+)
+
+# Tableau 6.12: aucun, poutres composées, cas 1, cas 2, cas 2 MSR.
+KH_TABLE = (
+    (1, 1, 1, 1, 1, 1, 1),
+    (1.1, 1, 1.1, 1, 1, 1, 1),
+    (1.1, 1, 1.1, 1.1, 1, 1.1, 1),
+    (1.4, 1, 1.4, 1.1, 1, 1, 1),
+    (1.2, 1, 1.2, 1.1, 1, 1, 1),
+)
+
+# Tableau 6.13: limites des bandes de la grande face et de la face étroite, mm.
+KZ_LARGE_LIMITS = (114, 140, 159, 210, 286, 337, 362)
+KZ_SMALL_LIMITS = (89, 114)
+
+# Tableau 6.13: [bande de la grande face][bande de la face étroite].
+# Faces étroites: 38 @ 64, 89 @ 102, 114 et +.
+KZ_TABLE = (
+    # Grande face 38, 64, 89
+    (
+        (1.7, 1.7, 1.7, 1, 1, 1.5, 1),
+        (1.7, 1.7, 1.7, 1, 1, 1.5, 1),
+        (1.7, 1.7, 1.7, 1, 1, 1.5, 1),
+    ),
+    # Grande face 114
+    (
+        (1.5, 1.5, 1.5, 1, 1, 1.4, 1),
+        (1.6, 1.6, 1.6, 1, 1, 1.4, 1),
+        (1.3, 1.3, 1.3, 1, 1, 1.4, 1),
+    ),
+    # Grande face 140
+    (
+        (1.4, 1.4, 1.4, 1, 1, 1.3, 1),
+        (1.5, 1.5, 1.5, 1, 1, 1.3, 1),
+        (1.3, 1.3, 1.3, 1, 1, 1.3, 1),
+    ),
+    # Grande face 184 @ 191
+    (
+        (1.2, 1.2, 1.2, 1, 1, 1.2, 1),
+        (1.3, 1.3, 1.3, 1, 1, 1.2, 1),
+        (1.3, 1.3, 1.3, 1, 1, 1.2, 1),
+    ),
+    # Grande face 235 @ 241
+    (
+        (1.1, 1.1, 1.1, 1, 1, 1.1, 1),
+        (1.2, 1.2, 1.2, 1, 1, 1.1, 1),
+        (1.2, 1.2, 1.2, 1, 1, 1.1, 1),
+    ),
+    # Grande face 286 @ 292
+    (
+        (1, 1, 1, 1, 1, 1, 1),
+        (1.1, 1.1, 1.1, 1, 1, 1, 1),
+        (1.1, 1.1, 1.1, 1, 1, 1, 1),
+    ),
+    # Grande face 337 @ 343
+    (
+        (0.9, 0.9, 0.9, 1, 1, 0.9, 1),
+        (1, 1, 1, 1, 1, 0.9, 1),
+        (1, 1, 1, 1, 1, 0.9, 1),
+    ),
+    # Grande face 387 et +
+    (
+        (0.8, 0.8, 0.8, 1, 1, 0.8, 1),
+        (0.9, 0.9, 0.9, 1, 1, 0.8, 1),
+        (0.9, 0.9, 0.9, 1, 1, 0.8, 1),
+    ),
+)
+
+_PROP_INDEX = {prop: i for i, prop in enumerate(PROPERTIES)}
+
+
+def _factor_rows(
+    width: int,
+    depth: int,
+    category: str,
+    wet_service: bool,
+    treated: bool,
+    incised: bool,
+    _2ft_spacing: bool,
+    connected_subfloor: bool,
+    built_up_beam: bool,
+) -> tuple[tuple, tuple, tuple, tuple]:
+    """
+    Lignes des tableaux 6.10 à 6.13 qui s'appliquent à l'élément.
+
+    Returns:
+        tuple: Ks, Kt, Kh et Kz pour chacune des propriétés de PROPERTIES.
+
+    """
+    small = min(width, depth)
+    large = max(width, depth)
+
+    # 6.4.2 Coefficient de conditions d'utilisation, Ks (tableau 6.10)
+    ks = KS_TABLE[(1 + (small > 89)) if wet_service else 0]
+
+    # 6.4.3 Coefficient de traitement, Kt (tableau 6.11)
+    kt = KT_TABLE[(1 + wet_service) if treated and incised and small <= 89 else 0]
+
+    # 6.4.4 Coefficient de système, Kh (tableau 6.12)
+    if _2ft_spacing:
+        if connected_subfloor:
+            kh = KH_TABLE[4 if category == "MSR" else 3]
         else:
-            fb *= 0.77
-            e *= 0.9
-            e05 *= 0.9
+            kh = KH_TABLE[2]
+    else:
+        kh = KH_TABLE[1 if built_up_beam else 0]
+
+    # 6.4.5 Coefficient de dimensions, Kz (tableau 6.13)
+    if category in ("Light", "MSR", "MEL"):
+        kz = (1,) * len(PROPERTIES)
+    else:
+        kz = KZ_TABLE[bisect.bisect_right(KZ_LARGE_LIMITS, large)][
+            bisect.bisect_right(KZ_SMALL_LIMITS, small)
+        ]
 
-    return fb, fv, fc, fcp, ft, e, e05
+    return ks, kt, kh, kz
 
 
 def modification_factors(
@@ -253,357 +382,63 @@ def modification_factors(
         float: Kz = Coefficient de dimensions.
 
     """
-    small = min(width, depth)
-    large = max(width, depth)
+    i = _PROP_INDEX[prop]
 
     # 6.4.1 Coefficient de durée d'application de la charge, Kd.
     kd = general_design.load_duration(duration)
 
-    # 6.4.2 Coefficient de conditions d'utilisation, Ks (tableau 6.10)
-    if wet_service:
-        if small > 89:
-            ks = {
-                "flex": 1,
-                "cis_f": 0.7,
-                "cis_v": 1,
-                "comp_para": 0.91,
-                "comp_perp": 0.67,
-                "trac": 1,
-                "moe": 1,
-            }[prop]
-        else:
-            ks = {
-                "flex": 0.84,
-                "cis_f": 0.7,
-                "cis_v": 0.96,
-                "comp_para": 0.69,
-                "comp_perp": 0.67,
-                "trac": 0.84,
-                "moe": 0.94,
-            }[prop]
-    else:
-        ks = 1
+    ks, kt, kh, kz = _factor_rows(
+        width,
+        depth,
+        category,
+        wet_service,
+        treated,
+        incised,
+        _2ft_spacing,
+        connected_subfloor,
+        built_up_beam,
+    )
 
-    # 6.4.3 Coefficient de traitement, Kt (tableau 6.11)
-    if treated and incised and small <= 89:
-        if wet_service:
-            if prop == "moe":
-                kt = 0.95
-            else:
-                kt = 0.85
-        else:
-            if prop == "moe":
-                kt = 0.90
-            else:
-                kt = 0.75
-    else:
-        kt = 1
+    return kd, ks[i], kt[i], kh[i], kz[i]
 
-    # 6.4.4 Coefficient de système, Kh (tableau 6.12)
-    if _2ft_spacing:
-        if connected_subfloor:
-            if category == "MSR":
-                # Cas 2 MSR
-                kh = {
-                    "flex": 1.2,
-                    "cis_f": 1,
-                    "cis_v": 1.2,
-                    "comp_para": 1.1,
-                    "comp_perp": 1,
-                    "trac": 1,
-                    "moe": 1,
-                }[prop]
-            else:
-                # Cas 2
-                kh = {
-                    "flex": 1.4,
-                    "cis_f": 1,
-                    "cis_v": 1.4,
-                    "comp_para": 1.1,
-                    "comp_perp": 1,
-                    "trac": 1,
-                    "moe": 1,
-                }[prop]
-        else:
-            # Cas 1
-            kh = {
-                "flex": 1.1,
-                "cis_f": 1,
-                "cis_v": 1.1,
-                "comp_para": 1.1,
-                "comp_perp": 1,
-                "trac": 1.1,
-                "moe": 1,
-            }[prop]
-    else:
-        if built_up_beam:
-            # Cas poutres composées
-            kh = {
-                "flex": 1.1,
-                "cis_f": 1,
-                "cis_v": 1.1,
-                "comp_para": 1,
-                "comp_perp": 1,
-                "trac": 1,
-                "moe": 1,
-            }[prop]
-        else:
-            kh = 1
 
-    # 6.4.5 Coefficient de dimensions, Kz (tableau 6.13)
-    if category in ("Light", "MSR", "MEL"):
-        kz = 1
-    else:
-        # Grande face 38, 64, 89
-        if large < 114:
-            kz = {
-                "flex": 1.7,
-                "cis_f": 1.7,
-                "cis_v": 1.7,
-                "comp_para": 1,
-                "comp_perp": 1,
-                "trac": 1.5,
-                "moe": 1,
-            }[prop]
-        # Grande face 114
-        elif large < 140:
-            # Face étroite 114 et +
-            if small >= 114:
-                kz = {
-                    "flex": 1.3,
-                    "cis_f": 1.3,
-                    "cis_v": 1.3,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.4,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 89 @ 102
-            elif small >= 89:
-                kz = {
-                    "flex": 1.6,
-                    "cis_f": 1.6,
-                    "cis_v": 1.6,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.4,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 38 @ 64
-            else:
-                kz = {
-                    "flex": 1.5,
-                    "cis_f": 1.5,
-                    "cis_v": 1.5,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.4,
-                    "moe": 1,
-                }[prop]
-        # Grande face 140
-        elif large < 159:
-            # Face étroite 114 et +
-            if small >= 114:
-                kz = {
-                    "flex": 1.3,
-                    "cis_f": 1.3,
-                    "cis_v": 1.3,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.3,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 89 @ 102
-            elif small >= 89:
-                kz = {
-                    "flex": 1.5,
-                    "cis_f": 1.5,
-                    "cis_v": 1.5,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.3,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 38 @ 64
-            else:
-                kz = {
-                    "flex": 1.4,
-                    "cis_f": 1.4,
-                    "cis_v": 1.4,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.3,
-                    "moe": 1,
-                }[prop]
-        # Grande face 184 @ 191
-        elif large < 210:
-            # Face étroite 114 et +
-            if small >= 114:
-                kz = {
-                    "flex": 1.3,
-                    "cis_f": 1.3,
-                    "cis_v": 1.3,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.2,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 89 @ 102
-            elif small >= 89:
-                kz = {
-                    "flex": 1.3,
-                    "cis_f": 1.3,
-                    "cis_v": 1.3,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.2,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 38 @ 64
-            else:
-                kz = {
-                    "flex": 1.2,
-                    "cis_f": 1.2,
-                    "cis_v": 1.2,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.2,
-                    "moe": 1,
-                }[prop]
-        # Grande face 235 @ 241
-        elif large < 286:
-            # Face étroite 114 et +
-            if small >= 114:
-                kz = {
-                    "flex": 1.2,
-                    "cis_f": 1.2,
-                    "cis_v": 1.2,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.1,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 89 @ 102
-            elif small >= 89:
-                kz = {
-                    "flex": 1.2,
-                    "cis_f": 1.2,
-                    "cis_v": 1.2,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.1,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 38 @ 64
-            else:
-                kz = {
-                    "flex": 1.1,
-                    "cis_f": 1.1,
-                    "cis_v": 1.1,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1.1,
-                    "moe": 1,
-                }[prop]
-        # Grande face 286 @ 292
-        elif large < 337:
-            # Face étroite 114 et +
-            if small >= 114:
-                kz = {
-                    "flex": 1.1,
-                    "cis_f": 1.1,
-                    "cis_v": 1.1,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 89 @ 102
-            elif small >= 89:
-                kz = {
-                    "flex": 1.1,
-                    "cis_f": 1.1,
-                    "cis_v": 1.1,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 1,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 38 @ 64
-            else:
-                kz = 1
-        # Grande face 337 @ 343
-        elif large < 362:
-            # Face étroite 114 et +
-            if small >= 114:
-                kz = {
-                    "flex": 1,
-                    "cis_f": 1,
-                    "cis_v": 1,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 0.9,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 89 @ 102
-            elif small >= 89:
-                kz = {
-                    "flex": 1,
-                    "cis_f": 1,
-                    "cis_v": 1,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 0.9,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 38 @ 64
-            else:
-                kz = {
-                    "flex": 0.9,
-                    "cis_f": 0.9,
-                    "cis_v": 0.9,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 0.9,
-                    "moe": 1,
-                }[prop]
-        # Grande face 387 et +
-        else:
-            # Face étroite 114 et +
-            if small >= 114:
-                kz = {
-                    "flex": 0.9,
-                    "cis_f": 0.9,
-                    "cis_v": 0.9,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 0.8,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 89 @ 102
-            elif small >= 89:
-                kz = {
-                    "flex": 0.9,
-                    "cis_f": 0.9,
-                    "cis_v": 0.9,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 0.8,
-                    "moe": 1,
-                }[prop]
-            # Face étroite 38 @ 64
-            else:
-                kz = {
-                    "flex": 0.8,
-                    "cis_f": 0.8,
-                    "cis_v": 0.8,
-                    "comp_para": 1,
-                    "comp_perp": 1,
-                    "trac": 0.8,
-                    "moe": 1,
-                }[prop]
+def all_modification_factors(
+    width: int,
+    depth: int,
+    duration: str,
+    category: str,
+    wet_service: bool = False,
+    treated: bool = False,
+    incised: bool = False,
+    _2ft_spacing: bool = False,
+    connected_subfloor: bool = False,
+    built_up_beam: bool = False,
+) -> dict[str, tuple[float, float, float, float, float]]:
+    """
+    6.4 Coefficients de correction pour toutes les propriétés.
+
+    Args:
+        Voir modification_factors (sans prop).
+
+    Returns:
+        dict: (Kd, Ks, Kt, Kh, Kz) pour chacune des propriétés de PROPERTIES.
+
+    """
+    kd = general_design.load_duration(duration)
+
+    ks, kt, kh, kz = _factor_rows(
+        width,
+        depth,
+        category,
+        wet_service,
+        treated,
+        incised,
+        _2ft_spacing,
+        connected_subfloor,
+        built_up_beam,
+    )
 
-    return kd, ks, kt, kh, kz
+    return {prop: (kd, ks[i], kt[i], kh[i], kz[i]) for i, prop in enumerate(PROPERTIES)}
 
 
 def sizes(
@@ -623,11 +458,7 @@ def sizes(
         int: Dimension nette, mm.
 
     """
-    table = (
-        LumberSizes.session.query(LumberSizes)
-        .filter(LumberSizes.nominal == dimension)  # type: ignore
-        .first()
-    )
+    table = snapshot().sizes.get(dimension)
     if not table:
         dim = int(round(dimension * 25.4))
     elif green and brut:
@@ -641,7 +472,7 @@ def sizes(
     return dim
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Resistances:
     """
     6.5 Calcul des résistances.
@@ -654,6 +485,8 @@ class Resistances:
         kt (float, optional): Coefficient de traitement.
         ply (int, optional): Nombre de plis si élément composée. Default to 1.
 
+    Les instances sont immuables et hachables (__slots__, utilisables comme clés de cache).
+
     """
 
     b: int
@@ -1174,6 +1007,9 @@ def _tests():
     Tests pour les calculs de bois de sciage.
 
     """
+    # pylint: disable=import-outside-toplevel
+    import database
+
     # Test lumber_category
     test_lumber_category = lumber_category(
         width=38,
@@ -1198,6 +1034,19 @@ def _tests():
         test_specified_strengths == expected_result
     ), f"specified_strengths -> FAILED\n {expected_result = }\n {test_specified_strengths = }"
 
+    # Test specified_strengths memoization and reload
+    test_memo = specified_strengths("Beam", "spf", "n1", True)
+    expected_result = specified_strengths("Beam", "spf", "n1", True)
+    assert (
+        test_memo is expected_result
+        and test_memo.fb == snapshot().strengths[("Beam", "spf", "n1")].fb * 0.77
+    ), f"specified_strengths memo -> FAILED\n {expected_result = }\n {test_memo = }"
+    database.reload()
+    test_reload = specified_strengths("Beam", "spf", "n1", True)
+    assert (
+        test_reload is not test_memo and test_reload == test_memo
+    ), f"specified_strengths reload -> FAILED\n {test_reload = }"
+
     # Test modification_factors
     test_modification_factors = modification_factors(
         width=38,
@@ -1384,6 +1233,12 @@ def _tests():
     assert (
         test_combined_bending_axial_2 == expected_result
     ), f"combined_bending_axial_2 -> FAILED\n {expected_result = }\n {test_combined_bending_axial_2 = }"
+    # Test Resistances as a cache key
+    test_key = {Resistances(89, 235, 1.15): "clé"}.get(Resistances(89, 235, 1.15))
+    expected_result = "clé"
+    assert (
+        test_key == expected_result
+    ), f"Resistances hash -> FAILED\n {expected_result = }\n {test_key = }"
     print("All tests passed.")
 
 
@@ -0,0 +1,1470 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+6 Bois de sciage - Calculs en lot.
+----------------------------------------------------
+
+Versions vectorisées (NumPy) des calculs de sawn_lumber pour vérifier plusieurs éléments en
+une seule passe. Les arguments sont des tableaux (ou des scalaires) diffusés ensemble.
+
+Les résultats sont identiques, bit pour bit, à ceux des méthodes de sawn_lumber.Resistances.
+Lorsque la méthode scalaire lève une exception, la version en lot retourne nan et un code
+d'état (voir Status) pour l'élément concerné.
+
+6.2 Matériaux (catégories) et 6.5.2 Dimensions.
+
+6.3 Résistances prévues et modules d'élasticité (tableau structuré).
+
+6.4 Coefficients de correction.
+
+6.5 Calcul des résistances.
+
+    6.5.3 Résistance au moment de flexion.
+
+    6.5.4 Résistance au cisaillement.
+
+    6.5.5 Résistance à la compression parallèle au fil.
+
+    6.5.6 Résistance à la compression perpendiculaire au fil (et longueur d'appui minimale).
+
+    6.5.7 Résistance à la compression oblique par rapport au fil.
+
+    6.5.9 Résistance à la flexion et à la charge axiale combinées.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from enum import IntEnum
+import math
+import numpy as np
+import general_design
+import sawn_lumber
+
+
+# CODE
+class Status(IntEnum):
+    """
+    Codes d'état retournés par les calculs en lot.
+
+    """
+
+    OK = 0
+    KL = 1  # Valider Kl selon 7.5.6.4.
+    NOTCH_DEPTH = 2  # dn > 0.25d.
+    INVALID = 3  # Données non valides (ex: entaille négative).
+    PLY = 4  # Plus de 5 plis pour un élément composé en compression.
+    UNSTABLE = 5  # Conditions d'appuis aux extrémités instables.
+    SLENDERNESS = 6  # Cc > 50 (ou Cc > 80 avec cales d'espacement).
+    FIRE_SECTION = 7  # Section effective de moins de 70 mm (tableau B.2).
+
+
+def _pow(base: np.ndarray, exponent: float) -> np.ndarray:
+    """
+    Puissance élément par élément identique à l'opérateur ** de Python.
+
+    NumPy n'arrondit pas toujours x**p comme la fonction pow de Python. Le calcul vectorisé
+    n'est donc utilisé que lorsqu'il est exact (entiers et exposant entier positif); sinon,
+    pow est appliquée une fois par valeur distincte.
+
+    Args:
+        base (np.ndarray): Base.
+        exponent (float): Exposant.
+
+    Returns:
+        np.ndarray: base**exponent.
+
+    """
+    if isinstance(exponent, int) and exponent >= 0:
+        if np.issubdtype(base.dtype, np.integer):
+            return base**exponent
+        if np.all(np.abs(base) < 2**20) and np.all(base == np.trunc(base)):
+            return base**exponent
+
+    uniques, inverse = np.unique(base, return_inverse=True)
+    values = np.array([x**exponent for x in uniques.tolist()], dtype=float)
+    return values[inverse].reshape(base.shape)
+
+
+def _notch_factor(d: float, dn: float, e: float) -> float:
+    """
+    Coefficient d'entaille, Kn (6.5.4.2), identique à sawn_lumber.Resistances.shear.
+
+    """
+    a = 1 - (dn / d)
+    n = e / d
+    kn = (0.006 * d * (1.6 * ((1 / a) - 1) + n**2 * ((1 / a**3) - 1))) ** (-1 / 2)
+
+    return kn
+
+
+_KS_TABLE = np.array(sawn_lumber.KS_TABLE, dtype=float)
+_KT_TABLE = np.array(sawn_lumber.KT_TABLE, dtype=float)
+_KH_TABLE = np.array(sawn_lumber.KH_TABLE, dtype=float)
+_KZ_TABLE = np.array(sawn_lumber.KZ_TABLE, dtype=float)
+
+
+def _map_unique(values: np.ndarray, function) -> np.ndarray:
+    """
+    Applique une fonction scalaire une seule fois par valeur distincte.
+
+    Args:
+        values (np.ndarray): Valeurs (ex: durées ou propriétés).
+        function (callable): Fonction appliquée à chaque valeur distincte.
+
+    Returns:
+        np.ndarray: function(value) pour chaque élément de values.
+
+    """
+    uniques, inverse = np.unique(values, return_inverse=True)
+    mapped = np.array([function(value) for value in uniques.tolist()])
+
+    return mapped[inverse].reshape(values.shape)
+
+
+# Catégories de lumber_category, par code.
+_CATEGORIES = np.array(
+    [
+        "Lumber",
+        "Light",
+        "Beam",
+        "Post",
+        "MEL",
+        "MSR",
+        "Valider la disponibilité du bois chez les fournisseurs.",
+        "",
+    ]
+)
+
+
+def lumber_category(
+    width, depth, is_msr=False, is_mel=False
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    6.2 Matériaux, par élément.
+
+    Args:
+        width (array_like): Largeur de l'élément, mm.
+        depth (array_like): Hauteur de l'élément, mm.
+        is_msr (array_like, optional): Bois classé mécaniquement par résistance (MSR).
+        is_mel (array_like, optional): Bois évalué par machine (MEL).
+
+    Returns:
+        np.ndarray: Catégorie de bois d'oeuvre (voir sawn_lumber.lumber_category). "" si une
+            dimension est plus petite que 38 mm.
+        np.ndarray: Codes d'état (Status.INVALID si une dimension est plus petite que 38 mm).
+
+    """
+    width, depth, is_msr, is_mel = np.broadcast_arrays(
+        *map(np.asarray, (width, depth, is_msr, is_mel))
+    )
+    small = np.minimum(width, depth)
+    large = np.maximum(width, depth)
+
+    code = np.select(
+        [
+            (small < 89) & (large < 89),
+            (small >= 114) & (large - small >= 51),
+            small >= 114,
+        ],
+        [1, 2, 3],
+        default=0,
+    )
+    code = np.where(is_mel.astype(bool), 4, code)
+    code = np.where(is_msr.astype(bool), 5, code)
+    code = np.where(large > 412, 6, code)
+
+    invalid = small < 38
+    category = _CATEGORIES[np.where(invalid, 7, code)]
+    status = np.where(invalid, Status.INVALID, Status.OK).astype(np.int8)
+
+    return category, status
+
+
+_SIZES: tuple = (None, None, None)  # (instantané, dimensions nominales, table)
+
+
+def _sizes_table() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Table de correspondance de lumber_sizes, construite une fois par instantané.
+
+    """
+    global _SIZES  # pylint: disable=global-statement
+    current = sawn_lumber.snapshot()
+    if _SIZES[0] is not current:
+        rows = sorted(current.sizes.values(), key=lambda row: row.nominal)
+        nominal = np.array([row.nominal for row in rows], dtype=float)
+        # Colonnes: sec, vert, brut sec, brut vert.
+        table = np.array(
+            [(row.dry, row.green, row.dry_brut, row.green_brut) for row in rows]
+        )
+        _SIZES = (current, nominal, table)
+
+    return _SIZES[1], _SIZES[2]
+
+
+def sizes(dimension, green=False, brut=False) -> np.ndarray:
+    """
+    6.5.2 Dimensions, par élément.
+
+    Table de correspondance construite une fois par instantané de lumber_sizes (reconstruite
+    après database.reload); une dimension absente de la table vaut round(dimension * 25.4),
+    comme sawn_lumber.sizes.
+
+    Args:
+        dimension (array_like): Dimension nominale, po.
+        green (array_like, optional): Bois vert (teneur en humidité > 19%). Default to False.
+        brut (array_like, optional): Dimensions brutes. Default to False.
+
+    Returns:
+        np.ndarray: Dimension nette, mm.
+
+    """
+    dimension, green, brut = np.broadcast_arrays(
+        *map(np.asarray, (dimension, green, brut))
+    )
+    nominal, table = _sizes_table()
+
+    index = np.minimum(np.searchsorted(nominal, dimension), nominal.size - 1)
+    found = nominal[index] == dimension
+    column = green.astype(int) + 2 * brut.astype(int)
+
+    return np.where(found, table[index, column], np.rint(dimension * 25.4)).astype(int)
+
+
+# Champs du tableau structuré de specified_strengths (voir sawn_lumber.Strengths).
+STRENGTHS_DTYPE = np.dtype([(name, float) for name in sawn_lumber.Strengths._fields])
+
+
+def specified_strengths(category, specie, grade, side=False) -> np.ndarray:
+    """
+    6.3 Résistances prévues et modules d'élasticité, par élément.
+
+    Chaque clé distincte est résolue une seule fois par sawn_lumber.specified_strengths
+    (valeurs identiques).
+
+    Args:
+        category (array_like): Catégorie.
+        specie (array_like): Groupe d'essence.
+        grade (array_like): Classe.
+        side (array_like, optional): Charges appliquées sur la grande face. Default to False.
+
+    Returns:
+        np.ndarray: Tableau structuré (STRENGTHS_DTYPE: fb, fv, fc, fcp, ft, e, e05), de la
+            forme diffusée des clés. nan pour une clé inconnue.
+
+    """
+    category, specie, grade, side = np.broadcast_arrays(
+        *map(np.asarray, (category, specie, grade, side))
+    )
+    keys = np.char.add(
+        np.char.add(np.char.add(category.astype(str), "|"), specie.astype(str)),
+        np.char.add("|", grade.astype(str)),
+    )
+    uniques, inverse = np.unique(keys, return_inverse=True)
+
+    table = np.zeros((uniques.size, 2), dtype=STRENGTHS_DTYPE)
+    for name in STRENGTHS_DTYPE.names:
+        table[name] = np.nan
+    for i, key in enumerate(uniques.tolist()):
+        for loaded in (False, True):
+            try:
+                table[i, int(loaded)] = sawn_lumber.specified_strengths(
+                    *key.split("|"), loaded
+                )
+            except ValueError:
+                pass
+
+    return table[inverse.ravel(), side.astype(bool).ravel().astype(int)].reshape(
+        keys.shape
+    )
+
+
+def modification_factors(
+    width,
+    depth,
+    prop,
+    duration,
+    category,
+    wet_service=False,
+    treated=False,
+    incised=False,
+    _2ft_spacing=False,
+    connected_subfloor=False,
+    built_up_beam=False,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    6.4 Coefficients de correction.
+
+    Args:
+        width (array_like): Largeur de l'élément, mm.
+        depth (array_like): Hauteur de l'élément, mm.
+        prop (array_like): Propriété évaluée. Voir sawn_lumber.PROPERTIES.
+        duration (array_like): Durée d'application de la charge.
+            Choices: "courte", "normale", "continue".
+        category (array_like): Catégorie.
+            Choices: "Lumber", "Light", "Beam", "Post", "MSR", "MEL".
+
+        wet_service (array_like, optional): Utilisation en milieu humide, Default to False.
+        treated (array_like, optional): Bois traité, Default to False.
+        incised (array_like, optional): Bois incisé, Default to False.
+        _2ft_spacing (array_like, optional): L'espacement ne dépasse pas 610 mm, Default to False.
+        connected_subfloor (array_like, optional): Sous-plancher fixé, Default to False.
+        built_up_beam (array_like, optional): Poutres composées, Default to False.
+
+    Returns:
+        np.ndarray: Kd = Coefficient de durée d'application de la charge.
+        np.ndarray: Ks = Coefficient de conditions d'utilisation.
+        np.ndarray: Kt = Coefficient de traitement.
+        np.ndarray: Kh = Coefficient de système.
+        np.ndarray: Kz = Coefficient de dimensions.
+
+    Raises:
+        ValueError: Si une propriété ou une durée n'est pas reconnue.
+
+    """
+    (
+        width,
+        depth,
+        prop,
+        duration,
+        category,
+        wet,
+        treated,
+        incised,
+        spacing,
+        subfloor,
+        built_up,
+    ) = np.broadcast_arrays(
+        *map(
+            np.asarray,
+            (
+                width,
+                depth,
+                prop,
+                duration,
+                category,
+                wet_service,
+                treated,
+                incised,
+                _2ft_spacing,
+                connected_subfloor,
+                built_up_beam,
+            ),
+        )
+    )
+    wet = wet.astype(bool)
+    treated = treated.astype(bool)
+    incised = incised.astype(bool)
+    spacing = spacing.astype(bool)
+    subfloor = subfloor.astype(bool)
+    built_up = built_up.astype(bool)
+
+    small = np.minimum(width, depth)
+    large = np.maximum(width, depth)
+    i = _map_unique(prop, sawn_lumber.PROPERTIES.index)
+
+    # 6.4.1 Coefficient de durée d'application de la charge, Kd.
+    kd = _map_unique(duration, general_design.load_duration).astype(float)
+
+    # 6.4.2 Coefficient de conditions d'utilisation, Ks (tableau 6.10)
+    ks = _KS_TABLE[np.where(wet, 1 + (small > 89), 0), i]
+
+    # 6.4.3 Coefficient de traitement, Kt (tableau 6.11)
+    kt = _KT_TABLE[np.where(treated & incised & (small <= 89), 1 + wet, 0), i]
+
+    # 6.4.4 Coefficient de système, Kh (tableau 6.12)
+    kh_row = np.where(
+        spacing,
+        np.where(subfloor, np.where(category == "MSR", 4, 3), 2),
+        np.where(built_up, 1, 0),
+    )
+    kh = _KH_TABLE[kh_row, i]
+
+    # 6.4.5 Coefficient de dimensions, Kz (tableau 6.13)
+    large_band = np.searchsorted(sawn_lumber.KZ_LARGE_LIMITS, large, side="right")
+    small_band = np.searchsorted(sawn_lumber.KZ_SMALL_LIMITS, small, side="right")
+    kz = np.where(
+        np.isin(category, ("Light", "MSR", "MEL")),
+        1.0,
+        _KZ_TABLE[large_band, small_band, i],
+    )
+
+    return kd, ks, kt, kh, kz
+
+
+def bending_moment(
+    b,
+    d,
+    fb,
+    ply=1,
+    kd=1,
+    kh=1,
+    kt=1,
+    ksb=1,
+    kzb=1,
+    lateral_support=False,
+    compressive_edge_support=False,
+    tensile_edge_support=False,
+    blocking_support=False,
+    tie_rods_support=False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    6.5.3 Résistance au moment de flexion.
+
+    Args:
+        b (array_like): Largeur de l'élément, mm.
+        d (array_like): Hauteur de l'élément, mm.
+        fb (array_like): Résistance prévue en flexion, MPa.
+        ply (array_like, optional): Nombre de plis. Default to 1.
+        kd (array_like, optional): Coefficient de durée d'application de la charge.
+        kh (array_like, optional): Coefficient de système.
+        kt (array_like, optional): Coefficient de traitement.
+        ksb (array_like, optional): Coefficient de conditions d'utilisation pour la flexion.
+        kzb (array_like, optional): Coefficient de dimensions pour la flexion.
+
+        lateral_support (array_like, optional): Support latéral aux appuis. Default to False.
+        compressive_edge_support (array_like, optional): Rive comprimée maintenu. Default to False.
+        tensile_edge_support (array_like, optional): Rive en tension maintenu. Default to False.
+        blocking_support (array_like, optional): Entretoises ou entremises. Default to False.
+        tie_rods_support (array_like, optional): Pannes ou tirants. Default to False.
+
+    Returns:
+        np.ndarray: Mr = Résistance pondérée au moment de flexion, N*mm.
+        np.ndarray: Codes d'état (Status.KL lorsque Kl doit être validé selon 7.5.6.4).
+
+    """
+    (
+        b,
+        d,
+        fb,
+        ply,
+        kd,
+        kh,
+        kt,
+        ksb,
+        kzb,
+        lateral,
+        compressive,
+        tensile,
+        blocking,
+        tie_rods,
+    ) = np.broadcast_arrays(
+        *map(
+            np.asarray,
+            (
+                b,
+                d,
+                fb,
+                ply,
+                kd,
+                kh,
+                kt,
+                ksb,
+                kzb,
+                lateral_support,
+                compressive_edge_support,
+                tensile_edge_support,
+                blocking_support,
+                tie_rods_support,
+            ),
+        )
+    )
+    lateral = lateral.astype(bool)
+    compressive = compressive.astype(bool)
+    tensile = tensile.astype(bool)
+    blocking = blocking.astype(bool)
+    tie_rods = tie_rods.astype(bool)
+
+    phi = 0.9
+
+    f_b = fb * (kd * kh * ksb * kt)
+
+    b = b * ply
+    s = (b * _pow(d, 2)) / 6
+
+    rapport_h_l = d / b
+    criteria = np.select(
+        [
+            lateral & compressive & tensile,
+            lateral & compressive & blocking,
+            lateral & compressive,
+            lateral & tie_rods,
+            lateral,
+        ],
+        [9, 7.5, 6.5, 5, 4],
+        default=2.5,
+    )
+
+    status = np.where(rapport_h_l > criteria, Status.KL, Status.OK).astype(np.int8)
+
+    mr = phi * f_b * s * kzb
+    mr = np.where(status == Status.OK, mr, np.nan)
+
+    return mr, status
+
+
+def shear(
+    b,
+    d,
+    fv,
+    ply=1,
+    kd=1,
+    kh=1,
+    kt=1,
+    ksv=1,
+    ksf=1,
+    kzv=1,
+    dn=0,
+    e=0,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    6.5.4 Résistance au cisaillement.
+
+    Args:
+        b (array_like): Largeur de l'élément, mm.
+        d (array_like): Hauteur de l'élément, mm.
+        fv (array_like): Résistance prévue en cisaillement, MPa.
+        ply (array_like, optional): Nombre de plis. Default to 1.
+        kd (array_like, optional): Coefficient de durée d'application de la charge.
+        kh (array_like, optional): Coefficient de système.
+        kt (array_like, optional): Coefficient de traitement.
+        ksv (array_like, optional): Coefficient de conditions d'utilisation pour le cisaillement.
+        ksf (array_like, optional): Coefficient de conditions d'utilisation pour le cisaillement par fissuration.
+        kzv (array_like, optional): Coefficient de dimensions en cisaillement.
+        dn (array_like, optional): Profondeur de l'entaille, mm. 0 ou nan si aucune entaille.
+        e (array_like, optional): Longueur de l'entaille, mm. 0 ou nan si aucune entaille.
+
+    Returns:
+        np.ndarray: Vr = Résistance pondérée au cisaillement, N.
+        np.ndarray: Fr = Résistance pondérée au cisaillement par fissuration, N.
+        np.ndarray: Codes d'état (Status.NOTCH_DEPTH lorsque dn > 0.25d).
+
+    """
+    b, d, fv, ply, kd, kh, kt, ksv, ksf, kzv, dn, e = np.broadcast_arrays(
+        *map(np.asarray, (b, d, fv, ply, kd, kh, kt, ksv, ksf, kzv, dn, e))
+    )
+    if dn.dtype.kind == "f":
+        dn = np.nan_to_num(dn, nan=0)
+    if e.dtype.kind == "f":
+        e = np.nan_to_num(e, nan=0)
+
+    phi = 0.9
+
+    f_v = fv * (kd * kh * ksv * kt)
+    ff = 0.5
+    f_f = ff * (kd * kh * ksf * kt)
+
+    b = b * ply
+    ag = b * d
+
+    status = np.full(ag.shape, Status.OK, dtype=np.int8)
+    given = (dn != 0) & (e != 0)
+    notched = given & (dn > 0) & (e > 0)
+    status[given & ~notched] = Status.INVALID
+    status[notched & (dn > 0.25 * d)] = Status.NOTCH_DEPTH
+    notched &= status == Status.OK
+
+    an = np.where(notched, b * (d - dn), ag)
+    kn = np.zeros(ag.shape)
+    if notched.any():
+        kn[notched] = [
+            _notch_factor(*values)
+            for values in zip(
+                d[notched].tolist(), dn[notched].tolist(), e[notched].tolist()
+            )
+        ]
+
+    vr = phi * f_v * ((2 * an) / 3) * kzv
+    fr = phi * f_f * ag * kn
+
+    ok = status == Status.OK
+    vr = np.where(ok, vr, np.nan)
+    fr = np.where(ok, fr, np.nan)
+
+    return vr, fr, status
+
+
+def comp_parallel(
+    b,
+    d,
+    l_b,
+    l_d,
+    fc,
+    e05,
+    ply=1,
+    kd=1,
+    kh=1,
+    kt=1,
+    ksc=1,
+    kse=1,
+    end_in_translation=False,
+    end_in_rotation=2,
+    connectors="clous",
+    spacers=False,
+    glulam=False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    6.5.5 Résistance à la compression parallèle au fil.
+
+    Args:
+        b (array_like): Largeur d'un pli, mm.
+        d (array_like): Hauteur de l'élément, mm.
+        l_b (array_like): Longueur entre les appuis latéraux pour l'axe faible, mm.
+        l_d (array_like): Longueur entre les appuis latéraux pour l'axe fort, mm.
+        fc (array_like): Résistance prévue en compression parallèle au fil, MPa.
+        e05 (array_like): Module d'élasticité pour les calculs des éléments en compression, MPa.
+        ply (array_like, optional): Nombre de plis. Default to 1.
+        kd (array_like, optional): Coefficient de durée d'application de la charge.
+        kh (array_like, optional): Coefficient de système.
+        kt (array_like, optional): Coefficient de traitement.
+        ksc (array_like, optional): Coefficient de conditions d'utilisation pour la compression parallèle au fil.
+        kse (array_like, optional): Coefficient de conditions d'utilisation relatif au module d'élasticité.
+
+        end_in_translation (array_like, optional): Extrémité libre en translation. Default to False.
+        end_in_rotation (array_like, optional): Extrémités libre en rotation.
+            Choices: 0, 1, 2. Default to 2.
+
+        connectors (array_like, optional): Connecteurs pour élément composé.
+            Choices: "clous", "boulons", "anneaux", "aucun". Default to "clous".
+        spacers (array_like, optional): Éléments assemblés avec cales d'espacement (A.6.5.5.3). Default to False.
+        glulam (array_like, optional): Élément en bois lamellé collé. Default to False.
+
+    Returns:
+        np.ndarray: Pr = Résistance pondérée à la compression parallèle au fil, N.
+        np.ndarray: Codes d'état (Status.PLY, Status.UNSTABLE ou Status.SLENDERNESS lorsque
+            la méthode scalaire lève une exception, Status.INVALID si une dimension ou une
+            longueur n'est pas positive).
+
+    """
+    (
+        b,
+        d,
+        l_b,
+        l_d,
+        fc,
+        e05,
+        ply,
+        kd,
+        kh,
+        kt,
+        ksc,
+        kse,
+        translation,
+        rotation,
+        connectors,
+        spacers,
+        glulam,
+    ) = np.broadcast_arrays(
+        *map(
+            np.asarray,
+            (
+                b,
+                d,
+                l_b,
+                l_d,
+                fc,
+                e05,
+                ply,
+                kd,
+                kh,
+                kt,
+                ksc,
+                kse,
+                end_in_translation,
+                end_in_rotation,
+                connectors,
+                spacers,
+                glulam,
+            ),
+        )
+    )
+    translation = translation.astype(bool)
+    spacers = spacers.astype(bool)
+    glulam = glulam.astype(bool)
+
+    # A.6.5.5.1 coefficient de longueur effective, Ke.
+    ke = np.select(
+        [
+            ~translation & (rotation == 0),
+            ~translation & (rotation == 1),
+            ~translation,
+            rotation == 0,
+            rotation == 1,
+        ],
+        [0.65, 0.8, 1, 1.5, 2],
+        default=np.nan,
+    )
+
+    nailed = np.isin(connectors, ("clous", "boulons", "anneaux"))
+    b_ply = np.where(nailed, b * ply, b)
+    length = np.maximum(l_b, l_d)
+    spaced = (ply > 1) & spacers
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cc_b = (ke * l_b) / b_ply
+        cc_d = (ke * l_d) / d
+        cc = length / b
+
+    status = np.select(
+        [
+            ply > 5,
+            np.isnan(ke),
+            (b <= 0) | (d <= 0) | (l_b <= 0) | (l_d <= 0),
+            (cc_b > 50) | (cc_d > 50),
+        ],
+        [Status.PLY, Status.UNSTABLE, Status.INVALID, Status.SLENDERNESS],
+        default=Status.OK,
+    ).astype(np.int8)
+    ok = status == Status.OK
+
+    # Les calculs suivants ne portent que sur les éléments valides.
+    b, d, l_b, l_d, fc, e05, ply, kd, kh, kt, ksc, kse = (
+        values[ok] for values in (b, d, l_b, l_d, fc, e05, ply, kd, kh, kt, ksc, kse)
+    )
+    connectors, nailed, glulam, spaced = (
+        values[ok] for values in (connectors, nailed, glulam, spaced)
+    )
+    b_ply, length, cc_b, cc_d, cc = (
+        values[ok] for values in (b_ply, length, cc_b, cc_d, cc)
+    )
+
+    phi = 0.8
+
+    f_c = fc * (kd * kh * ksc * kt)
+
+    a = b_ply * d
+
+    kzc_b = np.minimum((6.3 * _pow(b_ply * l_b, -0.13)), 1.3)
+    kzc_d = np.minimum((6.3 * _pow(d * l_d, -0.13)), 1.3)
+
+    kc_b = _pow(1 + ((f_c * kzc_b * _pow(cc_b, 3)) / (35 * e05 * kse * kt)), -1)
+    kc_d = _pow(1 + ((f_c * kzc_d * _pow(cc_d, 3)) / (35 * e05 * kse * kt)), -1)
+
+    pr_b = phi * f_c * a * kzc_b * kc_b
+    pr_d = phi * f_c * a * kzc_d * kc_d
+    built_up = ply > 1
+    pr_b = np.where(
+        built_up,
+        pr_b
+        * np.select(
+            [connectors == "clous", connectors == "boulons", connectors == "anneaux"],
+            [0.6, 0.75, 0.8],
+            default=ply,
+        ),
+        pr_b,
+    )
+    pr_d = np.where(built_up & ~nailed, pr_d * ply, pr_d)
+    pr = np.minimum(pr_b, pr_d)
+
+    # A.6.5.5.3 Éléments en compression assemblés avec cales d’espacement.
+    if spaced.any():
+        b, d, fc, e05, ply, kd, kt, ksc, kse, glulam, length, cc, pr_d = (
+            values[spaced]
+            for values in (
+                b,
+                d,
+                fc,
+                e05,
+                ply,
+                kd,
+                kt,
+                ksc,
+                kse,
+                glulam,
+                length,
+                cc,
+                pr_d,
+            )
+        )
+        f_c = fc * (kd * ksc * kt)
+
+        b_spaced = b * (2 * ply - 1)
+        a = b_spaced * d
+
+        dim = np.maximum(b_spaced, d)
+        kzc = np.where(glulam, 1, np.minimum((6.3 * _pow(dim * length, -0.13)), 1.3))
+        k = np.where(glulam, 2, 1.8)
+        phi = np.where(glulam, 0.9, 0.8)
+
+        ke = 2.5
+        ck = _pow((0.76 * e05 * kse * ke * kt) / f_c, 1 / 2)
+        kc = np.select(
+            [cc <= 10, cc < ck],
+            [1, 1 - (1 / 3) * _pow(cc / ck, 4)],
+            default=(e05 * kse * ke * kt) / (k * _pow(cc, 2) * f_c),
+        )
+
+        pr_spacers = phi * f_c * a * kc * kzc
+        pr_spacers = np.minimum(pr_spacers, pr_d)
+        pr[spaced] = np.where((cc > 80) & ~(cc < ck), np.nan, pr_spacers)
+
+    result = np.full(status.shape, np.nan)
+    result[ok] = pr
+    status[ok & np.isnan(result)] = Status.SLENDERNESS
+
+    return result, status
+
+
+def comp_perpendicular(
+    b,
+    d,
+    ply=1,
+    kd=1,
+    kt=1,
+    kscp=1,
+    fcp=0,
+    lb1=0,
+    d_lb1=0,
+    lb2=38,
+    d_lb2=0,
+    g=0,
+    flex=False,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    6.5.6 Résistance à la compression perpendiculaire au fil.
+
+    Args:
+        b (array_like): Largeur d'un pli, mm.
+        d (array_like): Hauteur de l'élément, mm.
+        ply (array_like, optional): Nombre de plis. Default to 1.
+        kd (array_like, optional): Coefficient de durée d'application de la charge.
+        kt (array_like, optional): Coefficient de traitement.
+        kscp (array_like, optional): Coefficient de conditions d'utilisation pour la compression perpendiculaire au fil.
+        fcp (array_like, optional): Résistance prévue en compression perpendiculaire au fil, MPa. Default to 0.
+
+        lb1 (array_like, optional): Longueur d'appui haut, mm. Default to 0.
+        d_lb1 (array_like, optional): Distance entre l'extrémité de l'appui haut et l'extrémité de l'élément, mm. Default to 0.
+        lb2 (array_like, optional): Longueur d'appui bas, mm. Default to 38.
+        d_lb2 (array_like, optional): Distance entre l'extrémité de l'appui bas et l'extrémité de l'élément, mm. Default to 0.
+
+        g (array_like, optional): Densité moyenne du bois anhydre (remplace fcp si > 0). Default to 0.
+        flex (array_like, optional): Surface d'appui 1 aux endroits soumis à de fortes contraintes de flexion. Default to False.
+
+    Returns:
+        np.ndarray: Qr = Résistance pondérée à la compression perpendiculaire au fil à l'appui, N.
+        np.ndarray: Qr' = Résistance pondérée à la compression perpendiculaire au fil au point de charge, N.
+        np.ndarray: Codes d'état (Status.INVALID lorsque d ou une longueur d'appui utilisée
+            pour Kb est nulle).
+
+    """
+    b, d, ply, kd, kt, kscp, fcp, lb1, d_lb1, lb2, d_lb2, g, flex = np.broadcast_arrays(
+        *map(
+            np.asarray,
+            (b, d, ply, kd, kt, kscp, fcp, lb1, d_lb1, lb2, d_lb2, g, flex),
+        )
+    )
+    flex = flex.astype(bool)
+
+    # A.6.5.6 Compression perpendiculaire au fil.
+    L = 1.8125
+    M = 145.038
+    fcp = np.where(g > 0, 0.9 * L * (2243.8 * g - 473.8) / M, fcp)
+
+    # 6.5.6.5
+    end_lb2 = (lb2 < 150) & (d_lb2 >= 75)
+    end_lb1 = (lb1 < 150) & ~flex & (d_lb1 >= 75)
+    status = np.where(
+        (d == 0) | (end_lb2 & (lb2 == 0)) | (end_lb1 & (lb1 == 0)),
+        Status.INVALID,
+        Status.OK,
+    ).astype(np.int8)
+
+    # Les éléments non valides donnent inf ou nan, remplacés par nan à la fin.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 6.5.6.4
+        b = b * ply
+        ratio = b / d
+        kzcp = np.select(
+            [ratio <= 1, ratio < 2], [1, 0.15 * ratio + 0.85], default=1.15
+        )
+
+        kb = np.where(end_lb2, (lb2 + 9.525) / lb2, 1)
+        kb1 = np.where(end_lb1, (lb1 + 9.525) / lb1, 1)
+
+        # 6.5.6.2
+        phi = 0.8
+
+        f_cp = fcp * (kd * kscp * kt)
+
+        ab = b * lb2
+
+        qr = phi * f_cp * ab * kb * kzcp
+
+        # 6.5.6.3
+        ab_prim = np.minimum(b * ((lb1 + lb2) / 2), 1.5 * b * np.minimum(lb1, lb2))
+        qr_prim = np.where(
+            d_lb1 + (lb1 / 2) - (lb2 / 2) <= d,
+            (2 / 3) * phi * f_cp * ab_prim * np.minimum(kb, kb1) * kzcp,
+            phi * f_cp * (b * lb1) * kb1 * kzcp,
+        )
+
+    ok = status == Status.OK
+    qr = np.where(ok, qr, np.nan)
+    qr_prim = np.where(ok, qr_prim, np.nan)
+
+    return qr, qr_prim, status
+
+
+def min_bearing_length(
+    qf,
+    b,
+    d,
+    ply=1,
+    kd=1,
+    kt=1,
+    kscp=1,
+    fcp=0,
+    d_lb2=0,
+    g=0,
+    increment=1,
+) -> np.ndarray:
+    """
+    6.5.6.2 Longueur d'appui minimale, lb2, pour que Qr >= Qf.
+
+    La longueur est un multiple de increment. Kb (6.5.6.5) rend Qr discontinu à 150 mm: la
+    plus petite longueur qui convient est retournée, même si une longueur un peu plus grande
+    ne convient pas.
+
+    Args:
+        qf (array_like): Réaction pondérée à l'appui, N.
+        b, d, ply, kd, kt, kscp, fcp, d_lb2, g (array_like): Voir comp_perpendicular.
+        increment (float, optional): Pas de la longueur d'appui, mm. Default to 1.
+
+    Returns:
+        np.ndarray: lb2 minimal, mm. nan si la résistance est nulle ou les données non
+            valides.
+
+    """
+    qf, b, d, ply, kd, kt, kscp, fcp, d_lb2, g = np.broadcast_arrays(
+        *map(np.asarray, (qf, b, d, ply, kd, kt, kscp, fcp, d_lb2, g))
+    )
+
+    def resistance(lb2):
+        return comp_perpendicular(b, d, ply, kd, kt, kscp, fcp, 0, 0, lb2, d_lb2, g)[0]
+
+    # Qr est linéaire en lb2 (ou en lb2 + 9.525 avec Kb): estimation, puis vérification.
+    unit = resistance(np.full(qf.shape, 150.0)) / 150
+    with np.errstate(divide="ignore", invalid="ignore"):
+        length = qf / unit
+    length = np.where((d_lb2 >= 75) & (length - 9.525 < 150), length - 9.525, length)
+    solvable = (unit > 0) & np.isfinite(length)
+    length = np.where(solvable, length, np.nan)
+    length = np.maximum(np.ceil(length / increment) - 1, 1) * increment
+
+    lacking = solvable.copy()
+    while lacking.any():
+        lacking[lacking] = resistance(length)[lacking] < qf[lacking]
+        length = np.where(lacking, length + increment, length)
+
+    return length
+
+
+def euler_load(e05, _i, l, ke=1, kse=1, kt=1) -> np.ndarray:
+    """
+    6.5.9 Charge critique de flambement d'Euler, Pe (voir sawn_lumber.combined_bending_axial).
+
+    Args:
+        e05 (array_like): Module d'élasticité pour le calcul des éléments en compression, MPa.
+        _i (array_like): Moment d'inertie dans le plan du moment appliqué, mm4.
+        l (array_like): Longueur effective dans le plan du moment appliqué, mm.
+        ke (array_like, optional): Coefficient de longueur effective. Default to 1.
+        kse (array_like, optional): Coefficient de condition d'utilisation. Default to 1.
+        kt (array_like, optional): Coefficient de traitement. Default to 1.
+
+    Returns:
+        np.ndarray: Pe, N.
+
+    """
+    e05, _i, l, ke, kse, kt = np.broadcast_arrays(
+        *map(np.asarray, (e05, _i, l, ke, kse, kt))
+    )
+    le = l * ke
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pe = (math.pi**2 * e05 * kse * kt * _i) / _pow(le, 2)
+
+    return pe
+
+
+def compression_interaction(f, r, mf, mr, pe) -> np.ndarray:
+    """
+    6.5.9 Ratio en compression (Pf / Pr)**2 + Mf / Mr * 1 / (1 - Pf / Pe).
+
+    Args:
+        f (np.ndarray): Charge axiale pondérée en compression, N.
+        r (np.ndarray): Résistance pondérée à la compression parallèle au fil, N.
+        mf (np.ndarray): Moment de flexion pondéré, N*mm.
+        mr (np.ndarray): Résistance pondérée au moment de flexion, N*mm.
+        pe (np.ndarray): Charge critique de flambement d'Euler (voir euler_load), N.
+
+    Returns:
+        np.ndarray: Ratio pour la résistance combinée en compression.
+
+    """
+    return _pow(f / r, 2) + (mf / mr) * (1 / (1 - f / pe))
+
+
+def combined_bending_axial(
+    f,
+    r,
+    mf,
+    mr,
+    compression=True,
+    e05=0,
+    _i=0,
+    l=0,
+    ke=1,
+    kse=1,
+    kt=1,
+) -> np.ndarray:
+    """
+    6.5.9 Résistance à la flexion et à la charge axiale combinées.
+
+    Args:
+        f (array_like): Charge axiale pondérée en compression ou en traction, N.
+        r (array_like): Résistance pondérée à la compression ou à la traction parallèle au fil, N.
+        mf (array_like): Moment de flexion pondéré, N*mm.
+        mr (array_like): Résistance pondérée au moment de flexion, N*mm.
+        compression (array_like, optional): True pour compression, False pour tension. Default to True.
+        e05, _i, l, ke, kse, kt (array_like, optional): Voir euler_load (compression seulement).
+
+    Returns:
+        np.ndarray: Ratio pour la résistance combinée.
+
+    """
+    f, r, mf, mr, compression, e05, _i, l, ke, kse, kt = np.broadcast_arrays(
+        *map(
+            np.atleast_1d,
+            (f, r, mf, mr, compression, e05, _i, l, ke, kse, kt),
+        )
+    )
+    compression = compression.astype(bool)
+    c = compression
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = f / r + mf / mr
+        if c.any():
+            pe = euler_load(e05[c], _i[c], l[c], ke[c], kse[c], kt[c])
+            ratio[c] = compression_interaction(f[c], r[c], mf[c], mr[c], pe)
+
+    return ratio
+
+
+def _sin2(theta: float) -> float:
+    """
+    sin²(theta), theta en degrés, identique à sawn_lumber.comp_angle.
+
+    """
+    return math.sin(math.radians(theta)) ** 2
+
+
+def _cos2(theta: float) -> float:
+    """
+    cos²(theta), theta en degrés, identique à sawn_lumber.comp_angle.
+
+    """
+    return math.cos(math.radians(theta)) ** 2
+
+
+# sin² et cos² des angles entiers de 0 à 360 degrés.
+_SIN2_TABLE = np.array([_sin2(theta) for theta in range(361)])
+_COS2_TABLE = np.array([_cos2(theta) for theta in range(361)])
+
+
+def comp_angle(theta, pr, qr) -> np.ndarray:
+    """
+    6.5.7 Résistance à la compression oblique par rapport au fil (formule de Hankinson).
+
+    Les angles entiers de 0 à 360 degrés sont lus dans une table de sin² et cos²; les autres
+    sont calculés une seule fois par valeur distincte.
+
+    Args:
+        theta (array_like): Angle entre la direction du fil et la direction de la charge, degrés.
+        pr (array_like): Résistance pondérée à la compression parallèle au fil, N.
+        qr (array_like): Résistance pondérée à la compression perpendiculaire au fil, N.
+
+    Returns:
+        np.ndarray: Nr = Résistance à la compression oblique par rapport au fil, N.
+
+    """
+    theta, pr, qr = np.broadcast_arrays(*map(np.asarray, (theta, pr, qr)))
+
+    whole = (theta >= 0) & (theta <= 360) & (theta == np.trunc(theta))
+    index = np.where(whole, theta, 0).astype(np.intp)
+    sin2 = _SIN2_TABLE[index]
+    cos2 = _COS2_TABLE[index]
+    if not whole.all():
+        other = ~whole
+        sin2[other] = _map_unique(theta[other], _sin2)
+        cos2[other] = _map_unique(theta[other], _cos2)
+
+    nr = (pr * qr) / (pr * sin2 + qr * cos2)
+
+    return nr
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour les calculs en lot du bois de sciage.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import random
+    import database
+    import sawn_lumber
+
+    rng = random.Random(86)
+    members = [
+        {
+            "b": rng.choice((38, 64, 89, 140, 191)),
+            "d": rng.choice((89, 140, 184, 235, 286, 337)),
+            "ply": rng.randint(1, 5),
+            "kd": rng.choice((0.65, 1, 1.15)),
+            "kh": rng.choice((1, 1.1, 1.4)),
+            "kt": rng.choice((1, 0.75, 0.85)),
+            "f": rng.uniform(1, 40),
+            "ks": rng.choice((1, 0.84, 0.96)),
+            "kz": rng.choice((0.8, 1, 1.3, 1.7)),
+            "supports": [rng.random() < 0.5 for _ in range(5)],
+            "dn": rng.choice((0, 0, 10, 20, 60, 100)),
+            "e": rng.choice((0, 50, 120)),
+        }
+        for _ in range(2000)
+    ]
+
+    # Test lumber_category and sizes against sawn_lumber
+    nominals = [1, 1.5, 2, 2.5, 3, 4, 5, 6, 7, 8, 10, 12, 14, 16, 18, 20]
+    cases = [
+        (
+            rng.choice(nominals),
+            rng.choice(nominals),
+            rng.random() < 0.5,
+            rng.random() < 0.5,
+        )
+        for _ in range(2000)
+    ]
+    nominal_b, nominal_d, green, brut = (np.array(values) for values in zip(*cases))
+    test_b = sizes(nominal_b, green, brut)
+    test_d = sizes(nominal_d, green, brut)
+    expected_result = [
+        (sawn_lumber.sizes(b, g, r), sawn_lumber.sizes(d, g, r)) for b, d, g, r in cases
+    ]
+    assert (
+        list(zip(test_b.tolist(), test_d.tolist())) == expected_result
+    ), "sizes -> FAILED"
+    table = _sizes_table()
+    test_table = _sizes_table()
+    assert test_table[1] is table[1], "sizes table -> FAILED"
+    database.reload()
+    test_table = _sizes_table()
+    assert test_table[1] is not table[1] and np.array_equal(
+        test_table[1], table[1]
+    ), "sizes reload -> FAILED"
+    msr = np.array([rng.random() < 0.2 for _ in cases])
+    mel = np.array([rng.random() < 0.2 for _ in cases])
+    test_category, test_status = lumber_category(test_b, test_d, msr, mel)
+    for i, (b, d) in enumerate(expected_result):
+        try:
+            expected_category = sawn_lumber.lumber_category(b, d, msr[i], mel[i])
+        except ValueError:
+            expected_category = ""
+            assert test_status[i] == Status.INVALID, "lumber_category status -> FAILED"
+        assert test_category[i] == expected_category, (
+            f"lumber_category -> FAILED\n {expected_category = }\n"
+            f" {test_category[i] = }"
+        )
+
+    # Test specified_strengths against sawn_lumber.specified_strengths
+    keys = list(sawn_lumber.snapshot().strengths)
+    cases = [(*rng.choice(keys), rng.random() < 0.5) for _ in range(2000)]
+    cases.append(("Beam", "spf", "inconnue", False))
+    test_strengths = specified_strengths(*map(np.array, zip(*cases)))
+    for case, record in zip(cases[:-1], test_strengths[:-1].tolist()):
+        expected_result = tuple(sawn_lumber.specified_strengths(*case))
+        assert (
+            record == expected_result
+        ), f"specified_strengths -> FAILED\n {expected_result = }\n {record = }"
+    assert np.isnan(
+        test_strengths[-1]["fb"]
+    ), f"specified_strengths -> FAILED\n {test_strengths[-1] = }"
+
+    # Test modification_factors
+    categories = ("Lumber", "Light", "Beam", "Post", "MSR", "MEL")
+    durations = ("courte", "normale", "continue")
+    for m in members:
+        m["prop"] = rng.choice(sawn_lumber.PROPERTIES)
+        m["duration"] = rng.choice(durations)
+        m["category"] = rng.choice(categories)
+        m["flags"] = [rng.random() < 0.5 for _ in range(6)]
+    test_factors = np.column_stack(
+        modification_factors(
+            width=[m["b"] for m in members],
+            depth=[m["d"] for m in members],
+            prop=[m["prop"] for m in members],
+            duration=[m["duration"] for m in members],
+            category=[m["category"] for m in members],
+            wet_service=[m["flags"][0] for m in members],
+            treated=[m["flags"][1] for m in members],
+            incised=[m["flags"][2] for m in members],
+            _2ft_spacing=[m["flags"][3] for m in members],
+            connected_subfloor=[m["flags"][4] for m in members],
+            built_up_beam=[m["flags"][5] for m in members],
+        )
+    )
+    for i, m in enumerate(members):
+        expected_result = sawn_lumber.modification_factors(
+            m["b"], m["d"], m["prop"], m["duration"], m["category"], *m["flags"]
+        )
+        assert tuple(test_factors[i]) == expected_result, (
+            f"modification_factors -> FAILED\n {expected_result = }\n"
+            f" {test_factors[i] = }"
+        )
+
+    # Test bending_moment
+    test_mr, test_status = bending_moment(
+        b=[m["b"] for m in members],
+        d=[m["d"] for m in members],
+        fb=[m["f"] for m in members],
+        ply=[m["ply"] for m in members],
+        kd=[m["kd"] for m in members],
+        kh=[m["kh"] for m in members],
+        kt=[m["kt"] for m in members],
+        ksb=[m["ks"] for m in members],
+        kzb=[m["kz"] for m in members],
+        lateral_support=[m["supports"][0] for m in members],
+        compressive_edge_support=[m["supports"][1] for m in members],
+        tensile_edge_support=[m["supports"][2] for m in members],
+        blocking_support=[m["supports"][3] for m in members],
+        tie_rods_support=[m["supports"][4] for m in members],
+    )
+    for i, m in enumerate(members):
+        try:
+            expected_result = sawn_lumber.Resistances(
+                m["b"], m["d"], m["kd"], m["kh"], m["kt"], m["ply"]
+            ).bending_moment(m["f"], m["ks"], m["kz"], *m["supports"])
+        except Warning:
+            expected_result = Status.KL
+            assert (
+                test_status[i] == expected_result
+            ), f"bending_moment -> FAILED\n {expected_result = }\n {test_status[i] = }"
+            continue
+        assert (
+            test_mr[i] == expected_result
+        ), f"bending_moment -> FAILED\n {expected_result = }\n {test_mr[i] = }"
+
+    # Test shear
+    test_vr, test_fr, test_status = shear(
+        b=[m["b"] for m in members],
+        d=[m["d"] for m in members],
+        fv=[m["f"] for m in members],
+        ply=[m["ply"] for m in members],
+        kd=[m["kd"] for m in members],
+        kh=[m["kh"] for m in members],
+        kt=[m["kt"] for m in members],
+        ksv=[m["ks"] for m in members],
+        ksf=[m["ks"] for m in members],
+        kzv=[m["kz"] for m in members],
+        dn=[m["dn"] for m in members],
+        e=[m["e"] for m in members],
+    )
+    for i, m in enumerate(members):
+        try:
+            expected_result = sawn_lumber.Resistances(
+                m["b"], m["d"], m["kd"], m["kh"], m["kt"], m["ply"]
+            ).shear(m["f"], m["ks"], m["ks"], m["kz"], m["dn"], m["e"])
+        except ValueError:
+            expected_result = Status.NOTCH_DEPTH
+            assert (
+                test_status[i] == expected_result
+            ), f"shear -> FAILED\n {expected_result = }\n {test_status[i] = }"
+            continue
+        test_shear = (test_vr[i], test_fr[i])
+        assert (
+            test_shear == expected_result
+        ), f"shear -> FAILED\n {expected_result = }\n {test_shear = }"
+    # Test comp_parallel
+    connectors = ("clous", "boulons", "anneaux", "aucun")
+    for m in members:
+        m["ply"] = rng.randint(1, 6)
+        m["l_b"] = rng.randint(300, 6000)
+        m["l_d"] = rng.choice((m["l_b"], rng.randint(300, 6000)))
+        m["e05"] = rng.choice((5500, 6500, 9000))
+        m["ends"] = (rng.random() < 0.2, rng.choice((0, 1, 2, 2)))
+        m["connectors"] = rng.choice(connectors)
+        m["spacers"] = (rng.random() < 0.3, rng.random() < 0.3)
+    test_pr, test_status = comp_parallel(
+        b=[m["b"] for m in members],
+        d=[m["d"] for m in members],
+        l_b=[m["l_b"] for m in members],
+        l_d=[m["l_d"] for m in members],
+        fc=[m["f"] for m in members],
+        e05=[m["e05"] for m in members],
+        ply=[m["ply"] for m in members],
+        kd=[m["kd"] for m in members],
+        kh=[m["kh"] for m in members],
+        kt=[m["kt"] for m in members],
+        ksc=[m["ks"] for m in members],
+        kse=[m["ks"] for m in members],
+        end_in_translation=[m["ends"][0] for m in members],
+        end_in_rotation=[m["ends"][1] for m in members],
+        connectors=[m["connectors"] for m in members],
+        spacers=[m["spacers"][0] for m in members],
+        glulam=[m["spacers"][1] for m in members],
+    )
+    for i, m in enumerate(members):
+        try:
+            expected_result = sawn_lumber.Resistances(
+                m["b"], m["d"], m["kd"], m["kh"], m["kt"], m["ply"]
+            ).comp_parallel(
+                m["l_b"],
+                m["l_d"],
+                m["f"],
+                m["e05"],
+                m["ks"],
+                m["ks"],
+                *m["ends"],
+                m["connectors"],
+                *m["spacers"],
+            )
+        except ValueError as error:
+            if "plis" in str(error):
+                expected_result = Status.PLY
+            elif "instables" in str(error):
+                expected_result = Status.UNSTABLE
+            else:
+                expected_result = Status.SLENDERNESS
+            assert test_status[i] == expected_result and np.isnan(
+                test_pr[i]
+            ), f"comp_parallel -> FAILED\n {expected_result = }\n {test_status[i] = }"
+            continue
+        assert (
+            test_pr[i] == expected_result and test_status[i] == Status.OK
+        ), f"comp_parallel -> FAILED\n {expected_result = }\n {test_pr[i] = }"
+    # Test combined_bending_axial
+    for m in members:
+        m["axial"] = (rng.uniform(0, 2e5), rng.uniform(1e5, 3e5))
+        m["moment"] = (rng.uniform(0, 2e7), rng.uniform(1e7, 3e7))
+        m["euler"] = (rng.choice((6500, 9000)), rng.uniform(1e6, 1e8), m["l_b"])
+        m["compression"] = rng.random() < 0.7
+    test_ratio = combined_bending_axial(
+        f=[m["axial"][0] for m in members],
+        r=[m["axial"][1] for m in members],
+        mf=[m["moment"][0] for m in members],
+        mr=[m["moment"][1] for m in members],
+        compression=[m["compression"] for m in members],
+        e05=[m["euler"][0] for m in members],
+        _i=[m["euler"][1] for m in members],
+        l=[m["euler"][2] for m in members],
+        ke=[m["ends"][1] / 2 + 0.5 for m in members],
+        kse=[m["ks"] for m in members],
+        kt=[m["kt"] for m in members],
+    )
+    for i, m in enumerate(members):
+        expected_result = sawn_lumber.combined_bending_axial(
+            m["axial"][0],
+            m["axial"][1],
+            m["moment"][0],
+            m["moment"][1],
+            m["compression"],
+            *m["euler"],
+            m["ends"][1] / 2 + 0.5,
+            m["ks"],
+            m["kt"],
+        )
+        assert (
+            test_ratio[i] == expected_result
+        ), f"combined_bending_axial -> FAILED\n {expected_result = }\n {test_ratio[i] = }"
+
+    # Test comp_angle
+    theta = [rng.choice((rng.randint(0, 90), rng.uniform(-90, 400))) for _ in members]
+    test_nr = comp_angle(
+        theta, [m["axial"][1] for m in members], [m["axial"][0] for m in members]
+    )
+    for i, m in enumerate(members):
+        expected_result = sawn_lumber.comp_angle(theta[i], m["axial"][1], m["axial"][0])
+        assert (
+            test_nr[i] == expected_result
+        ), f"comp_angle -> FAILED\n {expected_result = }\n {test_nr[i] = }"
+
+    # Test comp_perpendicular
+    for m in members:
+        m["bearings"] = (
+            rng.choice((0, 38, 89, 140, 200)),
+            rng.choice((0, 50, 100)),
+            rng.choice((0, 38, 89, 140, 200)),
+            rng.choice((0, 50, 100)),
+        )
+        m["g"] = rng.choice((0, 0, 0.42, 0.5))
+        m["flex"] = rng.random() < 0.3
+    test_qr, test_qr_prim, test_status = comp_perpendicular(
+        b=[m["b"] for m in members],
+        d=[m["d"] for m in members],
+        ply=[m["ply"] for m in members],
+        kd=[m["kd"] for m in members],
+        kt=[m["kt"] for m in members],
+        kscp=[m["ks"] for m in members],
+        fcp=[m["f"] / 4 for m in members],
+        lb1=[m["bearings"][0] for m in members],
+        d_lb1=[m["bearings"][1] for m in members],
+        lb2=[m["bearings"][2] for m in members],
+        d_lb2=[m["bearings"][3] for m in members],
+        g=[m["g"] for m in members],
+        flex=[m["flex"] for m in members],
+    )
+    for i, m in enumerate(members):
+        try:
+            expected_result = sawn_lumber.Resistances(
+                m["b"], m["d"], m["kd"], 1, m["kt"], m["ply"]
+            ).comp_perpendicular(*m["bearings"], m["ks"], m["f"] / 4, m["g"], m["flex"])
+        except ZeroDivisionError:
+            expected_result = Status.INVALID
+            assert (
+                test_status[i] == expected_result
+            ), f"comp_perpendicular -> FAILED\n {expected_result = }\n {test_status[i] = }"
+            continue
+        test_bearing = (test_qr[i], test_qr_prim[i])
+        assert (
+            test_bearing == expected_result
+        ), f"comp_perpendicular -> FAILED\n {expected_result = }\n {test_bearing = }"
+
+    # Test min_bearing_length
+    members = members[:200]
+    qf = [rng.uniform(1e3, 2e5) for _ in members]
+    test_length = min_bearing_length(
+        qf,
+        b=[m["b"] for m in members],
+        d=[m["d"] for m in members],
+        ply=[m["ply"] for m in members],
+        kd=[m["kd"] for m in members],
+        kscp=[m["ks"] for m in members],
+        fcp=[m["f"] / 4 for m in members],
+        d_lb2=[m["bearings"][3] for m in members],
+    )
+    for i, m in enumerate(members):
+        resistances = sawn_lumber.Resistances(m["b"], m["d"], m["kd"], ply=m["ply"])
+        expected_result = 1
+        while (
+            resistances.comp_perpendicular(
+                lb2=expected_result,
+                d_lb2=m["bearings"][3],
+                kscp=m["ks"],
+                fcp=m["f"] / 4,
+            )[0]
+            < qf[i]
+        ):
+            expected_result += 1
+        assert (
+            test_length[i] == expected_result
+        ), f"min_bearing_length -> FAILED\n {expected_result = }\n {test_length[i] = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
@@ -0,0 +1,537 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Vérification d'un bordereau d'éléments en bois de sciage.
+----------------------------------------------------
+
+Lit un bordereau (CSV ou Parquet) par blocs, calcule Mr, Vr et Fr pour chaque ligne et écrit
+le taux d'utilisation et la vérification aux états limites. La mémoire utilisée dépend de la
+taille des blocs et non de la taille du fichier. Les blocs sont répartis sur tous les coeurs.
+
+Colonnes du bordereau (les colonnes absentes prennent la valeur par défaut):
+
+    b, d            Dimensions nominales, po.
+    ply             Nombre de plis. Default to 1.
+    specie          Groupe d'essence ("df", "hf", "spf", "ns", ...). Default to "spf".
+    grade           Classe. Obligatoire.
+    duration        "courte", "normale" ou "continue". Default to "normale".
+    green, brut, msr, mel, side, wet, treated, incised, spacing, subfloor,
+    lateral, tie_rods, compressive_edge, tensile_edge, blocking
+                    Options (1/0, oui/non, true/false). Default to False.
+    dn, e           Entaille, mm. Optionnel.
+    mf              Moment pondéré, kN*m.
+    vf              Cisaillement pondéré, kN.
+
+Usage:
+    python schedule_check.py bordereau.csv -o resultats.csv
+
+Instrumentation: voir profiling (CSA_O86_PROFILE). Seul le processus principal est mesuré;
+utiliser --workers 1 pour mesurer les calculs.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import collections
+import csv
+import os
+import numpy as np
+import general_design
+import profiling
+import sawn_lumber
+import sawn_lumber_batch
+
+# CODE
+OUTPUT_COLUMNS = ("category", "mr", "vr", "fr", "ratio", "verdict")
+
+_TRUE = ("1", "true", "vrai", "oui", "yes", "x")
+_KEYS = ("b", "d", "ply", "green", "brut", "msr", "mel", "specie", "grade", "side")
+
+
+def _flag(value) -> bool:
+    """
+    Lit une option du bordereau.
+
+    """
+    return str(value or "").strip().lower() in _TRUE
+
+
+def _number(value) -> float:
+    """
+    Lit une valeur numérique du bordereau (0 si vide).
+
+    """
+    if value is None or str(value).strip() == "":
+        return 0
+
+    return float(value)
+
+
+def _column(rows: list[dict], key: str, parse) -> list:
+    """
+    Lit une colonne du bordereau, en ne convertissant qu'une fois chaque valeur distincte.
+
+    Args:
+        rows (list[dict]): Lignes du bordereau.
+        key (str): Nom de la colonne.
+        parse (callable): Conversion d'une valeur.
+
+    Returns:
+        list: Valeurs converties.
+
+    """
+    parsed = {}
+    values = []
+    for row in rows:
+        value = row.get(key)
+        if value not in parsed:
+            parsed[value] = parse(value)
+        values.append(parsed[value])
+
+    return values
+
+
+def _prepare(
+    b: str,
+    d: str,
+    ply: str,
+    green: str,
+    brut: str,
+    msr: str,
+    mel: str,
+    specie: str,
+    grade: str,
+    side: str,
+) -> tuple:
+    """
+    Dimensions, catégorie et résistances prévues d'une ligne du bordereau.
+
+    Args:
+        Valeurs des colonnes _KEYS de la ligne.
+
+    Returns:
+        tuple: b, d, ply, category, strengths.
+
+    Raises:
+        ValueError: Si la ligne n'est pas valide, si la classe manque ou si la section n'est
+            pas couverte par les tableaux (plus de 412 mm).
+
+    """
+    green, brut, msr, mel = _flag(green), _flag(brut), _flag(msr), _flag(mel)
+    b = sawn_lumber.sizes(_number(b), green, brut)
+    d = sawn_lumber.sizes(_number(d), green, brut)
+    ply = int(_number(ply) or 1)
+
+    category = sawn_lumber.lumber_category(b, d, msr, mel)
+    if category == "Valider la disponibilité du bois chez les fournisseurs.":
+        raise ValueError(f"Section non disponible ({b} x {d} mm): {category}")
+
+    specie = specie or ("courant" if msr else "normal" if mel else "spf")
+    if not grade:
+        raise ValueError("Classe manquante.")
+    if (category, specie, grade) not in sawn_lumber.snapshot().strengths:
+        raise ValueError(f"Classe inconnue: {category}, {specie}, {grade}")
+
+    strengths = sawn_lumber.specified_strengths(category, specie, grade, _flag(side))
+
+    return b, d, ply, category, strengths
+
+
+_DURATIONS = ("courte", "normale", "continue")
+_NUMBERS = ("mf", "vf", "dn", "e")
+
+
+def _loads(row: dict) -> tuple:
+    """
+    Durée d'application et valeurs numériques (mf, vf, dn, e) d'une ligne du bordereau.
+
+    Returns:
+        tuple: duration, mf, vf, dn, e.
+
+    Raises:
+        ValueError: Si une valeur n'est pas valide (ex: "1,5" ou "Normale").
+
+    """
+    duration = row.get("duration") or "normale"
+    if duration not in _DURATIONS:
+        raise ValueError(f"Durée d'application de la charge invalide: {duration}")
+    values = []
+    for key in _NUMBERS:
+        try:
+            values.append(_number(row.get(key)))
+        except ValueError:
+            raise ValueError(
+                f"Valeur numérique invalide ({key}): {row.get(key)}"
+            ) from None
+
+    return (duration, *values)
+
+
+def check_rows(rows: list[dict]) -> list[dict]:
+    """
+    Vérifie un bloc de lignes du bordereau.
+
+    Args:
+        rows (list[dict]): Lignes du bordereau.
+
+    Returns:
+        list[dict]: Lignes du bordereau complétées par OUTPUT_COLUMNS.
+
+    """
+    results = [dict(row) for row in rows]
+    valid = []
+    prepared = []
+    loads = []
+    memo = {}
+    for i, row in enumerate(rows):
+        key = tuple(row.get(k) for k in _KEYS)
+        if key not in memo:
+            try:
+                memo[key] = _prepare(*key)
+            except ValueError as error:
+                memo[key] = error
+        values = memo[key]
+        try:
+            if isinstance(values, ValueError):
+                raise values
+            row_loads = _loads(row)
+        except ValueError as error:
+            results[i].update(
+                category="", mr="", vr="", fr="", ratio="", verdict=str(error)
+            )
+            continue
+        prepared.append(values)
+        loads.append(row_loads)
+        valid.append(i)
+    if not valid:
+        return results
+
+    rows = [rows[i] for i in valid]
+    b, d, ply = (np.array([p[k] for p in prepared]) for k in range(3))
+    category = np.array([p[3] for p in prepared])
+    fb = np.array([p[4][0] for p in prepared])
+    fv = np.array([p[4][1] for p in prepared])
+
+    def flags(key: str) -> np.ndarray:
+        return np.array(_column(rows, key, _flag))
+
+    duration = np.array([values[0] for values in loads])
+    mf, vf, dn, e = (
+        np.array([values[k] for values in loads], dtype=float)
+        for k in range(1, 1 + len(_NUMBERS))
+    )
+    factors = {
+        "wet_service": flags("wet"),
+        "treated": flags("treated"),
+        "incised": flags("incised"),
+        "_2ft_spacing": flags("spacing"),
+        "connected_subfloor": flags("subfloor"),
+        "built_up_beam": ply > 1,
+    }
+    kd, ksb, kt, kh, kzb = sawn_lumber_batch.modification_factors(
+        b, d, "flex", duration, category, **factors
+    )
+    mr, status_m = sawn_lumber_batch.bending_moment(
+        b,
+        d,
+        fb,
+        ply,
+        kd,
+        kh,
+        kt,
+        ksb,
+        kzb,
+        lateral_support=flags("lateral"),
+        compressive_edge_support=flags("compressive_edge"),
+        tensile_edge_support=flags("tensile_edge"),
+        blocking_support=flags("blocking"),
+        tie_rods_support=flags("tie_rods"),
+    )
+
+    kd, ksv, kt, kh, kzv = sawn_lumber_batch.modification_factors(
+        b, d, "cis_v", duration, category, **factors
+    )
+    _, ksf, _, _, _ = sawn_lumber_batch.modification_factors(
+        b, d, "cis_f", duration, category, **factors
+    )
+    ksf = np.where((dn != 0) & (e != 0), ksf, 1)
+    vr, fr, status_v = sawn_lumber_batch.shear(
+        b, d, fv, ply, kd, kh, kt, ksv, ksf, kzv, dn, e
+    )
+
+    mr = mr / 1000000
+    vr = vr / 1000
+    fr = fr / 1000
+    shear_r = np.where((fr > 0) & (fr < vr), fr, vr)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bending_ratio = mf / mr
+        shear_ratio = vf / shear_r
+    ratio = np.fmax(bending_ratio, shear_ratio)
+
+    ok = int(sawn_lumber_batch.Status.OK)
+    status_m = status_m.tolist()
+    status_v = status_v.tolist()
+    ratio = np.where(np.isfinite(ratio), ratio, np.nan)
+    category, mr, vr, fr, ratio = (x.tolist() for x in (category, mr, vr, fr, ratio))
+    mf, vf, shear_r = mf.tolist(), vf.tolist(), shear_r.tolist()
+    bending_first = (bending_ratio >= shear_ratio).tolist()
+    for j, i in enumerate(valid):
+        if status_m[j] != ok:
+            verdict = "Valider Kl selon 7.5.6.4 - Fonctionnalité à venir"
+        elif status_v[j] != ok:
+            verdict = (
+                f"Entaille non valide: {sawn_lumber_batch.Status(status_v[j]).name}"
+            )
+        elif bending_first[j]:
+            verdict = general_design.limit_states_design(mf[j], mr[j])
+        else:
+            verdict = general_design.limit_states_design(vf[j], shear_r[j])
+        results[i].update(
+            category=category[j],
+            mr=mr[j],
+            vr=vr[j],
+            fr=fr[j],
+            ratio=ratio[j] if ratio[j] == ratio[j] else "",
+            verdict=verdict,
+        )
+
+    return results
+
+
+def read_chunks(path: str, chunk_size: int = 10000):
+    """
+    Lit un bordereau CSV ou Parquet par blocs.
+
+    Args:
+        path (str): Fichier .csv ou .parquet.
+        chunk_size (int, optional): Nombre de lignes par bloc. Default to 10000.
+
+    Yields:
+        list[dict]: Bloc de lignes.
+
+    """
+    if path.endswith(".parquet"):
+        # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    with open(path, newline="", encoding="utf-8") as file:
+        chunk = []
+        for row in csv.DictReader(file):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class _Writer:
+    """
+    Écrit les résultats en CSV ou en Parquet, bloc par bloc.
+
+    Args:
+        path (str): Fichier .csv ou .parquet.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def write(self, rows: list[dict]):
+        """
+        Écrit un bloc de lignes.
+
+        """
+        if not rows:
+            return
+        if self.path.endswith(".parquet"):
+            # pylint: disable=import-outside-toplevel
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pylist(
+                [{key: str(value) for key, value in row.items()} for row in rows]
+            )
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+            return
+
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0]))
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+
+    def close(self):
+        """
+        Ferme le fichier.
+
+        """
+        if self._file is not None:
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+def check_schedule(
+    source: str,
+    output: str,
+    chunk_size: int = 10000,
+    workers: int | None = None,
+) -> int:
+    """
+    Vérifie un bordereau complet.
+
+    Args:
+        source (str): Bordereau .csv ou .parquet.
+        output (str): Fichier de résultats .csv ou .parquet.
+        chunk_size (int, optional): Nombre de lignes par bloc. Default to 10000.
+        workers (int | None, optional): Nombre de processus. Default to os.cpu_count().
+
+    Returns:
+        int: Nombre de lignes vérifiées.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = _Writer(output)
+    count = 0
+    try:
+        if workers == 1:
+            for chunk in read_chunks(source, chunk_size):
+                writer.write(check_rows(chunk))
+                count += len(chunk)
+            return count
+
+        with ProcessPoolExecutor(workers) as executor:
+            pending = collections.deque()
+            for chunk in read_chunks(source, chunk_size):
+                pending.append(executor.submit(check_rows, chunk))
+                if len(pending) >= 2 * workers:
+                    rows = pending.popleft().result()
+                    writer.write(rows)
+                    count += len(rows)
+            while pending:
+                rows = pending.popleft().result()
+                writer.write(rows)
+                count += len(rows)
+    finally:
+        writer.close()
+
+    return count
+
+
+def main(args: list[str] | None = None):
+    """
+    Point d'entrée en ligne de commande.
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Vérifie un bordereau d'éléments en bois de sciage (CSA O86:19)."
+    )
+    parser.add_argument("source", help="Bordereau .csv ou .parquet.")
+    parser.add_argument(
+        "-o", "--output", required=True, help="Résultats .csv ou .parquet."
+    )
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    options = parser.parse_args(args)
+
+    with profiling.from_environment():
+        count = check_schedule(
+            options.source, options.output, options.chunk_size, options.workers
+        )
+    print(f"{count} éléments vérifiés -> {options.output}")
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour la vérification d'un bordereau.
+
+    """
+    # Test check_rows
+    rows = [
+        {"b": "2", "d": "10", "ply": "3", "grade": "n1-n2", "mf": "10", "vf": "12"},
+        {"b": "2", "d": "4", "specie": "df", "grade": "ss", "mf": "1"},
+        {"b": "1", "d": "4"},
+        {"b": "2", "d": "18", "grade": "ss", "mf": "1"},
+        {"b": "2", "d": "10", "mf": "1"},
+    ]
+    test_check_rows = check_rows(rows)
+
+    kd, ksb, kt, kh, kzb = sawn_lumber.modification_factors(
+        38, 235, "flex", "normale", "Lumber", built_up_beam=True
+    )
+    fb = sawn_lumber.specified_strengths("Lumber", "spf", "n1-n2")[0]
+    mr = sawn_lumber.Resistances(38, 235, kd, kh, kt, 3).bending_moment(fb, ksb, kzb)
+    expected_result = mr / 1000000
+    assert (
+        test_check_rows[0]["mr"] == expected_result
+    ), f"check_rows -> FAILED\n {expected_result = }\n {test_check_rows[0]['mr'] = }"
+
+    expected_result = general_design.limit_states_design(1, test_check_rows[1]["mr"])
+    assert (
+        test_check_rows[1]["verdict"] == expected_result
+    ), f"check_rows -> FAILED\n {expected_result = }\n {test_check_rows[1] = }"
+
+    expected_result = "Les dimensions ne peuvent pas être plus petites que 38 mm."
+    assert (
+        test_check_rows[2]["verdict"] == expected_result
+    ), f"check_rows -> FAILED\n {expected_result = }\n {test_check_rows[2] = }"
+
+    expected_result = (
+        "Section non disponible (38 x 457 mm): "
+        "Valider la disponibilité du bois chez les fournisseurs."
+    )
+    assert (
+        test_check_rows[3]["verdict"] == expected_result
+        and test_check_rows[3]["mr"] == ""
+    ), f"check_rows -> FAILED\n {expected_result = }\n {test_check_rows[3] = }"
+
+    expected_result = "Classe manquante."
+    assert (
+        test_check_rows[4]["verdict"] == expected_result
+    ), f"check_rows -> FAILED\n {expected_result = }\n {test_check_rows[4] = }"
+
+    # Test check_rows with invalid values on some rows only
+    rows = [
+        {"b": "2", "d": "10", "grade": "n1-n2", "mf": "1,5"},
+        {"b": "2", "d": "10", "grade": "n1-n2", "mf": "1.5"},
+        {"b": "2", "d": "10", "grade": "n1-n2", "duration": "Normale"},
+        {"b": "2", "d": "10", "grade": "n1-n2", "vf": "2", "dn": "x"},
+    ]
+    test_check_rows = [
+        row["verdict"] if i != 1 else row["vr"]
+        for i, row in enumerate(check_rows(rows))
+    ]
+    expected_result = [
+        "Valeur numérique invalide (mf): 1,5",
+        check_rows(rows[1:2])[0]["vr"],
+        "Durée d'application de la charge invalide: Normale",
+        "Valeur numérique invalide (dn): x",
+    ]
+    assert (
+        test_check_rows == expected_result
+    ), f"check_rows -> FAILED\n {expected_result = }\n {test_check_rows = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    main()
+
+
+# END
@@ -0,0 +1,502 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Optimisation d'une section de bois de sciage en flexion.
+----------------------------------------------------
+
+Cherche, parmi les dimensions du tableau A.3 (lumber_sizes), les classes des tableaux 6.4 à
+6.9 (sawn_lumber_strengths) et les éléments composés de 1 à 5 plis, les sections qui résistent
+à Mf et Vf (6.5.3 et 6.5.4).
+
+Les résistances de toutes les sections candidates sont calculées en une seule passe vectorisée
+(voir capacity_table) et conservées pour chaque combinaison de conditions d'utilisation. Une
+recherche ne fait donc que des comparaisons: quelques millisecondes.
+
+Élagage: pour un même groupe (largeur, plis, classe), une section plus haute a une aire et une
+hauteur supérieures. Seule la première section suffisante de chaque groupe est conservée, puis
+les sections dominées (aire ou coût, hauteur) sont retirées. Une fonction de coût doit donc
+croître avec la hauteur pour une même largeur, un même nombre de plis et une même classe.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from dataclasses import dataclass, replace
+from typing import Callable
+import functools
+import numpy as np
+from database import snapshot
+import sawn_lumber
+import sawn_lumber_batch
+
+# CODE
+PLIES = (1, 2, 3, 4, 5)
+CATEGORIES = ("Light", "Lumber", "Beam", "Post", "MSR", "MEL")
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    """
+    Section candidate.
+
+    Args:
+        b_nominal (int): Largeur nominale d'un pli, po.
+        d_nominal (int): Hauteur nominale, po.
+        b (int): Largeur nette d'un pli, mm.
+        d (int): Hauteur nette, mm.
+        ply (int): Nombre de plis.
+        category (str): Catégorie.
+        specie (str): Groupe d'essence.
+        grade (str): Classe.
+        area (int): Aire de la section, mm2.
+        mr (float): Résistance pondérée au moment de flexion, kN*m.
+        vr (float): Résistance pondérée au cisaillement, kN.
+        cost (float): Coût (aire si aucune fonction de coût n'est donnée).
+
+    """
+
+    b_nominal: int
+    d_nominal: int
+    b: int
+    d: int
+    ply: int
+    category: str
+    specie: str
+    grade: str
+    area: int
+    mr: float
+    vr: float
+    cost: float
+
+
+@dataclass(frozen=True)
+class CapacityTable:
+    """
+    Résistances de toutes les sections candidates pour des conditions données.
+
+    Chaque attribut est un tableau d'une valeur par section, triées par groupe (b, plis,
+    classe) puis par hauteur croissante.
+
+    """
+
+    b_nominal: np.ndarray
+    d_nominal: np.ndarray
+    b: np.ndarray
+    d: np.ndarray
+    ply: np.ndarray
+    category: np.ndarray
+    specie: np.ndarray
+    grade: np.ndarray
+    group: np.ndarray
+    area: np.ndarray
+    mr: np.ndarray
+    vr: np.ndarray
+
+
+def _candidates(green: bool, is_msr: bool, is_mel: bool, side: bool) -> list[tuple]:
+    """
+    Énumère les sections candidates.
+
+    Returns:
+        list[tuple]: (b_nominal, d_nominal, b, d, ply, category, specie, grade, fb, fv).
+
+    """
+    tables = snapshot()
+    nominals = sorted(tables.sizes)
+    rows = []
+    for i, b_nominal in enumerate(nominals):
+        b = sawn_lumber.sizes(b_nominal, green)
+        for d_nominal in nominals[i:]:
+            d = sawn_lumber.sizes(d_nominal, green)
+            category = sawn_lumber.lumber_category(b, d, is_msr, is_mel)
+            if category not in CATEGORIES:
+                continue
+            for category_, specie, grade in tables.strengths:
+                if category_ != category:
+                    continue
+                fb, fv, *_ = sawn_lumber.specified_strengths(
+                    category, specie, grade, side
+                )
+                for ply in PLIES:
+                    rows.append(
+                        (
+                            b_nominal,
+                            d_nominal,
+                            b,
+                            d,
+                            ply,
+                            category,
+                            specie,
+                            grade,
+                            fb,
+                            fv,
+                        )
+                    )
+
+    return rows
+
+
+_TABLE_SNAPSHOT = None
+
+
+def capacity_table(
+    duration: str = "normale",
+    green: bool = False,
+    is_msr: bool = False,
+    is_mel: bool = False,
+    side: bool = False,
+    wet_service: bool = False,
+    treated: bool = False,
+    incised: bool = False,
+    _2ft_spacing: bool = False,
+    connected_subfloor: bool = False,
+    lateral_support: bool = False,
+    compressive_edge_support: bool = False,
+    tensile_edge_support: bool = False,
+    blocking_support: bool = False,
+    tie_rods_support: bool = False,
+) -> CapacityTable:
+    """
+    Calcule Mr et Vr de toutes les sections candidates (mémoïsé par conditions).
+
+    Les tables mémoïsées sont effacées lorsque les tableaux de la base de données sont
+    rechargés (database.reload).
+
+    Args:
+        Voir optimize.
+
+    Returns:
+        CapacityTable: Résistances des sections pour lesquelles Kl n'a pas à être validé.
+
+    """
+    global _TABLE_SNAPSHOT  # pylint: disable=global-statement
+    current = snapshot()
+    if current is not _TABLE_SNAPSHOT:
+        _capacity_table.cache_clear()
+        _TABLE_SNAPSHOT = current
+
+    return _capacity_table(
+        duration,
+        green,
+        is_msr,
+        is_mel,
+        side,
+        wet_service,
+        treated,
+        incised,
+        _2ft_spacing,
+        connected_subfloor,
+        lateral_support,
+        compressive_edge_support,
+        tensile_edge_support,
+        blocking_support,
+        tie_rods_support,
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _capacity_table(
+    duration: str = "normale",
+    green: bool = False,
+    is_msr: bool = False,
+    is_mel: bool = False,
+    side: bool = False,
+    wet_service: bool = False,
+    treated: bool = False,
+    incised: bool = False,
+    _2ft_spacing: bool = False,
+    connected_subfloor: bool = False,
+    lateral_support: bool = False,
+    compressive_edge_support: bool = False,
+    tensile_edge_support: bool = False,
+    blocking_support: bool = False,
+    tie_rods_support: bool = False,
+) -> CapacityTable:
+    """
+    Résistances de toutes les sections candidates pour des conditions (mémorisées).
+
+    """
+    rows = _candidates(green, is_msr, is_mel, side)
+    columns = list(zip(*rows))
+    b_nominal, d_nominal, b, d, ply = (np.array(c) for c in columns[:5])
+    category, specie, grade = (np.array(c) for c in columns[5:8])
+    fb, fv = (np.array(c, dtype=float) for c in columns[8:])
+
+    factors = {
+        "wet_service": wet_service,
+        "treated": treated,
+        "incised": incised,
+        "_2ft_spacing": _2ft_spacing,
+        "connected_subfloor": connected_subfloor,
+        "built_up_beam": ply > 1,
+    }
+    kd, ksb, kt, kh, kzb = sawn_lumber_batch.modification_factors(
+        b, d, "flex", duration, category, **factors
+    )
+    mr, status = sawn_lumber_batch.bending_moment(
+        b,
+        d,
+        fb,
+        ply,
+        kd,
+        kh,
+        kt,
+        ksb,
+        kzb,
+        lateral_support,
+        compressive_edge_support,
+        tensile_edge_support,
+        blocking_support,
+        tie_rods_support,
+    )
+    kd, ksv, kt, kh, kzv = sawn_lumber_batch.modification_factors(
+        b, d, "cis_v", duration, category, **factors
+    )
+    vr, _, _ = sawn_lumber_batch.shear(b, d, fv, ply, kd, kh, kt, ksv, 1, kzv)
+
+    keep = status == sawn_lumber_batch.Status.OK
+    _, group = np.unique(
+        np.rec.fromarrays((b_nominal, ply, specie, grade)), return_inverse=True
+    )
+    order = np.lexsort((d, group))
+    order = order[keep[order]]
+
+    return CapacityTable(
+        b_nominal=b_nominal[order],
+        d_nominal=d_nominal[order],
+        b=b[order],
+        d=d[order],
+        ply=ply[order],
+        category=category[order],
+        specie=specie[order],
+        grade=grade[order],
+        group=group[order],
+        area=(b * ply * d)[order],
+        mr=mr[order] / 1e6,
+        vr=vr[order] / 1e3,
+    )
+
+
+def _pareto(first: np.ndarray, second: np.ndarray) -> list[int]:
+    """
+    Indices des points non dominés (minimiser first et second), ex aequo compris.
+
+    """
+    front = []
+    best = (np.inf, np.inf)
+    points = list(zip(first.tolist(), second.tolist()))
+    for i in np.lexsort((second, first)).tolist():
+        point = points[i]
+        if point[1] < best[1] or point == best:
+            front.append(i)
+            best = point
+
+    return front
+
+
+def optimize(
+    mf: float,
+    vf: float,
+    duration: str = "normale",
+    rank: str = "area",
+    cost: Callable[[Section], float] | None = None,
+    species: tuple[str, ...] | None = None,
+    grades: tuple[str, ...] | None = None,
+    plies: tuple[int, ...] = PLIES,
+    green: bool = False,
+    is_msr: bool = False,
+    is_mel: bool = False,
+    side: bool = False,
+    wet_service: bool = False,
+    treated: bool = False,
+    incised: bool = False,
+    _2ft_spacing: bool = False,
+    connected_subfloor: bool = False,
+    lateral_support: bool = False,
+    compressive_edge_support: bool = False,
+    tensile_edge_support: bool = False,
+    blocking_support: bool = False,
+    tie_rods_support: bool = False,
+) -> list[Section]:
+    """
+    Sections les plus légères (ou les moins coûteuses) qui résistent à Mf et Vf.
+
+    Args:
+        mf (float): Moment pondéré, kN*m.
+        vf (float): Cisaillement pondéré, kN.
+        duration (str, optional): "courte", "normale" ou "continue". Default to "normale".
+        rank (str, optional): Critère de tri, "area" ou "cost". Default to "area".
+        cost (Callable, optional): Coût d'une section (requis si rank = "cost"), croissant
+            avec la hauteur.
+        species (tuple[str, ...], optional): Groupes d'essence admis. Default to tous.
+        grades (tuple[str, ...], optional): Classes admises. Default to toutes.
+        plies (tuple[int, ...], optional): Nombres de plis admis. Default to 1 à 5.
+        green (bool, optional): Bois vert. Default to False.
+        is_msr (bool, optional): Bois MSR. Default to False.
+        is_mel (bool, optional): Bois MEL. Default to False.
+        side (bool, optional): Charges appliquées sur la grande face. Default to False.
+
+        wet_service, treated, incised, _2ft_spacing, connected_subfloor: voir
+        sawn_lumber.modification_factors (built_up_beam si plus d'un pli).
+
+        lateral_support, compressive_edge_support, tensile_edge_support, blocking_support,
+        tie_rods_support: voir sawn_lumber.Resistances.bending_moment.
+
+    Returns:
+        list[Section]: Ensemble de Pareto (aire ou coût, hauteur), trié selon rank.
+
+    Raises:
+        ValueError: Si rank n'est pas reconnu ou si cost manque.
+
+    """
+    if rank not in ("area", "cost"):
+        raise ValueError(f"Critère de tri invalide: {rank}")
+    if rank == "cost" and cost is None:
+        raise ValueError("Une fonction de coût est requise pour rank='cost'.")
+
+    table = capacity_table(
+        duration,
+        green,
+        is_msr,
+        is_mel,
+        side,
+        wet_service,
+        treated,
+        incised,
+        _2ft_spacing,
+        connected_subfloor,
+        lateral_support,
+        compressive_edge_support,
+        tensile_edge_support,
+        blocking_support,
+        tie_rods_support,
+    )
+
+    passing = (table.mr >= mf) & (table.vr >= vf) & np.isin(table.ply, plies)
+    if species is not None:
+        passing &= np.isin(table.specie, species)
+    if grades is not None:
+        passing &= np.isin(table.grade, grades)
+    index = np.flatnonzero(passing)
+    if not index.size:
+        return []
+
+    # Élagage: première section suffisante (hauteur croissante) de chaque groupe.
+    group = table.group[index]
+    index = index[np.concatenate(([True], group[1:] != group[:-1]))]
+
+    if cost is None:
+        front = index[_pareto(table.area[index], table.d[index])]
+        sections = [_section(table, i) for i in front.tolist()]
+    else:
+        sections = [_section(table, i) for i in index.tolist()]
+        sections = [replace(section, cost=float(cost(section))) for section in sections]
+        key = np.array([section.cost for section in sections])
+        depth = np.array([section.d for section in sections])
+        sections = [sections[i] for i in _pareto(key, depth)]
+
+    return sorted(sections, key=lambda section: (getattr(section, rank), section.d))
+
+
+def _section(table: CapacityTable, i: int) -> Section:
+    """
+    Section i de la table des résistances.
+
+    """
+    return Section(
+        b_nominal=int(table.b_nominal[i]),
+        d_nominal=int(table.d_nominal[i]),
+        b=int(table.b[i]),
+        d=int(table.d[i]),
+        ply=int(table.ply[i]),
+        category=str(table.category[i]),
+        specie=str(table.specie[i]),
+        grade=str(table.grade[i]),
+        area=int(table.area[i]),
+        mr=float(table.mr[i]),
+        vr=float(table.vr[i]),
+        cost=float(table.area[i]),
+    )
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour l'optimisation des sections.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import database
+
+    # Test optimize against a brute-force search
+    mf, vf = 12.0, 15.0
+    test_optimize = optimize(mf, vf, species=("spf",))
+    brute = []
+    for b_nominal in snapshot().sizes:
+        for d_nominal in snapshot().sizes:
+            b = sawn_lumber.sizes(b_nominal)
+            d = sawn_lumber.sizes(d_nominal)
+            category = sawn_lumber.lumber_category(b, d)
+            if d < b or category not in CATEGORIES:
+                continue
+            for key in snapshot().strengths:
+                if key[:2] != (category, "spf"):
+                    continue
+                fb, fv, *_ = sawn_lumber.specified_strengths(*key)
+                for ply in PLIES:
+                    built_up = ply > 1
+                    factors = sawn_lumber.all_modification_factors(
+                        b, d, "normale", category, built_up_beam=built_up
+                    )
+                    kd, ksb, kt, kh, kzb = factors["flex"]
+                    resistances = sawn_lumber.Resistances(b, d, kd, kh, kt, ply)
+                    try:
+                        mr = resistances.bending_moment(fb, ksb, kzb) / 1e6
+                    except Warning:
+                        continue
+                    kd, ksv, kt, kh, kzv = factors["cis_v"]
+                    resistances = sawn_lumber.Resistances(b, d, kd, kh, kt, ply)
+                    vr = resistances.shear(fv, ksv, 1, kzv)[0] / 1e3
+                    if mr >= mf and vr >= vf:
+                        brute.append((b * ply * d, d, key[2]))
+    expected_result = sorted(
+        (area, d)
+        for area, d, _ in brute
+        if not any((a <= area and h <= d) and (a, h) != (area, d) for a, h, _ in brute)
+    )
+    test_front = sorted({(section.area, section.d) for section in test_optimize})
+    assert test_front == sorted(
+        set(expected_result)
+    ), f"optimize -> FAILED\n {expected_result = }\n {test_front = }"
+
+    # Test optimize by cost
+    test_cost = optimize(
+        mf, vf, rank="cost", cost=lambda section: section.area * section.ply
+    )
+    assert all(
+        section.cost == section.area * section.ply for section in test_cost
+    ), f"optimize_cost -> FAILED\n {test_cost = }"
+
+    # Test capacity_table memoization and reload
+    test_memo = capacity_table()
+    assert (
+        test_memo is capacity_table()
+    ), f"capacity_table memo -> FAILED\n {test_memo = }"
+    database.reload()
+    test_reload = capacity_table()
+    assert test_reload is not test_memo and np.array_equal(
+        test_reload.mr, test_memo.mr, equal_nan=True
+    ), f"capacity_table reload -> FAILED\n {test_reload = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
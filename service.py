@@ -0,0 +1,659 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Service HTTP local des calculs (asyncio, bibliothèque standard seulement).
+----------------------------------------------------
+
+Expose sawn_lumber et general_design aux autres outils, sans Streamlit.
+
+Requêtes POST: le corps est un objet JSON (un calcul), un tableau JSON (un lot) ou du NDJSON
+(Content-Type: application/x-ndjson, un objet par ligne). La réponse a la même forme. Chaque
+objet contient les arguments nommés du calcul; pour les méthodes des classes, les attributs
+de la classe et les arguments de la méthode sont dans le même objet. Une erreur n'invalide
+que son élément: {"error": "..."}.
+
+    POST /strengths                     sawn_lumber.specified_strengths
+    POST /modification_factors          sawn_lumber.modification_factors
+    POST /sizes                         sawn_lumber.sizes
+    POST /resistances/<méthode>         sawn_lumber.Resistances (bending_moment, shear,
+                                        comp_parallel, comp_perpendicular, tensile_parallel)
+    POST /vibration/<méthode>           general_design.Vibration (floor_vibration_check,
+                                        floor_vibration, max_span)
+    POST /fire                          general_design.FireResistance.effective_section
+
+    GET /reference/<table>              Instantané des tables (strengths, sizes, subfloors).
+    GET /health
+
+Les lots de plus de inline éléments sont calculés dans un ProcessPoolExecutor; les plus petits
+directement dans la boucle, où l'aller-retour vers un processus coûterait plus que le calcul.
+Les éléments identiques d'un lot ne sont calculés qu'une fois, et les requêtes identiques
+simultanées partagent le même calcul (regroupement des requêtes en cours).
+
+Usage:
+    python service.py [--host 127.0.0.1] [--port 8086] [--workers N]
+
+Instrumentation: voir profiling (CSA_O86_PROFILE), rapport écrit à l'arrêt du service. Les
+lots calculés dans les processus ne sont pas mesurés; utiliser --workers 0.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, is_dataclass
+import argparse
+import asyncio
+import json
+import math
+import os
+import database
+import general_design
+import profiling
+import sawn_lumber
+
+# CODE
+MAX_BODY = 64 * 1024 * 1024
+NDJSON = "application/x-ndjson"
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+def _method(cls: type, name: str):
+    """
+    Calcul d'une méthode de classe: les attributs de la classe sont séparés des arguments.
+
+    """
+    attributes = {field.name for field in fields(cls)}
+
+    def calculate(**item):
+        instance = cls(**{k: v for k, v in item.items() if k in attributes})
+        return getattr(instance, name)(
+            **{k: v for k, v in item.items() if k not in attributes}
+        )
+
+    return calculate
+
+
+def _function(module, name: str):
+    """
+    Calcul d'une fonction de module, résolue à chaque appel (voir profiling).
+
+    """
+
+    def calculate(**item):
+        return getattr(module, name)(**item)
+
+    return calculate
+
+
+ENDPOINTS = {
+    "/strengths": _function(sawn_lumber, "specified_strengths"),
+    "/modification_factors": _function(sawn_lumber, "modification_factors"),
+    "/sizes": _function(sawn_lumber, "sizes"),
+    **{
+        f"/resistances/{name}": _method(sawn_lumber.Resistances, name)
+        for name in (
+            "bending_moment",
+            "shear",
+            "comp_parallel",
+            "comp_perpendicular",
+            "tensile_parallel",
+        )
+    },
+    **{
+        f"/vibration/{name}": _method(general_design.Vibration, name)
+        for name in ("floor_vibration_check", "floor_vibration", "max_span")
+    },
+    "/fire": _method(general_design.FireResistance, "effective_section"),
+}
+
+
+def _jsonable(value):
+    """
+    Convertit un résultat en JSON standard (nan et inf -> null).
+
+    """
+    if is_dataclass(value) and not isinstance(value, type):
+        return _jsonable(asdict(value))
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if hasattr(value, "item"):
+        return _jsonable(value.item())
+
+    return value
+
+
+def evaluate(endpoint: str, items: list[dict]) -> list:
+    """
+    Calcule un lot d'éléments, chaque élément distinct une seule fois.
+
+    Args:
+        endpoint (str): Chemin du calcul (voir ENDPOINTS).
+        items (list[dict]): Arguments nommés de chaque élément.
+
+    Returns:
+        list: Résultats (JSON), ou {"error": message} pour un élément non valide.
+
+    """
+    function = ENDPOINTS[endpoint]
+    memo = {}
+    results = []
+    for item in items:
+        key = json.dumps(item, sort_keys=True)
+        if key not in memo:
+            try:
+                if not isinstance(item, dict):
+                    raise TypeError("Un élément doit être un objet JSON.")
+                memo[key] = _jsonable(function(**item))
+            except Exception as error:  # pylint: disable=broad-except
+                # Toute erreur d'un calcul (ex: ZeroDivisionError, sous-plancher inconnu)
+                # n'invalide que son élément.
+                memo[key] = {"error": f"{type(error).__name__}: {error}"}
+        results.append(memo[key])
+
+    return results
+
+
+_REFERENCE = (None, {})
+
+
+def _reference() -> dict[str, bytes]:
+    """
+    Tables de l'instantané, sérialisées une seule fois par instantané (database.reload).
+
+    """
+    global _REFERENCE  # pylint: disable=global-statement
+    current = database.snapshot()
+    if _REFERENCE[0] is current:
+        return _REFERENCE[1]
+    tables = {
+        "strengths": [asdict(row) for row in current.strengths.values()],
+        "sizes": [asdict(row) for row in current.sizes.values()],
+        "subfloors": [asdict(row) for row in current.subfloors.values()],
+    }
+
+    reference = {
+        f"/reference/{name}": json.dumps(rows).encode() for name, rows in tables.items()
+    }
+    _REFERENCE = (current, reference)
+
+    return reference
+
+
+def _worker_init():
+    """
+    Charge l'instantané dans chaque processus avant la première requête.
+
+    """
+    database.snapshot()
+
+
+class Service:
+    """
+    Service HTTP/1.1 (connexions persistantes).
+
+    Args:
+        workers (int, optional): Nombre de processus. 0 pour tout calculer dans la boucle.
+            Default to os.cpu_count().
+        inline (int, optional): Taille maximale d'un lot calculé dans la boucle. Default to 8.
+
+    """
+
+    def __init__(self, workers: int | None = None, inline: int = 8):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.inline = inline
+        self.executor = None
+        self.server = None
+        self.computations = 0
+        self._pending: dict[tuple[str, str], asyncio.Future] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8086):
+        """
+        Démarre le service.
+
+        Returns:
+            int: Port d'écoute (utile avec port = 0).
+
+        """
+        if self.workers:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_worker_init)
+        self.server = await asyncio.start_server(self._connection, host, port)
+
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """
+        Arrête le service et les processus.
+
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    async def compute(self, endpoint: str, items: list) -> list:
+        """
+        Calcule un lot, en partageant le calcul des requêtes identiques en cours.
+
+        """
+        key = (endpoint, json.dumps(items, sort_keys=True))
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = self._pending[key] = loop.create_future()
+        try:
+            self.computations += 1
+            if self.executor is None or len(items) <= self.inline:
+                results = evaluate(endpoint, items)
+            else:
+                results = await loop.run_in_executor(
+                    self.executor, evaluate, endpoint, items
+                )
+        except Exception as error:  # pylint: disable=broad-except
+            future.set_exception(error)
+            future.exception()  # Lue, même si aucune autre requête n'attend.
+            raise
+        else:
+            future.set_result(results)
+        finally:
+            del self._pending[key]
+
+        return results
+
+    async def handle(
+        self, method: str, path: str, content_type: str, body: bytes
+    ) -> tuple[int, str, bytes]:
+        """
+        Traite une requête.
+
+        Returns:
+            tuple: Code HTTP, Content-Type, corps de la réponse.
+
+        """
+        if path == "/health":
+            return 200, "application/json", b'{"status": "ok"}'
+        reference = _reference()
+        if path in reference:
+            if method != "GET":
+                return 405, "application/json", b'{"error": "GET"}'
+            return 200, "application/json", reference[path]
+        if path not in ENDPOINTS:
+            return 404, "application/json", b'{"error": "Calcul inconnu."}'
+        if method != "POST":
+            return 405, "application/json", b'{"error": "POST"}'
+
+        ndjson = content_type.split(";")[0].strip() == NDJSON
+        try:
+            if ndjson:
+                payload = [
+                    json.loads(line) for line in body.splitlines() if line.strip()
+                ]
+            else:
+                payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError) as error:
+            message = json.dumps({"error": f"JSON non valide: {error}"})
+            return 400, "application/json", message.encode()
+
+        single = not ndjson and not isinstance(payload, list)
+        results = await self.compute(path, [payload] if single else payload)
+        if ndjson:
+            lines = "".join(json.dumps(result) + "\n" for result in results)
+            return 200, NDJSON, lines.encode()
+
+        return (
+            200,
+            "application/json",
+            json.dumps(results[0] if single else results).encode(),
+        )
+
+    async def _connection(self, reader, writer):
+        """
+        Lit les requêtes d'une connexion jusqu'à sa fermeture.
+
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and (
+                    version == "HTTP/1.1"
+                    or headers.get("connection", "").lower() == "keep-alive"
+                )
+                length = headers.get("content-length", "0")
+                length = int(length) if length.isdigit() else None
+                if "transfer-encoding" in headers:
+                    status, content_type, body = 411, "application/json", b"{}"
+                    keep_alive = False
+                elif length is None:
+                    status, content_type = 400, "application/json"
+                    body = b'{"error": "Content-Length non valide."}'
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, content_type, body = 413, "application/json", b"{}"
+                    keep_alive = False
+                else:
+                    data = await reader.readexactly(length)
+                    try:
+                        status, content_type, body = await self.handle(
+                            method,
+                            target.split("?")[0],
+                            headers.get("content-type", ""),
+                            data,
+                        )
+                    except Exception as error:  # pylint: disable=broad-except
+                        status, content_type = 500, "application/json"
+                        body = json.dumps({"error": str(error)}).encode()
+
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                        f"Content-Type: {content_type}\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Arrêt du service: la connexion est fermée sans erreur.
+            pass
+        finally:
+            writer.close()
+
+
+class Client:
+    """
+    Client HTTP minimal du service (une connexion persistante), pour les essais.
+
+    Args:
+        host (str): Adresse du service.
+        port (int): Port du service.
+
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8086):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def request(
+        self, method: str, path: str, body: bytes = b"", content_type: str = ""
+    ) -> tuple[int, str, bytes]:
+        """
+        Envoie une requête et lit la réponse.
+
+        Returns:
+            tuple: Code HTTP, Content-Type, corps de la réponse.
+
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        self._writer.write(
+            (
+                f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: {content_type or 'application/json'}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await self._reader.readexactly(int(headers["content-length"]))
+        if headers.get("connection") == "close":
+            await self.close()
+
+        return status, headers.get("content-type", ""), body
+
+    async def get(self, path: str):
+        """
+        GET, réponse JSON décodée.
+
+        """
+        _, _, body = await self.request("GET", path)
+        return json.loads(body)
+
+    async def post(self, path: str, payload, ndjson: bool = False):
+        """
+        POST d'un objet ou d'un lot (liste), réponse JSON décodée.
+
+        """
+        if ndjson:
+            body = "".join(json.dumps(item) + "\n" for item in payload).encode()
+            _, _, response = await self.request("POST", path, body, NDJSON)
+            return [json.loads(line) for line in response.splitlines()]
+
+        _, _, response = await self.request("POST", path, json.dumps(payload).encode())
+        return json.loads(response)
+
+    async def close(self):
+        """
+        Ferme la connexion.
+
+        """
+        if self._writer is not None:
+            writer = self._writer
+            self._reader = self._writer = None
+            writer.close()
+            await writer.wait_closed()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8086, workers: int | None = None):
+    """
+    Démarre le service et attend indéfiniment.
+
+    """
+    service = Service(workers)
+    port = await service.start(host, port)
+    print(f"Service CSA O86:19 -> http://{host}:{port}")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(args: list[str] | None = None):
+    """
+    Point d'entrée en ligne de commande.
+
+    """
+    parser = argparse.ArgumentParser(description="Service HTTP local CSA O86:19.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--workers", type=int, default=None)
+    options = parser.parse_args(args)
+
+    with profiling.from_environment():
+        try:
+            asyncio.run(serve(options.host, options.port, options.workers))
+        except KeyboardInterrupt:
+            pass
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour le service HTTP.
+
+    """
+
+    async def run():
+        service = Service(workers=1, inline=2)
+        port = await service.start(port=0)
+        client = Client(port=port)
+        try:
+            # Test strengths
+            test_strengths = await client.post(
+                "/strengths", {"category": "Beam", "specie": "spf", "grade": "ss"}
+            )
+            expected_result = list(sawn_lumber.specified_strengths("Beam", "spf", "ss"))
+            assert (
+                test_strengths == expected_result
+            ), f"strengths -> FAILED\n {expected_result = }\n {test_strengths = }"
+
+            # Test resistances batch (process pool) and NDJSON
+            items = [
+                {"b": 89, "d": d, "kd": 1, "fb": 11.8, "lateral_support": True}
+                for d in (140, 184, 235, 286, 140)
+            ]
+            expected_result = [
+                sawn_lumber.Resistances(89, d).bending_moment(
+                    11.8, lateral_support=True
+                )
+                for d in (140, 184, 235, 286, 140)
+            ]
+            for ndjson in (False, True):
+                test_batch = await client.post(
+                    "/resistances/bending_moment", items, ndjson
+                )
+                assert (
+                    test_batch == expected_result
+                ), f"resistances -> FAILED\n {expected_result = }\n {test_batch = }"
+
+            # Test errors
+            test_error = await client.post(
+                "/fire", [{"duration": 120, "width": 89, "depth": 140}, {"width": 1}]
+            )
+            assert all(
+                "error" in result for result in test_error
+            ), f"fire errors -> FAILED\n {test_error = }"
+            status, _, _ = await client.request("POST", "/inconnu", b"{}")
+            assert status == 404, f"404 -> FAILED\n {status = }"
+            status, _, _ = await client.request("POST", "/fire", b"{")
+            assert status == 400, f"400 -> FAILED\n {status = }"
+            test_error = await client.post(
+                "/resistances/comp_perpendicular",
+                [{"b": 38, "d": 0}, {"b": 38, "d": 140, "fcp": 5.3}],
+            )
+            assert (
+                "error" in test_error[0] and "error" not in test_error[1]
+            ), f"item errors -> FAILED\n {test_error = }"
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /fire HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+            await writer.drain()
+            test_status = (await reader.readline()).split()[1]
+            writer.close()
+            await writer.wait_closed()
+            assert test_status == b"400", f"Content-Length -> FAILED\n {test_status = }"
+
+            # Test vibration and fire
+            vibration = {
+                "span": 4,
+                "joist_axial_stiffness": 1e8,
+                "joist_bending_stiffness": 5e5,
+                "joist_depth": 0.24,
+                "joist_mass": 5,
+                "topping": "OSB 3/4",
+            }
+            test_check = await client.post(
+                "/vibration/floor_vibration_check", vibration
+            )
+            expected_result = asdict(
+                general_design.Vibration(**vibration).floor_vibration_check()
+            )
+            assert (
+                test_check == expected_result
+            ), f"vibration -> FAILED\n {expected_result = }\n {test_check = }"
+            test_error = await client.post(
+                "/vibration/floor_vibration_check",
+                [dict(vibration, subfloor="bogus"), vibration],
+            )
+            assert (
+                test_error[0].keys() == {"error"} and test_error[1] == test_check
+            ), f"item errors -> FAILED\n {test_error = }"
+            test_fire = await client.post(
+                "/fire", {"duration": 60, "width": 235, "depth": 400}
+            )
+            expected_result = list(
+                general_design.FireResistance(60, 235, 400).effective_section()
+            )
+            assert (
+                test_fire == expected_result
+            ), f"fire -> FAILED\n {expected_result = }\n {test_fire = }"
+
+            # Test reference data
+            test_sizes = await client.get("/reference/sizes")
+            expected_result = len(database.snapshot().sizes)
+            assert (
+                len(test_sizes) == expected_result
+            ), f"reference -> FAILED\n {expected_result = }\n {len(test_sizes) = }"
+            test_memo = _reference()
+            database.reload()
+            test_reload = _reference()
+            test_sizes = await client.get("/reference/sizes")
+            assert (
+                test_reload is not test_memo
+                and test_reload is _reference()
+                and len(test_sizes) == expected_result
+            ), f"reference reload -> FAILED\n {len(test_sizes) = }"
+
+            # Test coalescing: identical concurrent requests share one computation
+            clients = [Client(port=port) for _ in range(20)]
+            before = service.computations
+            payload = [dict(vibration, span=3 + i / 100) for i in range(60)]
+            test_results = await asyncio.gather(
+                *(other.post("/vibration/max_span", payload) for other in clients)
+            )
+            test_computations = service.computations - before
+            assert test_computations == 1 and all(
+                result == test_results[0] for result in test_results
+            ), f"coalescing -> FAILED\n {test_computations = }"
+            for other in clients:
+                await other.close()
+        finally:
+            await client.close()
+            await service.close()
+
+    asyncio.run(run())
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    main()
+
+
+# END
@@ -0,0 +1,241 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Retrait cumulatif des empilements verticaux (bâtiments de plusieurs étages).
+----------------------------------------------------
+
+Mouvements attribuables au changement de la teneur en humidité (5.4.6) de toutes les lignes de
+murs d'un bâtiment à la fois. Chaque étage d'une ligne de murs est un empilement de
+composantes (lisses, solives ou solives de rive, montants, etc.), chacune avec sa dimension,
+ses teneurs en humidité initiale et finale et la direction du fil.
+
+Les tableaux des composantes sont diffusés à la forme (lignes de murs x étages), l'étage 0
+étant le plus bas. Le retrait de chaque composante est calculé par
+general_design_batch.moisture, puis additionné par étage et cumulé du bas vers le haut: le
+mouvement cumulatif d'un étage est celui du dessus de l'étage (niveau du plancher suivant)
+par rapport à la fondation.
+
+Le retrait différentiel se calcule par rapport à une référence: une autre ligne de murs, ou
+un élément qui ne subit pas de retrait (ex: cage d'ascenseur ou d'escalier en béton).
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from dataclasses import dataclass
+import numpy as np
+import general_design_batch
+
+
+# CODE
+@dataclass(frozen=True)
+class Component:
+    """
+    Composante d'un étage, répétée pour toutes les lignes de murs.
+
+    Args:
+        name (str): Nom de la composante.
+        dimension (array_like): Dimension réelle dans la direction verticale, mm (ex: 3 x 38
+            pour trois lisses).
+        init_mc (array_like): Teneur en humidité initiale, %.
+        final_mc (array_like): Teneur en humidité finale, %.
+        direction (str, optional): Direction du fil du bois. "perp", "para" ou "autre".
+            Default to "perp".
+        coefficient (float, optional): Coefficient de retrait si direction = "autre".
+            Default to 0.002.
+
+    """
+
+    name: str
+    dimension: np.ndarray | float
+    init_mc: np.ndarray | float
+    final_mc: np.ndarray | float
+    direction: str = "perp"
+    coefficient: float = 0.002
+
+
+@dataclass(frozen=True)
+class Movement:
+    """
+    Mouvements de toutes les lignes de murs.
+
+    Args:
+        names (tuple[str, ...]): Noms des composantes.
+        components (np.ndarray): Retrait de chaque composante (composantes x lignes x
+            étages), mm.
+
+    """
+
+    names: tuple[str, ...]
+    components: np.ndarray
+
+    @property
+    def storeys(self) -> np.ndarray:
+        """
+        Retrait de chaque étage (lignes x étages), mm.
+
+        """
+        storeys = np.zeros(self.components.shape[1:])
+        for component in self.components:
+            storeys = storeys + component
+
+        return storeys
+
+    @property
+    def cumulative(self) -> np.ndarray:
+        """
+        Mouvement cumulatif au-dessus de chaque étage (lignes x étages), mm.
+
+        """
+        return np.cumsum(self.storeys, axis=-1)
+
+    @property
+    def total(self) -> np.ndarray:
+        """
+        Mouvement cumulatif au sommet de chaque ligne de murs, mm.
+
+        """
+        return self.cumulative[..., -1]
+
+    def differential(self, reference=None) -> np.ndarray:
+        """
+        Retrait différentiel cumulatif à chaque étage (lignes x étages), mm.
+
+        Args:
+            reference (int | array_like, optional): Indice de la ligne de murs de référence,
+                ou mouvement cumulatif de la référence par étage. Default to None (référence
+                sans retrait, ex: cage en béton).
+
+        Returns:
+            np.ndarray: Mouvement cumulatif - mouvement de la référence, mm.
+
+        """
+        cumulative = self.cumulative
+        if reference is None:
+            return cumulative
+        if isinstance(reference, (int, np.integer)):
+            return cumulative - cumulative[reference]
+
+        return cumulative - np.asarray(reference)
+
+
+def accumulate(
+    components: list[Component], lines: int = 1, storeys: int = 1
+) -> Movement:
+    """
+    5.4.6 Retrait de toutes les composantes de toutes les lignes de murs.
+
+    Args:
+        components (list[Component]): Composantes de chaque étage, de bas en haut. Une
+            composante absente d'un étage a une dimension de 0.
+        lines (int, optional): Nombre minimal de lignes de murs. Default to 1.
+        storeys (int, optional): Nombre minimal d'étages. Default to 1.
+
+    Returns:
+        Movement: Retrait des composantes, par étage et cumulatif.
+
+    Example:
+        accumulate([
+            Component("lisses", 3 * 38, 19, 12),
+            Component("solives", joist_depths, 19, 12),
+            Component("montants", 2438, 19, 12, "para"),
+        ], storeys=6).cumulative
+
+    """
+    columns = [
+        np.asarray(getattr(component, name))
+        for component in components
+        for name in ("dimension", "init_mc", "final_mc")
+    ]
+    shape = np.broadcast_shapes((lines, storeys), *(column.shape for column in columns))
+    dimension, init_mc, final_mc = (
+        np.stack([np.broadcast_to(column, shape) for column in columns[i::3]])
+        for i in range(3)
+    )
+    extra = (1,) * len(shape)
+    direction = np.array([component.direction for component in components])
+    coefficient = np.array([component.coefficient for component in components])
+
+    return Movement(
+        tuple(component.name for component in components),
+        general_design_batch.moisture(
+            dimension,
+            init_mc,
+            final_mc,
+            direction.reshape(-1, *extra),
+            coefficient.reshape(-1, *extra),
+        ),
+    )
+
+
+# TESTS
+def _tests():
+    """
+    Tests pour le retrait cumulatif.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import general_design
+
+    rng = np.random.default_rng(86)
+    lines, storeys = 300, 6
+    joists = rng.choice([235, 286, 302, 356], (lines, storeys))
+    plates = rng.choice([2, 3], (lines, 1)) * 38
+    rim_mc = rng.choice([8, 19], storeys)
+    components = [
+        Component("lisses", plates, 19, 11),
+        Component("solives", joists, rim_mc, 11),
+        Component("montants", 2438, 19, 11, "para"),
+        Component("sous-plancher", 15.5, 12, 9, "autre", 0.0025),
+    ]
+    movement = accumulate(components, lines, storeys)
+
+    # Test cumulative against general_design.moisture
+    for line in range(lines):
+        total = 0
+        expected_result = []
+        for storey in range(storeys):
+            storey_movement = 0
+            for component in components:
+                values = [
+                    np.broadcast_to(getattr(component, name), (lines, storeys))[
+                        line, storey
+                    ].item()
+                    for name in ("dimension", "init_mc", "final_mc")
+                ]
+                storey_movement += general_design.moisture(
+                    *values, component.direction, component.coefficient
+                )
+            total += storey_movement
+            expected_result.append(total)
+        test_cumulative = movement.cumulative[line].tolist()
+        assert (
+            test_cumulative == expected_result
+        ), f"cumulative -> FAILED\n {expected_result = }\n {test_cumulative = }"
+
+    # Test differential
+    test_differential = movement.differential(3)
+    expected_result = movement.cumulative - movement.cumulative[3]
+    assert np.array_equal(
+        test_differential, expected_result
+    ), f"differential -> FAILED\n {expected_result = }\n {test_differential = }"
+    test_differential = accumulate(
+        [Component("lisses", 3 * 38, 19, 11)], storeys=2
+    ).differential()
+    expected_result = np.array([[1, 2]]) * (3 * 38 * (19 - 11) * 0.002)
+    assert np.allclose(
+        test_differential, expected_result, rtol=1e-12, atol=0
+    ), f"differential -> FAILED\n {expected_result = }\n {test_differential = }"
+    print("All tests passed.")
+
+
+# RUN FILE
+if __name__ == "__main__":
+    _tests()
+
+
+# END
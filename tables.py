@@ -0,0 +1,75 @@
+"""
+CSA O86:19: Règles de calcul des charpentes en bois.
+
+Tables de csa_o86_19.db.
+----------------------------------------------------
+
+Modèles SQLAlchemy des tables. La connexion est gérée par database.
+
+____________________________________________________________________________________________________
+
+    auteur: GabPoulin
+    email: poulin33@me.com
+
+"""
+
+# IMPORTS
+from dataclasses import dataclass
+from sqlalchemy import orm, Column, TEXT, REAL, INTEGER
+
+
+# DB TABLES
+@dataclass
+class SawnLumberStrengths(orm.declarative_base()):
+    """
+    Se connecte à la table sawn_lumber_strengths de csa_o86_19.db.
+
+    """
+
+    __tablename__ = "sawn_lumber_strengths"
+    index: int = Column("index", INTEGER, primary_key=True)  # type: ignore
+    category: str = Column("category", TEXT)  # type: ignore
+    specie: str = Column("specie", TEXT)  # type: ignore
+    grade: str = Column("grade", TEXT)  # type: ignore
+    fb: float = Column("fb", REAL)  # type: ignore
+    fv: float = Column("fv", REAL)  # type: ignore
+    fc: float = Column("fc", REAL)  # type: ignore
+    fcp: float = Column("fcp", REAL)  # type: ignore
+    ft: float = Column("ft", REAL)  # type: ignore
+    e: int = Column("e", INTEGER)  # type: ignore
+    e05: int = Column("e05", INTEGER)  # type: ignore
+
+
+@dataclass
+class LumberSizes(orm.declarative_base()):
+    """
+    Se connecte à la table lumber_sizes de csa_o86_19.db.
+
+    """
+
+    __tablename__ = "lumber_sizes"
+    nominal: int = Column("nominal", INTEGER, primary_key=True)  # type: ignore
+    dry: int = Column("dry", INTEGER)  # type: ignore
+    green: int = Column("green", INTEGER)  # type: ignore
+    dry_brut: int = Column("dry_brut", INTEGER)  # type: ignore
+    green_brut: int = Column("green_brut", INTEGER)  # type: ignore
+
+
+@dataclass
+class SubfloorProperties(orm.declarative_base()):
+    """
+    Se connecte à la table subfloor_properties de csa_o86_19.db.
+
+    """
+
+    __tablename__ = "subfloor_properties"
+    panel: str = Column("panel", TEXT, primary_key=True)  # type: ignore
+    ts: float = Column("ts", REAL)  # type: ignore
+    eis_par: int = Column("EIs_par", INTEGER)  # type: ignore
+    eis_perp: int = Column("EIs_perp", INTEGER)  # type: ignore
+    eas_par: float = Column("EAs_par", REAL)  # type: ignore
+    eas_perp: float = Column("Eas_perp", REAL)  # type: ignore
+    rho_s: int = Column("rho_s", INTEGER)  # type: ignore
+
+
+# END